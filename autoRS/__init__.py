@@ -5,25 +5,87 @@ import os
 import re
 import sys
 import traceback
-from typing import Tuple, Dict, List
+from time import perf_counter
+from typing import Tuple, Dict, Iterator, List, Optional
 
 # Third party imports
 import numpy as np
 
 # Local application imports
-from autoRS.spectrum import response_spectrum, RS_METHODS, DEFAULT_METHOD
+from autoRS.spectrum import (
+    response_spectrum,
+    get_default_frequencies,
+    RS_METHODS,
+    DEFAULT_METHOD,
+    get_fft_settings,
+)
 from autoRS.rw import read_shk_ahl
+from autoRS.core import MotionSpectra
+from autoRS.cost import AUTO_METHOD, EXACT_METHODS, WORK_FUNCTIONS, choose_method
+from autoRS.stats import SpectraStatistics, SUMMARY_FNAME
+from autoRS.broadening import write_design_spectrum, BROADENING_FRACTION, DESIGN_FNAME
+from autoRS.combination import (
+    combine_spectra,
+    group_columns,
+    COMBINATION_METHODS,
+    GROUP_PATTERN,
+)
+from autoRS.spill import (
+    spill_csv,
+    block_size,
+    processing_bytes,
+    CSV_DELETECHARS,
+    MEMORY_BUDGET,
+)
+from autoRS.parallel import (
+    SharedArrays,
+    parallel_response_spectrum,
+    N_PROCESSES,
+    _worker_kwargs,
+)
+from autoRS.fourier import (
+    fourier_spectra,
+    konno_ohmachi_smoothing,
+    write_fourier_csv,
+    PSD_METHODS,
+    KO_BANDWIDTH,
+)
 
 # %% Define any global/default variables
 SETTINGS_FNAME: str = "RS_settings.txt"
 DATE: str = "July 26 2021"
-ALLOWED_SETTING_KEYS: Tuple[str, ...] = ("folder", "zeta", "ext", "method")
-AVAILABLE_METHODS: Tuple[str, ...] = tuple(RS_METHODS)
+ALLOWED_SETTING_KEYS: Tuple[str, ...] = (
+    "folder",
+    "zeta",
+    "ext",
+    "method",
+    "approximate",
+    "upsample",
+    "summary",
+    "fourier",
+    "smoothing",
+    "broadening",
+    "combination",
+    "grouping",
+    "memory",
+    "processes",
+)
+AVAILABLE_METHODS: Tuple[str, ...] = tuple(RS_METHODS) + (AUTO_METHOD,)
 DEFAULT_SETTINGS = {
     "folder": ".",
     "zeta": 0.05,
     "ext": False,
     "method": DEFAULT_METHOD,
+    "approximate": False,
+    "upsample": True,
+    "summary": False,
+    "fourier": False,
+    "smoothing": False,
+    "broadening": False,
+    "combination": False,
+    "grouping": GROUP_PATTERN,
+    "memory": False,
+    "processes": 1,
 }
 settings = DEFAULT_SETTINGS.copy()
 
@@ -39,7 +101,7 @@ def get_settings(fname: str = SETTINGS_FNAME) -> None:
     # Parse the settings file and feed all valid key-value pairs into a raw dictionary
     with open(fname, "r") as file:
         raw_strings = [line for line in file]
-        regex = "^(?P<key>.+)= *(?P<value>.*)$"
+        regex = "^(?P<key>[^=]+)= *(?P<value>.*)$"
         raw_settings = {}
         for string in raw_strings:
             match = re.search(regex, string)
@@ -72,6 +134,95 @@ def process_settings(raw_settings: Dict[str, str]) -> Dict[str, str]:
     else:
         clean_settings["ext"] = DEFAULT_SETTINGS["ext"]
 
+    # Clean approximate
+    if clean_settings["approximate"] == "y":
+        clean_settings["approximate"] = True
+    elif clean_settings["approximate"] == "n":
+        clean_settings["approximate"] = False
+    else:
+        clean_settings["approximate"] = DEFAULT_SETTINGS["approximate"]
+
+    # Clean upsample
+    if clean_settings["upsample"] == "y":
+        clean_settings["upsample"] = True
+    elif clean_settings["upsample"] == "n":
+        clean_settings["upsample"] = False
+    else:
+        clean_settings["upsample"] = DEFAULT_SETTINGS["upsample"]
+
+    # Clean summary
+    if clean_settings["summary"] == "y":
+        clean_settings["summary"] = True
+    elif clean_settings["summary"] == "n":
+        clean_settings["summary"] = False
+    else:
+        clean_settings["summary"] = DEFAULT_SETTINGS["summary"]
+
+    # Clean fourier: 'y' selects the default PSD method, or the PSD method is given
+    if clean_settings["fourier"] == "y":
+        clean_settings["fourier"] = PSD_METHODS[0]
+    elif clean_settings["fourier"] not in PSD_METHODS:
+        clean_settings["fourier"] = DEFAULT_SETTINGS["fourier"]
+
+    # Clean smoothing: 'y' selects the default bandwidth, or the bandwidth is given
+    if clean_settings["smoothing"] == "y":
+        clean_settings["smoothing"] = KO_BANDWIDTH
+    else:
+        try:
+            clean_settings["smoothing"] = float(clean_settings["smoothing"])
+        except (TypeError, ValueError):
+            clean_settings["smoothing"] = DEFAULT_SETTINGS["smoothing"]
+        if not clean_settings["smoothing"] > 0:
+            clean_settings["smoothing"] = DEFAULT_SETTINGS["smoothing"]
+    if clean_settings["smoothing"] and not clean_settings["fourier"]:
+        print("Smoothing only applies to the Fourier spectra; set fourier to y.")
+
+    # Clean broadening: 'y' selects the default fraction, or the fraction is given
+    if clean_settings["broadening"] == "y":
+        clean_settings["broadening"] = BROADENING_FRACTION
+    else:
+        try:
+            clean_settings["broadening"] = float(clean_settings["broadening"])
+        except (TypeError, ValueError):
+            clean_settings["broadening"] = DEFAULT_SETTINGS["broadening"]
+        if not 0 < clean_settings["broadening"] < 1:
+            clean_settings["broadening"] = DEFAULT_SETTINGS["broadening"]
+
+    # Clean combination: 'y' selects SRSS, or a comma separated list of methods
+    if clean_settings["combination"] == "y":
+        clean_settings["combination"] = COMBINATION_METHODS[:1]
+    elif isinstance(clean_settings["combination"], str):
+        methods = [m.strip().lower() for m in clean_settings["combination"].split(",")]
+        methods = tuple(m for m in methods if m in COMBINATION_METHODS)
+        clean_settings["combination"] = methods or DEFAULT_SETTINGS["combination"]
+
+    # Clean grouping: a regular expression with a named group 'node'
+    try:
+        clean_settings["grouping"] = clean_settings["grouping"].strip()
+        group_columns([], clean_settings["grouping"])
+    except (AttributeError, ValueError, re.error):
+        clean_settings["grouping"] = DEFAULT_SETTINGS["grouping"]
+
+    # Clean memory: 'y' selects the default budget, or the budget (MB) is given
+    if clean_settings["memory"] == "y":
+        clean_settings["memory"] = MEMORY_BUDGET
+    else:
+        try:
+            clean_settings["memory"] = float(clean_settings["memory"])
+        except (TypeError, ValueError):
+            clean_settings["memory"] = DEFAULT_SETTINGS["memory"]
+        if not clean_settings["memory"] > 0:
+            clean_settings["memory"] = DEFAULT_SETTINGS["memory"]
+
+    # Clean processes: 'y' selects one process per CPU, or the number is given
+    if clean_settings["processes"] == "y":
+        clean_settings["processes"] = N_PROCESSES
+    else:
+        try:
+            clean_settings["processes"] = max(int(clean_settings["processes"]), 1)
+        except (TypeError, ValueError):
+            clean_settings["processes"] = DEFAULT_SETTINGS["processes"]
+
     # clean method
     if clean_settings["method"] not in AVAILABLE_METHODS:
         clean_settings["method"] = DEFAULT_SETTINGS["method"]
@@ -86,98 +237,333 @@ def get_TH_file_list(path: str) -> List[str]:
     return files
 
 
-def get_output_header_string() -> str:
-    """Generate header string for output Response Spectra output files."""
+def get_output_header_string(method: Optional[str] = None) -> str:
+    """Generate header string for output Response Spectra output files. `method` is
+    the RS method used (if different from the method setting). The upsample setting
+    is added to the method line of the shake method, so the header length does not
+    depend on the method."""
+    method = method or settings["method"]
+    if method == "shake":
+        method = "{},upsample = ,{}".format(method, settings["upsample"])
     string = (
         "RS Settings:\n"
         + "zeta = ,{}\n".format(settings["zeta"])
         + "ext = ,{}\n".format(settings["ext"])
-        + "method = ,{}\n".format(settings["method"])
+        + "method = ,{}\n".format(method)
         + "Note: Acceleration units will match the input TH.\n\n"
     )
     return string
 
 
+def get_rs_method(n: int, dt: float, n_records: int = 1) -> Tuple[str, Optional[float]]:
+    """Get the RS method to use for `n_records` time histories with `n` samples at
+    timestep `dt`. If the method setting is 'auto', the exact method (or any method,
+    if the approximate setting is on) with the lowest estimated cost is chosen (see
+    `autoRS.cost`) for the method settings (eg. upsample, see `get_rs_kwargs`), and
+    its estimated cost in s is returned. Otherwise, the estimated cost is None."""
+    if settings["method"] != AUTO_METHOD:
+        return settings["method"], None
+
+    frqs = get_default_frequencies(high_frequency=settings["ext"])
+    methods = tuple(WORK_FUNCTIONS) if settings["approximate"] else EXACT_METHODS
+    return choose_method(
+        n,
+        dt,
+        frqs,
+        settings["zeta"],
+        n_records,
+        methods=methods,
+        method_kwargs={method: get_rs_kwargs(method) for method in methods},
+    )
+
+
+def get_rs_kwargs(method: str, fft_cache: Optional[dict] = None) -> dict:
+    """Additional keyword arguments for `response_spectrum`. The 'shake' method
+    up-samples the records with the upsample setting. If the memory setting is on,
+    the 'fft' method works in blocks within the part of the memory budget left for
+    processing the columns, shared by the worker processes (see
+    `autoRS.spill.processing_bytes`). If Fourier spectra are written, the 'fft'
+    method keeps the record transforms in `fft_cache` so they are not recomputed."""
+    if method == "shake":
+        return {"upsample": settings["upsample"]}
+    kwargs = {}
+    if method == "fft" and settings["memory"]:
+        kwargs["fft_block_bytes"] = processing_bytes(
+            settings["memory"], settings["processes"]
+        )
+    if settings["fourier"] and method == "fft" and fft_cache is not None:
+        kwargs["fft_cache"] = fft_cache
+    return kwargs
+
+
+def get_parallel_rs(
+    acc: np.ndarray,
+    time: np.ndarray,
+    method: str,
+    shared: Optional[SharedArrays] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Generate the RS of the records (columns of `acc`) in the worker processes of
+    the processes setting. The records are handed to the workers through shared
+    memory (see `autoRS.parallel`), or through `shared` if they were read straight
+    into its "acc" array."""
+    return parallel_response_spectrum(
+        acc,
+        time,
+        zeta=settings["zeta"],
+        high_frequency=settings["ext"],
+        method=method,
+        n_processes=settings["processes"],
+        shared=shared,
+        **get_rs_kwargs(method),
+    )
+
+
+def print_rs_method(method: str, estimate: Optional[float], actual: float) -> None:
+    """Print the RS method used for a file, and its estimated and actual cost."""
+    if estimate is None:
+        print("Method = {}, time taken = {:.5f}s".format(method, actual))
+    else:
+        print(
+            "Method = {} ({}), estimated time = {:.5f}s, time taken = {:.5f}s".format(
+                method, AUTO_METHOD, estimate, actual
+            )
+        )
+
+
+def print_fft_settings() -> None:
+    """Print the FFT settings used by the 'fft' RS method (see
+    `autoRS.spectrum.get_fft_settings`). The FFT threads are divided between the
+    worker processes of the processes setting."""
+    backend, size_policy, _, padding = get_fft_settings()
+    workers = _worker_kwargs("fft", settings["processes"], {})["fft_workers"]
+    print(
+        "FFT backend = {}, size policy = {}, workers = {}, padding = {}".format(
+            backend, size_policy, workers, padding
+        )
+    )
+
+
+def get_fourier_path(rs_path: str, product: str) -> str:
+    """Path of a Fourier spectra output file (`product` is 'FAS', 'FAS_KO', or
+    'PSD') written alongside the RS output file `rs_path`."""
+    return re.sub(r"(_RS)?\.csv$", "", rs_path) + "_{}.csv".format(product)
+
+
+def get_fourier_spectra(
+    acc: np.ndarray, dt: float, fft_cache: Optional[dict] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Generate the FAS and PSD of a record with the fourier setting, reusing the
+    shortest transform cached by the RS method (see
+    `autoRS.fourier.fourier_spectra`)."""
+    return fourier_spectra(acc, dt, psd_method=settings["fourier"], fft_cache=fft_cache)
+
+
+def write_fourier_spectra(
+    spectra: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]],
+    rs_path: str,
+) -> None:
+    """Write the FAS and PSD of each record (name: output of `get_fourier_spectra`)
+    alongside the RS output file `rs_path`. If the smoothing setting is on, the
+    Konno-Ohmachi smoothed FAS are also written."""
+    fas = {name: values[0] for name, values in spectra.items()}
+    psd = {name: values[2] for name, values in spectra.items()}
+    _, fas_frqs, _, psd_frqs = next(iter(spectra.values()))
+
+    outputs = [("FAS", fas_frqs, np.column_stack(list(fas.values())))]
+    outputs.append(("PSD", psd_frqs, np.column_stack(list(psd.values()))))
+    if settings["smoothing"]:
+        smoothed, smooth_frqs = konno_ohmachi_smoothing(
+            outputs[0][2], fas_frqs, bandwidth=settings["smoothing"]
+        )
+        outputs.append(("FAS_KO", smooth_frqs, smoothed))
+
+    header = (
+        "Fourier Settings:\n"
+        + "PSD method = ,{}\n".format(settings["fourier"])
+        + "Konno-Ohmachi bandwidth = ,{}\n".format(settings["smoothing"])
+        + "Note: FAS units are (TH units) x s. PSD units are (TH units)^2 / Hz.\n\n"
+    )
+    for product, frqs, values in outputs:
+        write_fourier_csv(
+            get_fourier_path(rs_path, product),
+            frqs,
+            values,
+            ["_".join(filter(None, (name, product))) for name in fas],
+            header=header,
+        )
+
+
 # Generate RS from all valid files (currently just .ahl and .csv) and save
 # TODO: Add additional file extensions (eg. .ot2, peer record, etc.)
 
 
-def generate_rs_from_ahl(th_path: str, rs_path: str) -> None:
-    """Read .ahl time history from `th_path`. Generate the RS. Write to `rs_path`."""
+def generate_rs_from_ahl(th_path: str, rs_path: str) -> MotionSpectra:
+    """Read .ahl time history from `th_path`. Generate the RS. Write to `rs_path`.
+    Returns the RS."""
     acc, dt = read_shk_ahl(th_path)
     time = np.arange(0, dt * len(acc), dt)
-    rs, frq = response_spectrum(
-        acc, time, zeta=settings["zeta"], high_frequency=settings["ext"],
-    )
 
-    # Reformat `rs`, `frq` arrays as a combined array for use in np.savetxt.
-    df = np.vstack((frq, rs)).T
-
-    # Open file and write informative header lines + RS data
-    with open(rs_path, "w", newline="") as file:
-        file.write(os.path.split(rs_path)[-1])
-        file.write("\n" + get_output_header_string())
-        np.savetxt(
-            file,
-            df,
-            fmt="%.5f",
-            delimiter=",",
-            comments="",
-            header=",".join(["Frequency (Hz)", "S_a"]),
+    method, estimate = get_rs_method(len(acc), dt)
+    fft_cache = {}
+    t0 = perf_counter()
+    if settings["processes"] > 1:
+        rs, frq = get_parallel_rs(np.asarray(acc), time, method)
+    else:
+        rs, frq = response_spectrum(
+            acc,
+            time,
+            zeta=settings["zeta"],
+            high_frequency=settings["ext"],
+            method=method,
+            **get_rs_kwargs(method, fft_cache),
         )
+    print_rs_method(method, estimate, perf_counter() - t0)
+    if settings["fourier"]:
+        fourier = get_fourier_spectra(np.asarray(acc), dt, fft_cache)
+        write_fourier_spectra({"": fourier}, rs_path)
+
+    # Write informative header lines + RS data
+    spectra = MotionSpectra(frq, rs, zeta=settings["zeta"], column_names=["S_a"])
+    spectra.to_csv(rs_path, header=get_output_header_string(method))
+    return spectra
+
+
+def read_csv_columns(
+    th_path: str,
+) -> Tuple[np.ndarray, List[str], Iterator[Tuple[str, np.ndarray]]]:
+    """Read a .csv time history file. Returns the time, the names of the
+    acceleration columns, and an iterator over the (name, values) of the
+    acceleration columns.
+
+    If the memory setting is on, the file is spilled to a temporary column store in
+    a single pass, and the columns are read back in blocks that fit in the memory
+    budget (see `autoRS.spill`). Otherwise, the whole file is loaded at once."""
+    if settings["memory"]:
+        store = spill_csv(th_path, settings["memory"])
+        time = store.read_columns(0, 1)[:, 0]
+
+        def columns() -> Iterator[Tuple[str, np.ndarray]]:
+            with store:
+                yield from store.iter_columns(
+                    1, block_size(store.n_rows, settings["memory"])
+                )
+
+        return time, list(store.column_names[1:]), columns()
 
-
-def generate_rs_from_csv(th_path: str, rs_path: str) -> None:
-    """Read .csv time history(s) from `th_path`. Generate the RS.
-    Write to `rs_path`."""
     df_th = np.genfromtxt(
-        th_path,
-        delimiter=",",
-        skip_header=1,
-        names=True,
-        deletechars=" !#$%&'()*+,-./:;<=>?[\\]^{|}~",
+        th_path, delimiter=",", skip_header=1, names=True, deletechars=CSV_DELETECHARS,
+    )
+    names = df_th.dtype.names
+    return (
+        df_th[names[0]],
+        list(names[1:]),
+        ((column, df_th[column]) for column in names[1:]),
     )
 
+
+def generate_rs_from_csv(th_path: str, rs_path: str) -> Optional[MotionSpectra]:
+    """Read .csv time history(s) from `th_path`. Generate the RS.
+    Write to `rs_path`. Returns the RS of the time histories, or None if no RS was
+    generated. Combined RS of the nodes (see the combination setting) are only written
+    to `rs_path`, so they are not counted again in the summary and design spectra."""
+    time, acc_cols, columns = read_csv_columns(th_path)
+
     # .csv file may have multiple time history column_names. Hence, define RS
-    # as a dictionary and generate separately for each column.
+    # as a dictionary and generate separately for each column. The Fourier spectra
+    # of each column are generated right after its RS, so only one transform of a
+    # record is kept at a time (they are not generated out of core). With several
+    # processes, the columns are processed in parallel batches, read straight into
+    # shared memory (within half of the memory budget, the rest is left to read the
+    # columns).
+    dt = time[1] - time[0]
+    fourier = settings["fourier"] and not settings["memory"]
     rs = {}
-    time_col = df_th.dtype.names[0]
-    acc_cols = df_th.dtype.names[1:]
-    for column in acc_cols:
-        print(column)
-        if any(np.isnan(df_th[column])):
-            print("Nan detected; column skipped.")
-            continue
-        rs_column = column + "_S_a"
-        rs[rs_column], frq = response_spectrum(
-            df_th[column],
-            df_th[time_col],
-            zeta=settings["zeta"],
-            high_frequency=settings["ext"],
-        )
+    fourier_columns = {}
+    shared = None
+    batch_names = []
+    batch_size = len(acc_cols)
+    if settings["memory"]:
+        batch_size = max(block_size(len(time), settings["memory"]) // 2, 1)
+    method, estimate = get_rs_method(len(time), dt, len(acc_cols))
+    t0 = perf_counter()
+    try:
+        for column, acc in columns:
+            print(column)
+            if any(np.isnan(acc)):
+                print("Nan detected; column skipped.")
+                continue
+            rs_column = column + "_S_a"
+            fft_cache = {}
+            if settings["processes"] > 1:
+                if fourier:
+                    fourier_columns[column] = get_fourier_spectra(acc, dt)
+                if shared is None:
+                    shared = SharedArrays()
+                    shared.empty("acc", (len(time), batch_size), order="F")
+                shared.arrays["acc"][:, len(batch_names)] = acc
+                batch_names.append(rs_column)
+                if len(batch_names) == batch_size:
+                    rs_batch, frq = get_parallel_rs(
+                        shared.arrays["acc"], time, method, shared
+                    )
+                    rs.update(zip(batch_names, rs_batch.T))
+                    shared.close()
+                    shared, batch_names = None, []
+                continue
+            rs[rs_column], frq = response_spectrum(
+                acc,
+                time,
+                zeta=settings["zeta"],
+                high_frequency=settings["ext"],
+                method=method,
+                **get_rs_kwargs(method, fft_cache),
+            )
+            if fourier:
+                fourier_columns[column] = get_fourier_spectra(acc, dt, fft_cache)
+        if batch_names:
+            rs_batch, frq = get_parallel_rs(
+                shared.arrays["acc"][:, : len(batch_names)], time, method, shared
+            )
+            rs.update(zip(batch_names, rs_batch.T))
+    finally:
+        if shared is not None:
+            shared.close()
+    print_rs_method(method, estimate, perf_counter() - t0)
 
     # If no valid THs and Nans detected in all cases, rs dictionary will be
     # empty. Exit from function
     if not rs:
         print("No valid column_names in file. No RS generated. File skipped.")
-        return
+        return None
 
-    # Reformat `rs`, `frq` arrays as a combined array for use in np.savetxt.
-    df_rs = np.vstack((frq, *rs.values())).T
-
-    # Open file and write informative header lines + RS data
-    with open(rs_path, "w", newline="") as file:
-        file.write(os.path.split(rs_path)[-1])
-        file.write("\n" + get_output_header_string())
-        np.savetxt(
-            file,
-            df_rs,
-            fmt="%.5f",
-            delimiter=",",
-            comments="",
-            header=",".join(["Frequency (Hz)", *rs.keys()]),
+    # Combine the directional components of each node into additional columns
+    acceleration = np.column_stack(list(rs.values()))
+    spectra = MotionSpectra(
+        frq, acceleration, zeta=settings["zeta"], column_names=list(rs.keys()),
+    )
+    output = spectra
+    if settings["combination"]:
+        combined, combined_names = combine_spectra(
+            acceleration,
+            [name[: -len("_S_a")] for name in rs],
+            settings["combination"],
+            settings["grouping"],
+        )
+        output = MotionSpectra(
+            frq,
+            np.column_stack((acceleration, combined)),
+            zeta=settings["zeta"],
+            column_names=list(rs.keys()) + [name + "_S_a" for name in combined_names],
         )
 
+    # Write informative header lines + RS data
+    output.to_csv(rs_path, header=get_output_header_string(method))
+    if fourier:
+        write_fourier_spectra(fourier_columns, rs_path)
+    elif settings["fourier"]:
+        print("Fourier spectra are not written for files processed out of core.")
+    return spectra
+
 
 def write_default_settings(fname=SETTINGS_FNAME) -> None:
     """Write default settings file."""
@@ -193,8 +579,75 @@ def write_default_settings(fname=SETTINGS_FNAME) -> None:
         file.write("Generate RS up to 1000Hz (y) or just 100Hz (n)?\n")
         file.write("ext = {}\n".format("y" if DEFAULT_SETTINGS["ext"] else "n"))
         file.write("\n")
-        file.write("Choose RS generation method (fft, or shake):\n")
-        file.write("method = {}".format(DEFAULT_SETTINGS["method"]))
+        file.write(
+            "Choose RS generation method ({}, or {}):\n".format(
+                ", ".join(AVAILABLE_METHODS[:-1]), AVAILABLE_METHODS[-1]
+            )
+        )
+        file.write("method = {}\n".format(DEFAULT_SETTINGS["method"]))
+        file.write("\n")
+        file.write(
+            "Allow the {} method to choose the approximate multirate method (y/n)?"
+            "\n".format(AUTO_METHOD)
+        )
+        file.write(
+            "approximate = {}\n".format(
+                "y" if DEFAULT_SETTINGS["approximate"] else "n"
+            )
+        )
+        file.write("\n")
+        file.write(
+            "Up-sample records with too few samples per oscillator period with the "
+            "shake method (y), or use them as is, like SHAKE2000 (n)?\n"
+        )
+        file.write(
+            "upsample = {}\n".format("y" if DEFAULT_SETTINGS["upsample"] else "n")
+        )
+        file.write("\n")
+        file.write("Write a summary of all the RS (mean, percentiles, envelopes)?\n")
+        file.write("summary = {}\n".format("y" if DEFAULT_SETTINGS["summary"] else "n"))
+        file.write("\n")
+        file.write(
+            "Write Fourier amplitude spectra and PSDs (n, y, or the PSD method: "
+            "{})?\n".format(", ".join(PSD_METHODS))
+        )
+        file.write("fourier = {}\n".format(DEFAULT_SETTINGS["fourier"] or "n"))
+        file.write("\n")
+        file.write(
+            "Konno-Ohmachi smoothing of the Fourier amplitude spectra (n, y, or the "
+            "bandwidth, y = {:g})?\n".format(KO_BANDWIDTH)
+        )
+        file.write("smoothing = {}\n".format(DEFAULT_SETTINGS["smoothing"] or "n"))
+        file.write("\n")
+        file.write(
+            "Write a design spectrum (envelope of all the RS, with peaks broadened by "
+            "n, y = {:g}, or the fraction)?\n".format(BROADENING_FRACTION)
+        )
+        file.write("broadening = {}\n".format(DEFAULT_SETTINGS["broadening"] or "n"))
+        file.write("\n")
+        file.write(
+            "Combine the directional components of each node in .csv files (n, y, or "
+            "a list of: {})?\n".format(", ".join(COMBINATION_METHODS))
+        )
+        file.write("combination = {}\n".format(DEFAULT_SETTINGS["combination"] or "n"))
+        file.write("\n")
+        file.write(
+            "Regular expression of the component column names, with a named group "
+            "'node' identifying the node:\n"
+        )
+        file.write("grouping = {}\n".format(DEFAULT_SETTINGS["grouping"]))
+        file.write("\n")
+        file.write(
+            "Process .csv files out of core within a memory budget (n, y = {:g}MB, or "
+            "the budget in MB)?\n".format(MEMORY_BUDGET)
+        )
+        file.write("memory = {}\n".format(DEFAULT_SETTINGS["memory"] or "n"))
+        file.write("\n")
+        file.write(
+            "Number of worker processes (y = one per CPU, {}). The records are shared "
+            "with the workers through shared memory:\n".format(N_PROCESSES)
+        )
+        file.write("processes = {}".format(DEFAULT_SETTINGS["processes"]))
 
 
 def make_RS_folder(path: str) -> str:
@@ -226,6 +679,58 @@ def get_data_paths(th_folder: str) -> Tuple[List[str], List[str]]:
     return th_paths, rs_paths
 
 
+def update_statistics(
+    statistics: Optional[SpectraStatistics], spectra: Optional[MotionSpectra]
+) -> Optional[SpectraStatistics]:
+    """Add the RS of one file to the running `statistics` (created on the first
+    call). Spectra with non-positive accelerations are excluded."""
+    if spectra is None:
+        return statistics
+    if statistics is None:
+        statistics = SpectraStatistics(spectra.frequency)
+    acceleration = spectra.acceleration
+    valid = np.all(np.isfinite(acceleration) & (acceleration > 0), axis=0)
+    for name in np.asarray(spectra.column_names)[~valid]:
+        print("{}: invalid accelerations; RS excluded from summary.".format(name))
+    if valid.any():
+        statistics.update(acceleration[:, valid])
+    return statistics
+
+
+def write_summary(statistics: Optional[SpectraStatistics], rs_folder: str) -> None:
+    """Write the summary of the RS `statistics` to the RS folder."""
+    if statistics is None or statistics.count == 0:
+        print("No RS generated. No summary written.")
+        return
+    summary_path = os.path.join(rs_folder, SUMMARY_FNAME)
+    header = "Summary of {} RS\n".format(statistics.count) + get_output_header_string()
+    statistics.to_spectra(zeta=settings["zeta"]).to_csv(summary_path, header=header)
+    print("Summary of {} RS written to {}".format(statistics.count, summary_path))
+
+
+def write_design(statistics: Optional[SpectraStatistics], rs_folder: str) -> None:
+    """Write the design spectrum (envelope and broadened envelope of all the RS in
+    the running `statistics`) to the RS folder."""
+    if statistics is None or statistics.count == 0:
+        print("No RS generated. No design spectrum written.")
+        return
+    design_path = os.path.join(rs_folder, DESIGN_FNAME)
+    header = (
+        "Design spectrum of {} RS\n".format(statistics.count)
+        + "broadening = ,{}\n".format(settings["broadening"])
+        + get_output_header_string()
+    )
+    write_design_spectrum(
+        design_path,
+        statistics.maximum,
+        statistics.frequency,
+        settings["broadening"],
+        zeta=settings["zeta"],
+        header=header,
+    )
+    print("Design spectrum written to {}".format(design_path))
+
+
 def generate_rs() -> None:
     """Overall program logic:
 
@@ -247,6 +752,8 @@ def generate_rs() -> None:
     print("Detected settings:")
     for key, value in settings.items():
         print("{} = {}".format(key, value))
+    if settings["method"] in ("fft", AUTO_METHOD):
+        print_fft_settings()
     print("")
 
     th_paths, rs_paths = get_data_paths(settings["folder"])
@@ -254,16 +761,24 @@ def generate_rs() -> None:
     # Generate spectra for each valid time history file.
     # TODO: Convert if-else chain to dictionary as additional TH extension
     #   options are added.
+    statistics = None
     for th_path, rs_path in zip(th_paths, rs_paths):
         print(os.path.split(th_path)[-1])
         if th_path[-3:] == "ahl":
-            generate_rs_from_ahl(th_path, rs_path)
+            spectra = generate_rs_from_ahl(th_path, rs_path)
             print("")
         elif th_path[-3:] == "csv":
-            generate_rs_from_csv(th_path, rs_path)
+            spectra = generate_rs_from_csv(th_path, rs_path)
             print("")
         else:
             continue
+        if settings["summary"] or settings["broadening"]:
+            statistics = update_statistics(statistics, spectra)
+
+    if settings["summary"]:
+        write_summary(statistics, make_RS_folder(settings["folder"]))
+    if settings["broadening"]:
+        write_design(statistics, make_RS_folder(settings["folder"]))
     print("RS Generation complete.")
 
 
@@ -0,0 +1,139 @@
+"""Peak broadening and enveloping of (floor) response spectra."""
+
+# %% Import required modules
+
+# Standard library imports
+from typing import Optional, Tuple, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from autoRS.typing import array_like_1d, array_like_2d
+from autoRS.core import MotionSpectra
+from autoRS.core.utils import loglog_interpolate, range_maximum
+
+# %% Global variables
+
+BROADENING_FRACTION: float = 0.15
+"""Default peak broadening, as a fraction of the peak frequencies (+/-15% per
+ASCE 4 and RG 1.122)."""
+
+DESIGN_FNAME: str = "RS_design.csv"
+"""Name of the design spectrum file written to the RS folder."""
+
+
+# %% Main functions
+
+
+def broaden(
+    acceleration: Union[array_like_1d, array_like_2d],
+    frequency: array_like_1d,
+    fraction: float = BROADENING_FRACTION,
+) -> np.ndarray:
+    """Broaden the peaks of spectra by +/-`fraction` of their frequencies.
+
+    A peak at frequency fp is spread over [fp x (1 - fraction), fp x (1 + fraction)],
+    so the broadened spectrum at f is the maximum of the spectrum over the frequencies
+    [f / (1 + fraction), f / (1 - fraction)]. The window has a fixed width in
+    log-frequency, i.e. it is the envelope of the spectrum shifted in log-frequency
+    by all the factors within 1 +/- fraction.
+
+    The spectra are log-log linear between the given frequencies, so the maximum
+    over a window is either at one of the window ends (interpolated) or at one of
+    the given frequencies within the window (see `autoRS.core.utils.range_maximum`).
+    All the spectra are broadened at once, without loops over frequencies.
+
+    Parameters
+    ----------
+    acceleration : 1d or 2d array_like
+        Spectral accelerations with shape (n_frequencies,) for one spectrum, or
+        (n_frequencies, n_spectra), eg. the RS from `response_spectrum`.
+    frequency : 1d array_like
+        Non-decreasing frequencies (Hz) of the spectra.
+    fraction : float, optional
+        Peak broadening fraction (0 <= fraction < 1). Defaults to
+        `BROADENING_FRACTION`.
+
+    Returns
+    -------
+    broadened : ndarray
+        Broadened spectral accelerations, with the same shape as `acceleration`.
+        Beyond the given frequencies, the spectra are held at their end values.
+    """
+    sa = np.asarray(acceleration, dtype=float)
+    frequency = np.asarray(frequency, dtype=float)
+    if len(sa) != len(frequency):
+        raise ValueError("Spectra must have one row per frequency.")
+    if not 0 <= fraction < 1:
+        raise ValueError("Broadening fraction must be between 0 and 1.")
+    if np.any(np.diff(frequency) < 0):
+        raise ValueError("Frequencies must be non-decreasing.")
+    if not (np.all(sa > 0) and np.all(frequency > 0)):
+        raise ValueError("Spectral accelerations and frequencies must be positive.")
+
+    low = frequency / (1 + fraction)
+    high = frequency / (1 - fraction)
+    ends = loglog_interpolate(np.concatenate((low, high)), frequency, sa)
+    peaks = range_maximum(
+        sa,
+        np.searchsorted(frequency, low, side="left"),
+        np.searchsorted(frequency, high, side="right"),
+    )
+    return np.maximum(np.maximum(ends[: len(low)], ends[len(low) :]), peaks)
+
+
+def envelope(acceleration: Union[array_like_1d, array_like_2d]) -> np.ndarray:
+    """Envelope (maximum at each frequency) of spectra with shape
+    (n_frequencies, n_spectra), eg. across nodes and analysis cases."""
+    sa = np.asarray(acceleration, dtype=float)
+    return sa if sa.ndim == 1 else sa.max(axis=1)
+
+
+def design_spectrum(
+    acceleration: Union[array_like_1d, array_like_2d],
+    frequency: array_like_1d,
+    fraction: float = BROADENING_FRACTION,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Envelope of the spectra, and the broadened envelope (see `broaden`).
+
+    Broadening is a maximum over a frequency window, so the broadened envelope is
+    also the envelope of the broadened spectra. Only the envelope is broadened.
+
+    Returns
+    -------
+    enveloped : ndarray
+        Envelope of the spectra.
+    broadened : ndarray
+        Broadened envelope of the spectra.
+    """
+    enveloped = envelope(acceleration)
+    return enveloped, broaden(enveloped, frequency, fraction)
+
+
+def write_design_spectrum(
+    path: str,
+    acceleration: Union[array_like_1d, array_like_2d],
+    frequency: array_like_1d,
+    fraction: float = BROADENING_FRACTION,
+    zeta: float = 0.05,
+    header: Optional[str] = None,
+) -> MotionSpectra:
+    """Write the envelope (S_a_envelope) and the broadened envelope (S_a_broadened)
+    of the spectra to a .csv file in the format of the autoRS RS output files (see
+    `design_spectrum` and `MotionSpectra.to_csv`). Returns the design spectra."""
+    spectra = MotionSpectra(
+        frequency,
+        np.column_stack(design_spectrum(acceleration, frequency, fraction)),
+        zeta=zeta,
+        column_names=["S_a_envelope", "S_a_broadened"],
+    )
+    if header is None:
+        header = (
+            "Design Spectrum Settings:\n"
+            + "zeta = ,{}\n".format(zeta)
+            + "broadening = ,{}\n".format(fraction)
+            + "Note: Acceleration units will match the input TH.\n\n"
+        )
+    spectra.to_csv(path, header=header)
+    return spectra
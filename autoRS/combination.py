@@ -0,0 +1,130 @@
+"""Combination of the spectra of the directional components of each node."""
+
+# %% Import required modules
+
+# Standard library imports
+import re
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from autoRS.typing import array_like_2d
+
+# %% Global variables
+
+GROUP_PATTERN: str = r"^[xyzXYZ]_(?P<node>.+)$"
+"""Default regular expression matching the component column names of a node. The
+named group 'node' identifies the node, eg. 'x_rbacceleration_@_1' is the x
+component of node 'rbacceleration_@_1' (LS-DYNA exports)."""
+
+PERCENTAGE_RULE_FACTOR: float = 0.4
+"""Factor applied to the other components by the 100-40-40 combination rule."""
+
+
+# %% Combination rules
+# Each function combines spectra with shape (n_frequencies, n_nodes, n_components)
+# along the last axis. Missing components are zero.
+
+
+def _srss(components: np.ndarray) -> np.ndarray:
+    """Square root of the sum of the squares."""
+    return np.sqrt(np.sum(components ** 2, axis=-1))
+
+
+def _percentage_rule(components: np.ndarray) -> np.ndarray:
+    """Maximum over the components of 100% of the component plus 40% of the others,
+    i.e. 60% of the largest component plus 40% of the sum of the components."""
+    return (1 - PERCENTAGE_RULE_FACTOR) * components.max(axis=-1) + (
+        PERCENTAGE_RULE_FACTOR * components.sum(axis=-1)
+    )
+
+
+COMBINATION_METHODS_DICT: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "srss": _srss,
+    "100-40-40": _percentage_rule,
+}
+"""Dictionary with the available directional combination rules."""
+
+COMBINATION_METHODS: Tuple[str, ...] = tuple(COMBINATION_METHODS_DICT)
+"""Available directional combination rules."""
+
+
+# %% Main functions
+
+
+def group_columns(
+    column_names: Sequence[str], pattern: str = GROUP_PATTERN
+) -> Dict[str, List[int]]:
+    """Group the indices of the `column_names` that match the regular expression
+    `pattern` by the value of its named group 'node'. Only nodes with two or more
+    components are returned."""
+    regex = re.compile(pattern)
+    if "node" not in regex.groupindex:
+        raise ValueError(f"Pattern '{pattern}' has no named group 'node'.")
+    groups: Dict[str, List[int]] = {}
+    for i, name in enumerate(column_names):
+        match = regex.search(name)
+        if match:
+            groups.setdefault(match.group("node"), []).append(i)
+    return {node: idx for node, idx in groups.items() if len(idx) > 1}
+
+
+def combine_spectra(
+    acceleration: array_like_2d,
+    column_names: Sequence[str],
+    methods: Sequence[str] = ("srss",),
+    pattern: str = GROUP_PATTERN,
+) -> Tuple[np.ndarray, List[str]]:
+    """Combine the spectra of the directional components of each node.
+
+    The columns are grouped by node with `group_columns`. The components of all the
+    nodes are gathered into a single (n_frequencies, n_nodes, n_components) array
+    (padded with zeros for nodes with fewer components), so each combination rule
+    is a single vectorized operation over all the nodes.
+
+    Parameters
+    ----------
+    acceleration : 2d array_like
+        Spectral accelerations with shape (n_frequencies, n_columns).
+    column_names : sequence of str
+        Name of each column of `acceleration`.
+    methods : sequence of str, optional
+        Combination rules (see `COMBINATION_METHODS`). Defaults to SRSS.
+    pattern : str, optional
+        Regular expression with a named group 'node' (see `GROUP_PATTERN`).
+
+    Returns
+    -------
+    combined : ndarray
+        Combined spectral accelerations with shape (n_frequencies, n_nodes x
+        n_methods).
+    combined_names : list of str
+        Names of the combined spectra, '<node>_<METHOD>'.
+    """
+    sa = np.asarray(acceleration, dtype=float)
+    if sa.ndim != 2 or sa.shape[1] != len(column_names):
+        raise ValueError("Spectra must have one column per column name.")
+    for method in methods:
+        if method not in COMBINATION_METHODS_DICT:
+            raise ValueError(
+                f"Combination method '{method}' is not one of {COMBINATION_METHODS}."
+            )
+
+    groups = group_columns(column_names, pattern)
+    if not groups:
+        return np.zeros((len(sa), 0)), []
+
+    # Index of each component of each node, or of an appended zero column
+    n_components = max(len(idx) for idx in groups.values())
+    idx = np.full((len(groups), n_components), sa.shape[1])
+    for i, columns in enumerate(groups.values()):
+        idx[i, : len(columns)] = columns
+    components = np.column_stack((sa, np.zeros(len(sa))))[:, idx]
+
+    combined = [COMBINATION_METHODS_DICT[method](components) for method in methods]
+    combined_names = [
+        "{}_{}".format(node, method.upper()) for method in methods for node in groups
+    ]
+    return np.column_stack(combined), combined_names
@@ -2,4 +2,4 @@
 
 # Local application imports
 from .table import FloatTable
-from .motion import MotionHistory, MotionSpectra
+from .motion import MotionHistory, MotionHistoryBatch, MotionSpectra
@@ -3,7 +3,9 @@ Motion Fourier Spectra"""
 # %% Import Necessary Modules
 
 # Standard library imports
-from typing import Tuple, Optional, Union, Collection
+import os
+import re
+from typing import Tuple, Optional, Union, Collection, Sequence, Iterator
 from abc import ABC, abstractmethod
 from copy import deepcopy, copy
 
@@ -11,9 +13,13 @@ from copy import deepcopy, copy
 import numpy as np
 
 # Local application imports
-from autoRS.typing import array_like_1d
-from autoRS.core.table import Table, FloatTable
-from autoRS.core.utils import cumulative_integral
+from autoRS.typing import array_like_1d, array_like_2d
+from autoRS.core.table import Table, FloatTable, SizeMismatchError, EmptyInputError
+from autoRS.core.utils import (
+    cumulative_integral,
+    integration_spacing,
+    loglog_interpolate,
+)
 
 # %% Abstract Class definitions
 
@@ -75,10 +81,6 @@ class Spectrum(ABC):
 
 # %% Main Class definitions
 
-# TODO: Add a TableIloc/TableView class that can be used to set
-#   act on specific parts of MotionTable components similar to np.ndarray
-#   indexing.
-
 
 class MotionHistory(MotionTable, TimeHistory):
     """Class representing a motion time history, including acceleration, velocity,
@@ -154,13 +156,11 @@ class MotionHistory(MotionTable, TimeHistory):
 
     @property
     def velocity(self) -> np.ndarray:
-        if np.isnan(self._table["velocity"][0]):
+        if np.isnan(self._table["velocity"][-1]):
             if self._last_updated == "displacement":
                 self._table["velocity"] = np.gradient(self.displacement, self.time)
             elif self._last_updated == "acceleration":
-                self._table["velocity"] = cumulative_integral(
-                    self.acceleration, self.time, method="trapezoidal",
-                )
+                self._integrate_missing("velocity", self._table["acceleration"])
         return copy(self._table["velocity"])
 
     @velocity.setter
@@ -171,10 +171,8 @@ class MotionHistory(MotionTable, TimeHistory):
 
     @property
     def displacement(self) -> np.ndarray:
-        if np.isnan(self._table["displacement"][0]) and self._last_updated is not None:
-            self._table["displacement"] = cumulative_integral(
-                self.velocity, self.time, method="trapezoidal",
-            )
+        if np.isnan(self._table["displacement"][-1]) and self._last_updated is not None:
+            self._integrate_missing("displacement", self.velocity)
         return copy(self._table["displacement"])
 
     @displacement.setter
@@ -183,6 +181,51 @@ class MotionHistory(MotionTable, TimeHistory):
         self._last_updated = "displacement"
         self.reset(skip_columns=("time", "displacement"))
 
+    def append(
+        self, acceleration: array_like_1d, time: Optional[array_like_1d] = None
+    ) -> None:
+        """Append a block of acceleration values (eg. from a sensor stream) to the
+        end of the motion. The table grows geometrically, so appending many small
+        blocks is cheap. Velocities and displacements of the new values are
+        integrated on the next access, continuing from the existing values.
+
+        Parameters
+        ----------
+        acceleration: array_like_1d
+            New acceleration values.
+        time: array_like_1d or None
+            Time values of the new accelerations. Defaults to continuing the current
+            timestep.
+        """
+        acceleration = np.asarray(acceleration, dtype=float).reshape(-1)
+        if self._table.shape[0] == 0:
+            self.acceleration = acceleration
+            if time is not None:
+                self.time = time
+            return
+        if self._last_updated != "acceleration":
+            raise ValueError("Only motions defined by acceleration can be appended.")
+
+        if time is None:
+            index = self._table.index
+            dt = index[-1] - index[-2] if len(index) > 1 else 1
+            time = index[-1] + dt * np.arange(1, len(acceleration) + 1)
+
+        rows = np.full((len(acceleration), len(self._motion_column_names)), np.nan)
+        rows[:, 0] = acceleration
+        self._table.append_rows(rows, index=time)
+
+    def window(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> "MotionHistory":
+        """Get a zero-copy, read-only view of the motion between the times `start`
+        and `end` (both inclusive). Eg. the strong-motion portion of a record. The
+        view keeps the original time values."""
+        self._compute_all()
+        return self._from_table(
+            self._table.loc[start:end], last_updated=self._last_updated
+        )
+
     def time_from_dt(self, dt: float, npts: Optional[int] = None):
         if npts is None:
             if self._table.shape[0] == 0:
@@ -204,32 +247,459 @@ class MotionHistory(MotionTable, TimeHistory):
             for col in column_set - set(skip_columns):
                 self._table[col] = np.ones(self._table.shape[0]) * np.nan
 
+    def _compute_all(self) -> None:
+        """Calculate any undefined motions so that the table has no NaN columns."""
+        if self._table.shape[0] == 0:
+            raise EmptyInputError()
+        for motion_type in self._motion_column_names:
+            if np.isnan(self._table[motion_type][-1]):
+                getattr(self, motion_type)
+
+    def _integrate_missing(self, motion_type: str, source: np.ndarray) -> None:
+        """Integrate `source` over time into the trailing NaN values of the
+        `motion_type` column (in-place). If the column already has values (eg. after
+        `append`), the integration continues from the last defined value."""
+        values = self._table[motion_type]
+        time = self._table.index
+        start = max(int(np.argmax(np.isnan(values))) - 1, 0)
+        values[start:] = cumulative_integral(
+            source[start:],
+            time[start:],
+            initial=0 if start == 0 else values[start],
+            method="trapezoidal",
+        )
+
+    @classmethod
+    def _from_table(
+        cls, table: TableClass, last_updated: Optional[str] = "acceleration"
+    ) -> "MotionHistory":
+        """Create a MotionHistory that wraps an existing motion table without
+        copying it. The table must have the acceleration, velocity, and displacement
+        columns (in that order) and a time index."""
+        motion = cls.__new__(cls)
+        motion._table = table
+        motion._last_updated = last_updated
+        return motion
+
+
+class MotionHistoryBatch(MotionTable, TimeHistory):
+    """Class representing many motion time histories that share a single time index.
+
+    The accelerations, velocities, and displacements of all records are each stored
+    as one 2D array of shape (n_time, n_records), so derived motions are calculated
+    for every record with a single vectorized integration/differentiation. The
+    `acceleration` array can be passed directly to
+    `autoRS.spectrum.response_spectrum` to generate all the spectra in one call.
+
+    Individual records are accessed by position or name (eg. `batch[0]`,
+    `batch["node_1"]`) as `MotionHistory` objects that share memory with the batch.
+    """
+
+    RecordClass = MotionHistory
+
+    def __init__(
+        self,
+        time: Optional[array_like_1d] = None,
+        acceleration: Optional[array_like_2d] = None,
+        velocity: Optional[array_like_2d] = None,
+        displacement: Optional[array_like_2d] = None,
+        dt: Optional[float] = None,
+        record_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Initialize the batch from one of acceleration, velocity, or displacement.
+
+        Parameters
+        ----------
+        time: array_like_1d or None
+            Time values shared by all the records. Defaults to 0, 1, 2 ... or a
+            range defined by `dt`.
+        acceleration, velocity, displacement: array_like_2d or None
+            Motion records with one record per column. Only the first defined input
+            (in the order acceleration, velocity, displacement) is used. The other
+            motions are calculated from it. 1D inputs are treated as a single record.
+        dt: float or None
+            Timestep used to generate `time` if `time` is not provided.
+        record_names: Sequence[str] or None
+            Names of the records. Defaults to ["Rec0", "Rec1", ...].
+        """
+
+        for motion_type, value in zip(
+            self._motion_column_names, (acceleration, velocity, displacement)
+        ):
+            if value is not None:
+                break
+        else:
+            raise ValueError("One of acceleration/velocity/displacement is required.")
+
+        value = np.asarray(value, dtype=float)
+        if value.ndim == 1:
+            value = value.reshape((-1, 1))
+        if value.ndim != 2 or value.size == 0:
+            raise EmptyInputError()
+
+        # Motions are stored as a single (3, n_time, n_records) array so that each
+        # motion type is a contiguous 2D block, and each record is a strided view.
+        self._motion = np.empty((3,) + value.shape)
+        self._motion[self._motion_column_names.index(motion_type)] = value
+        self._last_updated: str = motion_type
+        self._computed = {motion_type}
+
+        if time is not None:
+            time = np.asarray(time, dtype=float)
+        elif dt is not None:
+            time = np.arange(value.shape[0]) * dt
+        else:
+            time = np.arange(value.shape[0], dtype=float)
+        if len(time) != value.shape[0]:
+            raise SizeMismatchError(
+                f"Number of time values ({len(time)}) does not match number of "
+                f"rows in the records ({value.shape[0]})."
+            )
+        self._time = time
+        self._spacing = integration_spacing(time)
+
+        if record_names is None:
+            record_names = [f"Rec{i}" for i in range(value.shape[1])]
+        if len(record_names) != value.shape[1]:
+            raise SizeMismatchError(
+                f"{len(record_names)} record names provided for {value.shape[1]} "
+                f"records."
+            )
+        self._record_dict = {str(key): i for i, key in enumerate(record_names)}
+
+    @property
+    def table(self) -> FloatTable:
+        """Table of the acceleration records (one column per record)."""
+        return FloatTable(
+            raw_data=self.acceleration,
+            index=self.time,
+            column_names=self.record_names,
+            index_name=self._index_name,
+        )
+
+    @property
+    def time(self) -> np.ndarray:
+        return copy(self._time)
+
+    @property
+    def dt(self) -> float:
+        return self._time[1] - self._time[0]
+
+    @property
+    def record_names(self) -> Tuple[str, ...]:
+        return tuple(self._record_dict.keys())
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Number of time values and number of records."""
+        return self._motion.shape[1:]
+
+    @property
+    def acceleration(self) -> np.ndarray:
+        """Read-only (n_time, n_records) view of the acceleration records."""
+        return self._get_motion("acceleration")
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """Read-only (n_time, n_records) view of the velocity records."""
+        return self._get_motion("velocity")
+
+    @property
+    def displacement(self) -> np.ndarray:
+        """Read-only (n_time, n_records) view of the displacement records."""
+        return self._get_motion("displacement")
+
+    def __len__(self) -> int:
+        return self._motion.shape[2]
+
+    def __iter__(self) -> Iterator[MotionHistory]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, key: Union[int, str]) -> MotionHistory:
+        """Get a single record as a MotionHistory that shares memory with the
+        batch. The shared arrays are read-only, so setting a motion of the record
+        detaches (copies) the record from the batch."""
+        if isinstance(key, str):
+            try:
+                key = self._record_dict[key]
+            except KeyError:
+                raise KeyError(f"'{key}' not in record_names.")
+        elif not -len(self) <= key < len(self):
+            raise IndexError(f"Record {key} out of range for {len(self)} records.")
+
+        # Derived motions must exist before the view is handed out, otherwise the
+        # MotionHistory would replace (copy) the shared table on first access.
+        self._compute_all()
+        data = self._motion[:, :, key].T
+        data.flags.writeable = False
+        table = FloatTable._from_arrays(
+            data,
+            self._time,
+            column_names=self._motion_column_names,
+            index_name=self._index_name,
+        )
+        return self.RecordClass._from_table(table, last_updated=self._last_updated)
+
+    def window(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> "MotionHistoryBatch":
+        """Get a zero-copy, read-only view of all the records between the times
+        `start` and `end` (both inclusive)."""
+        self._compute_all()
+        rows = slice(
+            0 if start is None else int(np.searchsorted(self._time, start)),
+            None if end is None else int(np.searchsorted(self._time, end, "right")),
+        )
+        batch = copy(self)
+        batch._motion = self._motion[:, rows]
+        batch._motion.flags.writeable = False
+        batch._time = self._time[rows]
+        if np.ndim(self._spacing) > 0:
+            batch._spacing = integration_spacing(batch._time)
+        batch._computed = set(self._computed)
+        return batch
+
+    # Private Helper methods
+    def _get_motion(self, motion_type: str) -> np.ndarray:
+        if motion_type not in self._computed:
+            self._compute(motion_type)
+        view = self._motion[self._motion_column_names.index(motion_type)]
+        view.flags.writeable = False
+        return view
+
+    def _compute(self, motion_type: str) -> None:
+        acc, vel, disp = self._motion
+        if motion_type == "acceleration":
+            acc[:] = np.gradient(self.velocity, self._time, axis=0)
+        elif motion_type == "velocity":
+            if self._last_updated == "displacement":
+                vel[:] = np.gradient(disp, self._time, axis=0)
+            else:
+                cumulative_integral(
+                    acc, spacing=self._spacing, method="trapezoidal", out=vel
+                )
+        else:
+            cumulative_integral(
+                self.velocity, spacing=self._spacing, method="trapezoidal", out=disp
+            )
+        self._computed.add(motion_type)
+
+    def _compute_all(self) -> None:
+        for motion_type in self._motion_column_names:
+            if motion_type not in self._computed:
+                self._compute(motion_type)
+
 
 class MotionSpectra(MotionTable, Spectrum):
-    """Class representing a motion spectrum, including acceleration, velocity,
-    displacement, and an index with frequencies."""
+    """Class representing one or more motion response spectra, including spectral
+    accelerations (SA), pseudo-spectral velocities (PSV), spectral displacements (SD),
+    and an index with frequencies.
+
+    The spectral accelerations are stored as a single (n_frequencies, n_spectra)
+    table with one column per spectrum, so operations across many spectra (envelope,
+    ratio, scaling, interpolation) are vectorized. Each spectrum has its own critical
+    damping ratio. PSV and SD are derived from SA (using `self.w`) on first access.
+    """
 
     TableClass = FloatTable
+    _sa_header: str = "Frequency (Hz)"
 
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self,
+        frequency: array_like_1d,
+        acceleration: Union[array_like_1d, array_like_2d],
+        zeta: Union[float, array_like_1d] = 0.05,
+        column_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Initialize the spectra.
+
+        Parameters
+        ----------
+        frequency: array_like_1d
+            Increasing frequencies (Hz) shared by all the spectra.
+        acceleration: array_like_1d or array_like_2d
+            Spectral accelerations with shape (n_frequencies,) for a single spectrum
+            or (n_frequencies, n_spectra) for multiple spectra (eg. the output of
+            `autoRS.spectrum.response_spectrum`).
+        zeta: float or array_like_1d
+            Critical damping ratio of all the spectra, or of each spectrum.
+        column_names: Sequence[str] or None
+            Names of the spectra. Defaults to ["Col0", "Col1", ...].
+        """
+        self._table = self.TableClass(
+            raw_data=acceleration,
+            index=np.asarray(frequency, dtype=float),
+            column_names=column_names,
+            index_name=self._index_name,
+        )
+        zeta = np.asarray(zeta, dtype=float).flatten()
+        if len(zeta) == 1:
+            zeta = np.repeat(zeta, self._table.shape[1])
+        if len(zeta) != self._table.shape[1]:
+            raise SizeMismatchError(
+                f"{len(zeta)} damping ratios provided for {self._table.shape[1]} "
+                f"spectra."
+            )
+        self._zeta = zeta
+        self._derived = {}
 
     @property
     def frequency(self) -> np.ndarray:
-        return self.table.index
+        return copy(self._table.index)
+
+    @property
+    def zeta(self) -> np.ndarray:
+        """Critical damping ratio of each spectrum."""
+        return copy(self._zeta)
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        return self._table.column_names
 
     @property
     def table(self) -> TableClass:
-        return self.TableClass()
+        return deepcopy(self._table)
 
     @property
     def acceleration(self) -> np.ndarray:
-        pass
+        """Read-only (n_frequencies, n_spectra) array of spectral accelerations."""
+        view = self._table.data[:]
+        view.flags.writeable = False
+        return view
 
     @property
     def velocity(self) -> np.ndarray:
-        pass
+        """Read-only (n_frequencies, n_spectra) array of pseudo-spectral velocities."""
+        return self._get_derived("velocity", 1)
 
     @property
     def displacement(self) -> np.ndarray:
-        pass
+        """Read-only (n_frequencies, n_spectra) array of spectral displacements."""
+        return self._get_derived("displacement", 2)
+
+    def __len__(self) -> int:
+        return self._table.shape[1]
+
+    # Vectorized operations
+    def interpolate(self, frequency: array_like_1d) -> "MotionSpectra":
+        """Log-log interpolation of all the spectra onto new frequencies. Values
+        outside the current frequency range are held at the end values."""
+        frequency = np.asarray(frequency, dtype=float)
+        sa = loglog_interpolate(frequency, self._table.index, self._table.data)
+        return self._new(sa, frequency=frequency)
+
+    def scale(self, factor: Union[float, array_like_1d]) -> "MotionSpectra":
+        """Scale the spectra by a single factor or by one factor per spectrum."""
+        return self._new(self._table.data * np.asarray(factor, dtype=float))
+
+    def envelope(self, name: str = "Envelope") -> "MotionSpectra":
+        """Get the envelope (maximum) of all the spectra as a single spectrum. The
+        damping ratio of the envelope is NaN if the spectra damping ratios differ."""
+        zeta = self._zeta[0] if len(set(self._zeta)) == 1 else np.nan
+        return MotionSpectra(
+            self._table.index,
+            self._table.data.max(axis=1),
+            zeta=zeta,
+            column_names=[name],
+        )
+
+    def ratio(self, other: "MotionSpectra") -> "MotionSpectra":
+        """Get the ratio of these spectra to `other`. `other` is interpolated onto
+        the frequencies of these spectra. It must have a single spectrum, or the same
+        number of spectra."""
+        if len(other) not in (1, len(self)):
+            raise SizeMismatchError(
+                f"Cannot divide {len(self)} spectra by {len(other)} spectra."
+            )
+        if np.array_equal(other._table.index, self._table.index):
+            denominator = other._table.data
+        else:
+            denominator = other.interpolate(self._table.index)._table.data
+        return self._new(self._table.data / denominator)
+
+    @classmethod
+    def concatenate(cls, spectra: Sequence["MotionSpectra"]) -> "MotionSpectra":
+        """Combine multiple MotionSpectra objects into a single object on the
+        frequencies of the first one."""
+        frequency = spectra[0]._table.index
+        sa, zeta, names = [], [], []
+        for spectrum in spectra:
+            if not np.array_equal(spectrum._table.index, frequency):
+                spectrum = spectrum.interpolate(frequency)
+            sa.append(spectrum._table.data)
+            zeta.append(spectrum._zeta)
+            names.extend(spectrum.column_names)
+        if len(set(names)) != len(names):
+            names = None
+        return cls(frequency, np.hstack(sa), zeta=np.concatenate(zeta), column_names=names)
+
+    # Read/Write
+    def to_csv(self, path: str, header: Optional[str] = None) -> None:
+        """Write the spectral accelerations to a .csv file in the format of the
+        autoRS 'RS/*_RS.csv' output files.
+
+        Parameters
+        ----------
+        path: str
+            Path of the output .csv file.
+        header: str or None
+            Settings lines written between the file name and the data. Defaults to a
+            block that only lists the damping ratio(s).
+        """
+        if header is None:
+            header = (
+                "RS Settings:\n"
+                + "zeta = ,{}\n".format(self._zeta_string())
+                + "Note: Acceleration units will match the input TH.\n\n"
+            )
+        with open(path, "w", newline="") as file:
+            file.write(os.path.split(path)[-1])
+            file.write("\n" + header)
+            np.savetxt(
+                file,
+                np.column_stack((self._table.index, self._table.data)),
+                fmt="%.5f",
+                delimiter=",",
+                comments="",
+                header=",".join([self._sa_header, *self.column_names]),
+            )
+
+    @classmethod
+    def from_csv(cls, path: str) -> "MotionSpectra":
+        """Read spectra from an autoRS 'RS/*_RS.csv' output file."""
+        zeta = 0.05
+        with open(path, "r") as file:
+            for i, line in enumerate(file):
+                if line.startswith(cls._sa_header):
+                    column_names = line.strip().strip(",").split(",")[1:]
+                    break
+                match = re.search(r"^zeta *= *,(?P<value>.*)$", line.strip())
+                if match:
+                    zeta = [float(x) for x in match.group("value").split(",") if x]
+            else:
+                raise ValueError(f"No '{cls._sa_header}' header line in {path}.")
+        data = np.loadtxt(path, delimiter=",", skiprows=i + 1, ndmin=2)
+        return cls(data[:, 0], data[:, 1:], zeta=zeta, column_names=column_names)
+
+    # Private Helper methods
+    def _new(
+        self, acceleration: np.ndarray, frequency: Optional[np.ndarray] = None
+    ) -> "MotionSpectra":
+        if frequency is None:
+            frequency = self._table.index
+        return MotionSpectra(
+            frequency, acceleration, zeta=self._zeta, column_names=self.column_names,
+        )
+
+    def _get_derived(self, motion_type: str, power: int) -> np.ndarray:
+        if motion_type not in self._derived:
+            derived = self._table.data / (self.w.reshape((-1, 1)) ** power)
+            derived.flags.writeable = False
+            self._derived[motion_type] = derived
+        return self._derived[motion_type]
+
+    def _zeta_string(self) -> str:
+        if len(set(self._zeta)) == 1:
+            return "{}".format(self._zeta[0])
+        return ",".join("{}".format(zeta) for zeta in self._zeta)
@@ -2,9 +2,11 @@
 # %% Import Necessary Modules
 
 # Standard library imports
+import json
+import weakref
 from collections.abc import MutableMapping
 from abc import ABC, abstractmethod
-from typing import Tuple, Union, Dict, Optional, Iterator, Sequence
+from typing import Tuple, Union, Dict, List, Optional, Iterator, Sequence
 from copy import deepcopy
 
 # Third party imports
@@ -52,6 +54,20 @@ class Table(ABC, MutableMapping):
         pass
 
 
+# Columnar binary file format used by `FloatTable.save` and `FloatTable.open`:
+#   - 8 byte magic string, followed by the header length as a little-endian uint64.
+#   - JSON header with the column names, index name, dtypes, number of rows, and the
+#     byte offsets of the index and data blocks.
+#   - Index block, followed by the data block with each column stored contiguously
+#     (i.e. Fortran-ordered). Blocks start on `_FILE_ALIGNMENT` byte boundaries.
+_FILE_MAGIC = b"AUTORSFT"
+_FILE_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _FILE_ALIGNMENT) * _FILE_ALIGNMENT
+
+
 # TODO: Fill out all the docstrings
 
 
@@ -94,6 +110,15 @@ class FloatTable(Table):
         self._column_dict: Dict[str, int] = {}
         self._index_name: str = index_name
 
+        # Buffers with spare rows used by `append_rows`. `_data` and `_index` are
+        # views of the first rows of the buffers while the buffers are in use.
+        self._data_buffer: Optional[np.ndarray] = None
+        self._index_buffer: Optional[np.ndarray] = None
+
+        # Weak references to the `iloc`/`loc` views of `_data`, which must not see
+        # replaced columns
+        self._views: List[weakref.ref] = []
+
         # Validate column_names
         self._invalid_column_names.add(index_name)
         if column_names is not None and set(column_names).intersection(
@@ -226,9 +251,20 @@ class FloatTable(Table):
 
         new_data = self.data
         if key in self.column_names:
+            # Columns are replaced in place, unless the table has live views (eg.
+            # `iloc`/`loc` views and motion windows) or is read-only. The column is
+            # then written to a copy of the data, so that the views are unchanged.
+            # Writable memory-mapped tables (see `FloatTable.open`) are always
+            # written in place, so their columns are overwritten in the file.
             idx = self._column_dict[key]
-            new_data[:, idx] = value
-            self.data = new_data
+            shared = self._has_views() and not isinstance(new_data, np.memmap)
+            if self._data is not None and new_data.flags.writeable and not shared:
+                new_data[:, idx] = value
+            else:
+                new_data = new_data.copy(order="K")
+                new_data[:, idx] = value
+                self.data = new_data
+                self._views = []
         else:
             if new_data.size == 0:
                 new_data = value.reshape(-1, 1)
@@ -262,6 +298,19 @@ class FloatTable(Table):
         del self[key]
         return key, value
 
+    @property
+    def iloc(self) -> "TableIloc":
+        """Position based indexer that returns zero-copy, read-only views of the
+        table. Eg. `table.iloc[10:20]`, `table.iloc[:, 0]`, `table.iloc[::2, 1:3]`."""
+        return TableIloc(self)
+
+    @property
+    def loc(self) -> "TableLoc":
+        """Label based indexer that returns zero-copy, read-only views of the table.
+        Rows are selected by (inclusive) ranges of increasing index values and columns
+        by name. Eg. `table.loc[1.5:3.0]`, `table.loc[:, "a":"c"]`."""
+        return TableLoc(self)
+
     # Public methods
     def reset_index(self):
         if self.index is not None:
@@ -270,11 +319,234 @@ class FloatTable(Table):
             else:
                 self._index = np.arange(0, self.shape[0])
 
-    # TODO: add_row function
+    def append_rows(
+        self,
+        rows: Union[array_like_1d, array_like_2d],
+        index: Optional[array_like_1d] = None,
+    ) -> None:
+        """Append a block of rows to the end of the table (eg. data from a live
+        acquisition stream).
 
-    # TODO: iterrows iterator
+        Rows are written into spare capacity at the end of the table's buffers. The
+        capacity grows geometrically (doubling), so appending many small blocks only
+        reallocates the table O(log(n)) times. Existing views of the table remain
+        valid.
+
+        Parameters
+        ----------
+        rows: array_like_2d or array_like_1d
+            Rows with shape (n_rows, n_columns). 1D inputs are reshaped to
+            (-1, n_columns).
+        index: array_like_1d or None
+            Index values of the new rows. Defaults to continuing an integer index
+            from the last index value.
+        """
+        n_rows, n_columns = self.shape
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim == 1:
+            rows = rows.reshape(-1, n_columns) if n_columns else rows.reshape(1, -1)
+        if rows.size == 0:
+            raise EmptyInputError()
+        if n_columns and rows.shape[1] != n_columns:
+            raise SizeMismatchError(
+                f"Rows have {rows.shape[1]} columns. The table has {n_columns} columns."
+            )
+
+        if index is None:
+            start = self._index[-1] + 1 if n_rows else 0
+            index = start + np.arange(rows.shape[0])
+        index = np.asarray(index).reshape(-1)
+        if len(index) != rows.shape[0]:
+            raise SizeMismatchError(
+                f"{len(index)} index values provided for {rows.shape[0]} rows."
+            )
+
+        if self._data is None:
+            if n_rows:
+                raise SizeMismatchError("Cannot append rows to an index without data.")
+            self._index = None
+            self.data = rows
+            self._index = index
+            return
+
+        if n_rows + len(rows) > self._capacity(index.dtype):
+            self._grow(max(n_rows + len(rows), 2 * n_rows), index.dtype)
+
+        new_n_rows = n_rows + len(rows)
+        self._data_buffer[n_rows:new_n_rows] = rows
+        self._index_buffer[n_rows:new_n_rows] = index
+        self._data = self._data_buffer[:new_n_rows]
+        self._index = self._index_buffer[:new_n_rows]
+
+    def add_row(self, row: array_like_1d, index_value: Optional[float] = None) -> None:
+        """Append a single row to the end of the table (see `append_rows`)."""
+        self.append_rows(
+            np.reshape(row, (1, -1)), None if index_value is None else [index_value]
+        )
+
+    def iterrows(self) -> Iterator[Tuple[float, np.ndarray]]:
+        """Iterate over the rows of the table as (index value, row) pairs. Each row
+        is a read-only 1D view of the table data (no lists are created)."""
+        if self._data is None:
+            return
+        yield from zip(self._index, self.iloc[:].data)
+
+    def iterchunks(self, chunk_size: int) -> Iterator["FloatTable"]:
+        """Iterate over blocks of up to `chunk_size` rows. Each block is a zero-copy,
+        read-only view of the table (see `FloatTable.iloc`)."""
+        if self._data is None:
+            return
+        for start in range(0, self.shape[0], chunk_size):
+            yield self.iloc[start : start + chunk_size]
+
+    def save(self, path: str, metadata: Optional[dict] = None) -> None:
+        """Save the table to a columnar binary file that can be re-opened without
+        parsing or reading the whole file (see `FloatTable.open`). Each column is
+        written as one contiguous block after a small JSON header with the column
+        names, index name, dtypes, and any JSON-serializable `metadata` (see
+        `FloatTable.read_metadata`)."""
+        n_rows, n_columns = self.shape
+        index = np.zeros(0) if self._index is None else np.asarray(self._index)
+        dtype = np.dtype(float).newbyteorder("<")
+        index_dtype = index.dtype.newbyteorder("<")
+
+        header = {
+            "version": 1,
+            "column_names": list(self.column_names),
+            "index_name": self.index_name,
+            "dtype": dtype.str,
+            "index_dtype": index_dtype.str,
+            "n_rows": n_rows,
+            "has_data": self._data is not None,
+            "metadata": {} if metadata is None else metadata,
+        }
+        # The header length depends on the offsets, so reserve space for them first
+        offsets = {"index_offset": 0, "data_offset": 0}
+        header_size = len(json.dumps({**header, **offsets}).encode()) + 40
+        offsets["index_offset"] = _aligned(len(_FILE_MAGIC) + 8 + header_size)
+        offsets["data_offset"] = _aligned(
+            offsets["index_offset"] + n_rows * index_dtype.itemsize
+        )
+        header_bytes = json.dumps({**header, **offsets}).encode().ljust(header_size)
+
+        with open(path, "wb") as file:
+            file.write(_FILE_MAGIC)
+            file.write(np.uint64(header_size).astype("<u8").tobytes())
+            file.write(header_bytes)
+            file.seek(offsets["index_offset"])
+            file.write(index.astype(index_dtype).tobytes())
+            file.seek(offsets["data_offset"])
+            if self._data is not None:
+                for i in range(n_columns):
+                    file.write(self._data[:, i].astype(dtype).tobytes())
+            file.truncate()
+
+    @classmethod
+    def open(cls, path: str, mode: str = "r") -> "FloatTable":
+        """Open a table saved with `FloatTable.save`. The data and index are
+        memory-mapped (`np.memmap`), so only the header is read when the table is
+        opened. Values are read from disk as they are accessed.
+
+        Parameters
+        ----------
+        path: str
+            Path of the saved table.
+        mode: str
+            `np.memmap` mode. 'r' (default) opens a read-only table, 'r+' writes any
+            changes to the values back to the file, and 'c' keeps changes in memory.
+        """
+        header = cls._read_header(path)
+        n_rows = header["n_rows"]
+        n_columns = len(header["column_names"])
+        index, data = None, None
+        if n_rows:
+            index = np.memmap(
+                path,
+                dtype=header["index_dtype"],
+                mode=mode,
+                offset=header["index_offset"],
+                shape=(n_rows,),
+            )
+        if header["has_data"] and n_rows and n_columns:
+            data = np.memmap(
+                path,
+                dtype=header["dtype"],
+                mode=mode,
+                offset=header["data_offset"],
+                shape=(n_rows, n_columns),
+                order="F",
+            )
+        return cls._from_arrays(
+            data, index, header["column_names"], index_name=header["index_name"]
+        )
+
+    @classmethod
+    def read_metadata(cls, path: str) -> dict:
+        """Read the metadata saved with a table by `FloatTable.save`, without
+        opening the table."""
+        return cls._read_header(path).get("metadata", {})
 
     # Private Helper methods
+    @staticmethod
+    def _read_header(path: str) -> dict:
+        with open(path, "rb") as file:
+            if file.read(len(_FILE_MAGIC)) != _FILE_MAGIC:
+                raise ValueError(f"{path} is not a saved FloatTable.")
+            header_size = int(np.frombuffer(file.read(8), dtype="<u8")[0])
+            return json.loads(file.read(header_size).decode())
+
+    @classmethod
+    def _from_arrays(
+        cls,
+        data: np.ndarray,
+        index: np.ndarray,
+        column_names: Sequence[str],
+        index_name: str = "Index",
+    ) -> "FloatTable":
+        """Wrap existing 2D data and index arrays in a table without copying or
+        validating them. The table shares memory with the input arrays."""
+        table = cls.__new__(cls)
+        table._data = data
+        table._index = index
+        table._column_dict = {str(key): i for i, key in enumerate(column_names)}
+        table._index_name = index_name
+        table._data_buffer = None
+        table._index_buffer = None
+        table._views = []
+        return table
+
+    def __getstate__(self) -> dict:
+        # Weak references cannot be pickled, and the views are not pickled with
+        # the table anyway
+        return {**self.__dict__, "_views": []}
+
+    def _has_views(self) -> bool:
+        """Whether any `iloc`/`loc` view of the data is still alive."""
+        return any(ref() is not None for ref in self._views)
+
+    def _capacity(self, index_dtype: np.dtype) -> int:
+        """Number of rows that fit in the table buffers without reallocating. The
+        buffers are only in use if the data and index are still views of them, and
+        if the new index values can be stored without losing precision."""
+        if (
+            self._data_buffer is not None
+            and self._data.base is self._data_buffer
+            and self._index.base is self._index_buffer
+            and np.can_cast(index_dtype, self._index_buffer.dtype)
+        ):
+            return len(self._data_buffer)
+        self._data_buffer = self._index_buffer = None
+        return self.shape[0]
+
+    def _grow(self, capacity: int, index_dtype: np.dtype) -> None:
+        """Move the data and index to new buffers with room for `capacity` rows."""
+        n_rows = self.shape[0]
+        data_buffer = np.empty((capacity, self.shape[1]))
+        data_buffer[:n_rows] = self._data
+        index_buffer = np.empty(capacity, np.result_type(self._index, index_dtype))
+        index_buffer[:n_rows] = self._index
+        self._data_buffer, self._index_buffer = data_buffer, index_buffer
+
     @staticmethod
     def _parse_data_dict(
         raw_data: Dict[str, array_like_1d]
@@ -327,6 +599,103 @@ class FloatTable(Table):
             )
 
 
+# Table Indexers
+
+
+class TableIloc:
+    """Position based indexer for FloatTables (see `FloatTable.iloc`). Rows and
+    columns are selected with integers or slices so that the result is always a NumPy
+    view. Evenly-spaced sequences of columns are also accepted."""
+
+    def __init__(self, table: FloatTable) -> None:
+        self._table = table
+
+    def __getitem__(self, key) -> FloatTable:
+        rows, columns = key if isinstance(key, tuple) else (key, slice(None))
+        return self._view(self._row_slice(rows), self._column_slice(columns))
+
+    def _row_slice(self, rows: Union[int, slice]) -> slice:
+        return self._as_slice(rows, self._table.shape[0])
+
+    def _column_slice(self, columns) -> slice:
+        return self._as_slice(columns, self._table.shape[1])
+
+    @staticmethod
+    def _as_slice(key, length: int) -> slice:
+        """Convert an integer, slice, or evenly-spaced sequence of integers to a
+        slice. Only slices can index an array without copying it."""
+        if isinstance(key, slice):
+            return key
+        if isinstance(key, (int, np.integer)):
+            if not -length <= key < length:
+                raise IndexError(f"Index {key} is out of bounds for length {length}.")
+            key = key % length
+            return slice(key, key + 1)
+        positions = [int(x) % length for x in key]
+        if not positions:
+            raise EmptyInputError()
+        step = positions[1] - positions[0] if len(positions) > 1 else 1
+        if step <= 0 or positions != list(range(positions[0], positions[-1] + 1, step)):
+            raise IndexError(
+                "Selections must be evenly spaced and increasing to create a view."
+            )
+        return slice(positions[0], positions[-1] + 1, step)
+
+    def _view(self, rows: slice, columns: slice) -> FloatTable:
+        table = self._table
+        data = table._data[rows, columns]
+        data.flags.writeable = False
+        table._views = [ref for ref in table._views if ref() is not None]
+        table._views.append(weakref.ref(data))
+        index = table._index[rows]
+        index.flags.writeable = False
+        return FloatTable._from_arrays(
+            data,
+            index,
+            column_names=table.column_names[columns],
+            index_name=table.index_name,
+        )
+
+
+class TableLoc(TableIloc):
+    """Label based indexer for FloatTables (see `FloatTable.loc`). Rows are selected
+    by index values (assumed to be increasing, eg. time or frequency). Row slices
+    include both end points. Columns are selected by name."""
+
+    def _row_slice(self, rows) -> slice:
+        index = self._table.index
+        if isinstance(rows, slice):
+            start = 0 if rows.start is None else np.searchsorted(index, rows.start)
+            stop = (
+                len(index)
+                if rows.stop is None
+                else np.searchsorted(index, rows.stop, side="right")
+            )
+            return slice(int(start), int(stop), rows.step)
+        position = int(np.searchsorted(index, rows))
+        if position == len(index) or index[position] != rows:
+            raise KeyError(f"{rows} not in the table index.")
+        return slice(position, position + 1)
+
+    def _column_slice(self, columns) -> slice:
+        column_dict = self._table._column_dict
+        if isinstance(columns, slice):
+            start = None if columns.start is None else self._position(columns.start)
+            stop = None if columns.stop is None else self._position(columns.stop) + 1
+            return slice(start, stop, columns.step)
+        if isinstance(columns, str):
+            columns = [columns]
+        return self._as_slice(
+            [self._position(column) for column in columns], len(column_dict)
+        )
+
+    def _position(self, column: str) -> int:
+        try:
+            return self._table._column_dict[column]
+        except KeyError:
+            raise KeyError(f"'{column}' not in column_names.")
+
+
 # Table Exceptions
 
 
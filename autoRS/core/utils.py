@@ -4,7 +4,7 @@
 # %% Import libraries
 
 # Standard library imports
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, Optional, Tuple, Union
 
 # Third-party imports
 import numpy as np
@@ -16,68 +16,95 @@ from autoRS.typing import array_like_1d
 
 
 def _cumulative_trapezoidal(
-    y: np.ndarray, x: Optional[np.ndarray] = None, dx: float = 1, initial: float = 0,
+    y: np.ndarray,
+    dx: Union[float, np.ndarray] = 1,
+    initial: float = 0,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
-    """Trapezoidal integration of samples."""
+    """Trapezoidal integration of samples along the first axis. `dx` may be an array
+    of the (n - 1) steps between samples. Results are accumulated in `out`."""
 
-    if x is not None:
-        sub_integrals = np.diff(x) * (y[:-1] + y[1:]) / 2
-    else:
-        sub_integrals = dx * (y[:-1] + y[1:]) / 2
+    if out is None:
+        out = np.empty(y.shape)
+    if np.ndim(dx) > 0:
+        dx = np.reshape(dx, (-1,) + (1,) * (y.ndim - 1))
 
-    return np.cumsum(np.concatenate(([initial], sub_integrals)))
+    sub_integrals = out[1:]
+    np.add(y[:-1], y[1:], out=sub_integrals)
+    sub_integrals *= dx
+    sub_integrals /= 2
+
+    out[0] = initial
+    return np.cumsum(out, axis=0, out=out)
 
 
 def _cumulative_simpson_quad(
-    y: np.ndarray, dx: float = 1, initial: float = 0,
+    y: np.ndarray,
+    dx: float = 1,
+    initial: float = 0,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
-    """1/3 composite simpson's integration of samples.
-    Assumes equally-spaced intervals. Assumes length of y > 3."""
-
-    sub_integrals_fwd = dx / 3 * (5 * y[:-2] / 4 + 2 * y[1:-1] - y[2:] / 4)
-    sub_integrals_bwd = dx / 3 * (-y[:-2] / 4 + 2 * y[1:-1] + 5 * y[2:] / 4)
-
-    sub_integrals = np.concatenate(
-        (
-            [initial],
-            [sub_integrals_fwd[0]],
-            (sub_integrals_fwd[1:] + sub_integrals_bwd[:-1]) / 2,
-            [sub_integrals_bwd[-1]],
-        )
-    )
+    """1/3 composite simpson's integration of samples along the first axis.
+    Assumes equally-spaced intervals. Assumes length of y >= 3.
+
+    Each interval is integrated with the quadratics through the points on either
+    side of it. The first and last intervals only have a single quadratic. The
+    interior intervals average the two, which simplifies to
+    dx/24 * (-y[i-1] + 13y[i] + 13y[i+1] - y[i+2])."""
+
+    if out is None:
+        out = np.empty(y.shape)
 
-    return np.cumsum(sub_integrals)
+    out[0] = initial
+    out[1] = dx / 12 * (5 * y[0] + 8 * y[1] - y[2])
+    out[-1] = dx / 12 * (-y[-3] + 8 * y[-2] + 5 * y[-1])
+
+    # Interior intervals are evaluated in-place in the output array
+    sub_integrals = out[2:-1]
+    np.add(y[1:-2], y[2:-1], out=sub_integrals)
+    sub_integrals *= 13
+    sub_integrals -= y[:-3]
+    sub_integrals -= y[3:]
+    sub_integrals *= dx / 24
+
+    return np.cumsum(out, axis=0, out=out)
 
 
 def _cumulative_simpson_cubic(
-    y: np.ndarray, dx: float = 1, initial: float = 0,
+    y: np.ndarray,
+    dx: float = 1,
+    initial: float = 0,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
-    """3/8 composite simpson's integration of samples.
-    Assumes equally-spaced intervals. Assumes length of y > 4."""
+    """3/8 composite simpson's integration of samples along the first axis.
+    Assumes equally-spaced intervals. Assumes length of y >= 5.
 
-    sub_integrals_fwd = dx * (
-        3 * y[:-3] / 8 + 19 * y[1:-2] / 24 - 5 * y[2:-1] / 24 + y[3:] / 24
-    )
-    sub_integrals_mid = dx * (
-        (-y[:-3] / 24 + 13 * y[1:-2] / 24 + 13 * y[2:-1] / 24 - y[3:] / 24)
-    )
-    sub_integrals_bwd = dx * (
-        (y[:-3] / 24 - 5 * y[1:-2] / 24 + 19 * y[2:-1] / 24 + 3 * y[3:] / 8)
-    )
+    Each interval is integrated with all the cubics (through 4 consecutive points)
+    that include it, and the results are averaged. Interior intervals are covered by
+    3 cubics, which simplifies to
+    dx/72 * (y[i-2] - 6y[i-1] + 41y[i] + 41y[i+1] - 6y[i+2] + y[i+3])."""
 
-    sub_integrals = np.concatenate(
-        (
-            [initial],
-            [sub_integrals_fwd[0]],
-            [(sub_integrals_fwd[1] + sub_integrals_mid[0]) / 2],
-            (sub_integrals_fwd[2:] + sub_integrals_mid[1:-1] + sub_integrals_bwd[:-2])
-            / 3,
-            [(sub_integrals_bwd[-2] + sub_integrals_mid[-1]) / 2],
-            [sub_integrals_bwd[-1]],
-        )
-    )
+    if out is None:
+        out = np.empty(y.shape)
+
+    out[0] = initial
+    out[1] = dx / 24 * (9 * y[0] + 19 * y[1] - 5 * y[2] + y[3])
+    out[2] = dx / 48 * (-y[0] + 22 * y[1] + 32 * y[2] - 6 * y[3] + y[4])
+    out[-2] = dx / 48 * (y[-5] - 6 * y[-4] + 32 * y[-3] + 22 * y[-2] - y[-1])
+    out[-1] = dx / 24 * (y[-4] - 5 * y[-3] + 19 * y[-2] + 9 * y[-1])
+
+    # Interior intervals are evaluated in-place in the output array
+    sub_integrals = out[3:-2]
+    np.add(y[2:-3], y[3:-2], out=sub_integrals)
+    sub_integrals *= 41 / 6
+    sub_integrals -= y[1:-4]
+    sub_integrals -= y[4:-1]
+    sub_integrals *= 6
+    sub_integrals += y[:-5]
+    sub_integrals += y[5:]
+    sub_integrals *= dx / 72
 
-    return np.cumsum(sub_integrals)
+    return np.cumsum(out, axis=0, out=out)
 
 
 # Dictionary of integration options
@@ -88,40 +115,173 @@ integration_methods: Dict[str, Callable] = {
 }
 
 
+def integration_spacing(x: array_like_1d) -> Union[float, np.ndarray]:
+    """Get the spacing of the x values used by `cumulative_integral`. Returns the mean
+    step (float) if the values are equally-spaced (within 2%), or the array of steps
+    if they are not.
+
+    Repeated integrations over the same x values (eg. a shared time index) can pass
+    the result as `spacing` to skip re-checking the x values every time."""
+    steps = np.diff(np.asarray(x, dtype=float))
+    mean_step = np.mean(steps)
+    if np.std(steps) > 0.02 * mean_step:
+        return steps
+    return float(mean_step)
+
+
 def cumulative_integral(
     y: array_like_1d,
     x: Optional[array_like_1d] = None,
     dx: float = 1,
     initial: Optional[float] = 0,
     method: str = "simpson 1/3",
+    axis: int = 0,
+    out: Optional[np.ndarray] = None,
+    spacing: Optional[Union[float, np.ndarray]] = None,
 ) -> np.ndarray:
     """Numerical integration of input sequence (y)
     over an optional sequence of x values. Available methods are read from the
     `integration_methods` dictionary. The 1/3 composite simpson's rule is the default.
     The trapezoidal and 3/8 composite simpson's rule integration schemes are also
-     available."""
+     available. 2D inputs are integrated along `axis` (rows by default, matching the
+     layout of a `FloatTable`).
+
+    The result is written to `out` if it is provided (a float array with the same
+    shape as `y`). `spacing` is the output of `integration_spacing(x)`. It replaces
+    `x` and `dx`, and avoids re-checking the spacing of `x` on every call. The
+    trapezoidal method is used if the x values are not equally-spaced."""
 
     if method not in integration_methods.keys():
         method = "simpson 1/3"
 
-    y = np.asarray(y)
+    y = np.asarray(y, dtype=float)
+    npts = y.shape[axis]
 
-    if len(y) == 1:
+    if npts == 1:
         raise ValueError(
             "y must have 2 or more elements to be able to perform integration"
         )
-    elif len(y) == 2:
+    elif npts == 2:
         method = "trapezoidal"
-    elif len(y) == 3 and method == "simpson 3/8":
+    elif npts < 5 and method == "simpson 3/8":
         method = "simpson 1/3"
 
-    if x is not None:
+    if out is None:
+        out = np.empty(y.shape)
+    elif out.shape != y.shape:
+        raise ValueError("out must have the same shape as y.")
+
+    if spacing is None and x is not None:
         x = np.asarray(x)
-        if len(x) != len(y):
+        if len(x) != npts:
             raise ValueError("y and x must have the same length.")
-        if np.std(np.diff(x)) > 0.02 * np.mean(np.diff(x)):
-            return integration_methods["trapezoidal"](y, x=x, initial=initial)
-        else:
-            dx = np.mean(np.diff(x))
+        spacing = integration_spacing(x)
+
+    if spacing is not None:
+        if np.ndim(spacing) > 0:
+            if len(spacing) != npts - 1:
+                raise ValueError("spacing must have one less element than y.")
+            method = "trapezoidal"
+        dx = spacing
+
+    integration_methods[method](
+        np.moveaxis(y, axis, 0), dx=dx, initial=initial, out=np.moveaxis(out, axis, 0)
+    )
+    return out
+
+
+def log_interpolation_weights(
+    x: array_like_1d, xp: array_like_1d
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the indices and weights needed to linearly interpolate data defined at
+    increasing points `xp` onto the points `x` in log-space. Values outside of `xp`
+    are held at the end values (similar to `np.interp`).
+
+    The same indices/weights can be reused for any number of data sets defined on
+    `xp` (see `loglog_interpolate`)."""
+    log_x = np.log(np.asarray(x, dtype=float))
+    log_xp = np.log(np.asarray(xp, dtype=float))
+    if len(log_xp) == 1:
+        return np.zeros(len(log_x), dtype=int), np.zeros(len(log_x))
+    idx = np.clip(np.searchsorted(log_xp, log_x), 1, len(log_xp) - 1)
+    weights = (log_x - log_xp[idx - 1]) / (log_xp[idx] - log_xp[idx - 1])
+    return idx, np.clip(weights, 0, 1)
+
+
+def loglog_interpolate(
+    x: array_like_1d, xp: array_like_1d, fp: np.ndarray, axis: int = 0,
+) -> np.ndarray:
+    """Log-log linear interpolation of (positive) data `fp` defined at points `xp`
+    onto the points `x`. 2D data is interpolated along `axis` in a single vectorized
+    operation."""
+    idx, weights = log_interpolation_weights(x, xp)
+    log_fp = np.moveaxis(np.log(np.asarray(fp, dtype=float)), axis, 0)
+    if len(xp) == 1:
+        return np.moveaxis(np.exp(log_fp[idx]), 0, axis)
+    weights = weights.reshape((-1,) + (1,) * (log_fp.ndim - 1))
+    log_f = log_fp[idx - 1] * (1 - weights) + log_fp[idx] * weights
+    return np.moveaxis(np.exp(log_f), 0, axis)
+
+
+def sliding_maximum(
+    x: np.ndarray, window: int, step: int = 1, axis: int = 0,
+) -> np.ndarray:
+    """Maximum of `x` over the sliding windows ``x[i * step : i * step + window]``
+    along `axis` that fit within `x`.
+
+    Uses the van Herk/Gil-Werman algorithm: running maxima forwards and backwards
+    within blocks of `window` samples, so the cost is O(n) irrespective of the
+    window length."""
+    x = np.moveaxis(np.asarray(x), axis, 0)
+    n = len(x)
+    if window < 1 or step < 1:
+        raise ValueError("`window` and `step` must be positive integers.")
+    if window > n:
+        raise ValueError(f"`window` ({window}) is longer than the input ({n}).")
+
+    # Split into blocks of `window` samples. The padding never falls within a window
+    n_blocks = -(-n // window)
+    pad = [(0, n_blocks * window - n)] + [(0, 0)] * (x.ndim - 1)
+    blocks = np.pad(x, pad, mode="edge").reshape((n_blocks, window) + x.shape[1:])
+
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape((-1,) + x.shape[1:])
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]
+    suffix = suffix.reshape((-1,) + x.shape[1:])
+
+    starts = np.arange((n - window) // step + 1) * step
+    out = np.maximum(suffix[starts], prefix[starts + window - 1])
+    return np.moveaxis(out, 0, axis)
+
+
+def range_maximum(
+    x: np.ndarray, start: array_like_1d, stop: array_like_1d, axis: int = 0,
+) -> np.ndarray:
+    """Maximum of `x` over the ranges ``x[start[i] : stop[i]]`` along `axis`, for
+    ranges of any (varying) lengths. Empty ranges give -inf.
+
+    Uses a sparse table: the maxima over all the ranges of 2^k samples are found
+    with O(n log n) operations, and each range is covered by two (overlapping)
+    ranges of 2^k samples, so all the queries are answered in a single vectorized
+    operation."""
+    x = np.moveaxis(np.asarray(x, dtype=float), axis, 0)
+    start = np.asarray(start, dtype=int)
+    stop = np.asarray(stop, dtype=int)
+    n = len(x)
+    if np.any((start < 0) | (stop > n)):
+        raise ValueError("Ranges must be within the input.")
+
+    # table[k, i] = max(x[i : i + 2^k]), padded with -inf beyond the input
+    n_levels = max(int(n).bit_length(), 1)
+    table = np.full((n_levels,) + x.shape, -np.inf)
+    table[0] = x
+    for k in range(1, n_levels):
+        half = 2 ** (k - 1)
+        np.maximum(table[k - 1, :-half], table[k - 1, half:], out=table[k, :-half])
 
-    return integration_methods[method](y, dx=dx, initial=initial)
+    length = np.maximum(stop - start, 0)
+    k = np.maximum(np.floor(np.log2(np.maximum(length, 1))).astype(int), 0)
+    first = np.minimum(start, n - 1)
+    second = np.clip(stop - 2 ** k, 0, n - 1)
+    out = np.maximum(table[k, first], table[k, second])
+    out[length == 0] = -np.inf
+    return np.moveaxis(out, 0, axis)
@@ -0,0 +1,302 @@
+"""Cost model used to choose the fastest RS generation method for a time history."""
+
+# %% Import required modules
+
+# Standard library imports
+import json
+import os
+from timeit import repeat
+from typing import Dict, Optional, Sequence, Tuple
+
+# Third party imports
+import numpy as np
+from scipy.optimize import nnls
+
+# Local application imports
+from autoRS.spectrum import (
+    RS_METHODS_DICT,
+    FFT_SIZE_POLICIES_DICT,
+    get_default_frequencies,
+    get_fft_settings,
+    _fft_padding_classes,
+    _step_upsampling_factors,
+    _multirate_levels,
+    _multirate_samples_per_period,
+)
+
+# %% Global variables
+
+AUTO_METHOD: str = "auto"
+"""Setting value that selects the RS method with the lowest estimated cost."""
+
+COST_MODEL_FNAME: str = "RS_cost_model.json"
+"""File name of the calibrated cost model."""
+
+COST_MODEL_VERSION: int = 1
+"""Version of the cost model file format. Older files are recalibrated."""
+
+CALIBRATION_SIZES: Tuple[int, ...] = (1024, 8192)
+"""Time history lengths used by the calibration micro-benchmark."""
+
+FFT_SETTING_KEYS: Tuple[str, ...] = (
+    "fft_backend",
+    "fft_size_policy",
+    "fft_workers",
+    "fft_padding",
+)
+"""Keys of the FFT settings (in the order of `get_fft_settings`) saved with a cost
+model. The model is recalibrated if any of them change."""
+
+EXACT_METHODS: Tuple[str, ...] = ("fft", "shake")
+"""RS methods that are chosen automatically by default. The 'multirate' method is
+approximate, so it is only chosen if requested (see `choose_method`)."""
+
+_cost_models: Dict[str, dict] = {}
+
+
+def get_cache_directory() -> str:
+    """User cache directory of autoRS: '%LOCALAPPDATA%/autoRS' on Windows, or
+    '$XDG_CACHE_HOME/autoRS' (defaults to '~/.cache/autoRS') on other systems."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "autoRS")
+
+
+COST_MODEL_PATH: str = os.path.join(get_cache_directory(), COST_MODEL_FNAME)
+"""Default path of the calibrated cost model, in the user cache directory (so it
+does not depend on the working directory)."""
+
+
+# %% Work estimates
+# Each function estimates the number of elementary operations of an RS method for
+# a time history with `n` samples at timestep `dt`, for the oscillators at `frqs`,
+# using the same padding/up-sampling/decimation choices as the method itself. The
+# keyword arguments of the RS method (eg. `upsample`) are passed through, and
+# those that do not change its work are ignored.
+
+
+def _fft_work(
+    n: int,
+    dt: float,
+    frqs: np.ndarray,
+    zeta: float,
+    fft_size_policy: Optional[str] = None,
+    fft_padding: Optional[str] = None,
+    **kwargs,
+) -> float:
+    _, size_policy, _, padding = get_fft_settings(
+        size_policy=fft_size_policy, padding=fft_padding
+    )
+    size_func = FFT_SIZE_POLICIES_DICT[size_policy]
+    work = 0.0
+    w = 2 * np.pi * frqs
+    for n_pad, group in _fft_padding_classes(n, dt, w, zeta, padding, size_policy):
+        n_fft = size_func(n_pad)
+        work += n_fft * np.log2(n_fft) + len(group) * 8 * n_fft * np.log2(8 * n_fft)
+    return work
+
+
+def _step_work(
+    n: int, dt: float, frqs: np.ndarray, zeta: float, upsample: bool = True, **kwargs
+) -> float:
+    if not upsample:
+        return float(n * len(frqs))
+    return float(np.sum(n * _step_upsampling_factors(dt, frqs, zeta)))
+
+
+def _multirate_work(
+    n: int,
+    dt: float,
+    frqs: np.ndarray,
+    zeta: float,
+    samples_per_period: Optional[float] = None,
+    **kwargs,
+) -> float:
+    if samples_per_period is None:
+        samples_per_period = _multirate_samples_per_period(zeta)
+    levels = _multirate_levels(n, dt, frqs, samples_per_period)
+
+    # Each decimation by 2 filters all the samples of the previous level
+    decimation = sum(n / 2 ** (level - 1) for level in range(1, levels.max() + 1))
+    return float(np.sum(n / 2.0 ** levels) + 8 * decimation)
+
+
+WORK_FUNCTIONS = {
+    "fft": _fft_work,
+    "shake": _step_work,
+    "multirate": _multirate_work,
+}
+"""Dictionary with the work estimate of each RS method that can be chosen
+automatically."""
+
+
+# %% Cost model functions
+
+
+def _features(
+    method: str,
+    n: int,
+    dt: float,
+    frqs: np.ndarray,
+    zeta: float,
+    n_records: int = 1,
+    **kwargs,
+) -> np.ndarray:
+    """Cost model features: number of oscillators (per oscillator overhead), and
+    the total work for all records. `kwargs` are the keyword arguments of the RS
+    method."""
+    work = WORK_FUNCTIONS[method](n, dt, frqs, zeta, **kwargs)
+    return np.array([len(frqs), n_records * work])
+
+
+def _fft_settings() -> Dict[str, object]:
+    """The FFT settings (see `get_fft_settings`) that a cost model is calibrated
+    for."""
+    return dict(zip(FFT_SETTING_KEYS, get_fft_settings()))
+
+
+def calibrate(
+    path: Optional[str] = None,
+    sizes: Sequence[int] = CALIBRATION_SIZES,
+    zeta: float = 0.05,
+) -> dict:
+    """Time each RS method on random time histories of the given `sizes`, fit the
+    cost model coefficients (s per oscillator, s per unit of work), and save the
+    cost model to `path` (defaults to `COST_MODEL_PATH`).
+
+    Returns
+    -------
+    model : dict
+        The cost model, with the FFT settings it was calibrated for and the
+        coefficients of each method.
+    """
+    path = COST_MODEL_PATH if path is None else path
+    print("Calibrating RS method cost model...")
+    rng = np.random.default_rng(0)
+    dt = 0.005
+    frqs = get_default_frequencies(high_frequency=True)
+
+    coefficients = {}
+    for method in WORK_FUNCTIONS:
+        rs_func = RS_METHODS_DICT[method]
+        features, times = [], []
+        for n in sizes:
+            acc = rng.standard_normal(n)
+            time = np.arange(n) * dt
+            for frq_subset in (frqs, frqs[::4]):
+                times.append(
+                    min(
+                        repeat(
+                            lambda: rs_func(acc, time, frq_subset, zeta),
+                            number=1,
+                            repeat=2,
+                        )
+                    )
+                )
+                features.append(_features(method, n, dt, frq_subset, zeta))
+        fit = nnls(np.array(features), np.array(times))[0]
+        coefficients[method] = [float(c) for c in fit]
+
+    model = {
+        "version": COST_MODEL_VERSION,
+        **_fft_settings(),
+        "coefficients": coefficients,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(model, file, indent=2)
+    _cost_models[path] = model
+    return model
+
+
+def _is_valid(model: dict) -> bool:
+    """Check that a cost model matches the current version, FFT settings, and RS
+    methods."""
+    return (
+        model.get("version") == COST_MODEL_VERSION
+        and all(model.get(key) == value for key, value in _fft_settings().items())
+        and set(model.get("coefficients", {})) == set(WORK_FUNCTIONS)
+    )
+
+
+def load_cost_model(path: Optional[str] = None) -> dict:
+    """Load the cost model saved at `path` (defaults to `COST_MODEL_PATH`). The
+    model is calibrated (and saved) if the file does not exist, or if it was
+    calibrated for different FFT settings or RS methods."""
+    path = COST_MODEL_PATH if path is None else path
+    model = _cost_models.get(path)
+    if model is not None and _is_valid(model):
+        return model
+
+    if os.path.isfile(path):
+        try:
+            with open(path, "r") as file:
+                model = json.load(file)
+        except ValueError:
+            model = {}
+        if _is_valid(model):
+            _cost_models[path] = model
+            return model
+
+    return calibrate(path)
+
+
+def estimate_cost(
+    method: str,
+    n: int,
+    dt: float,
+    frqs: np.ndarray,
+    zeta: float = 0.05,
+    n_records: int = 1,
+    model: Optional[dict] = None,
+    **kwargs,
+) -> float:
+    """Estimate the time in s taken by an RS `method` for `n_records` time histories
+    with `n` samples at timestep `dt`, for the oscillators at `frqs`. Uses the
+    cost model from `load_cost_model` if `model` is not given. `kwargs` are the
+    keyword arguments the RS method is called with (eg. `upsample` for the 'shake'
+    method)."""
+    if model is None:
+        model = load_cost_model()
+    coefficients = np.array(model["coefficients"][method])
+    frqs = np.asarray(frqs)
+    features = _features(method, n, dt, frqs, zeta, n_records, **kwargs)
+    return float(coefficients @ features)
+
+
+def choose_method(
+    n: int,
+    dt: float,
+    frqs: np.ndarray,
+    zeta: float = 0.05,
+    n_records: int = 1,
+    model: Optional[dict] = None,
+    methods: Sequence[str] = EXACT_METHODS,
+    method_kwargs: Optional[Dict[str, dict]] = None,
+) -> Tuple[str, float]:
+    """Choose the RS method with the lowest estimated cost (see `estimate_cost`)
+    out of `methods`. By default, only the exact methods are considered, so the
+    choice does not change the accuracy of the results. Pass
+    `methods=tuple(WORK_FUNCTIONS)` to also consider the approximate 'multirate'
+    method. `method_kwargs` has the keyword arguments of each method, eg.
+    ``{"shake": {"upsample": False}}``.
+
+    Returns
+    -------
+    method : str
+        The RS method with the lowest estimated cost.
+    cost : float
+        The estimated time in s.
+    """
+    if model is None:
+        model = load_cost_model()
+    method_kwargs = method_kwargs or {}
+    costs = {
+        method: estimate_cost(
+            method, n, dt, frqs, zeta, n_records, model, **method_kwargs.get(method, {})
+        )
+        for method in methods
+    }
+    method = min(costs, key=costs.get)
+    return method, costs[method]
@@ -0,0 +1,272 @@
+"""Fourier amplitude spectra and power spectral densities of acceleration records."""
+
+# %% Import required modules
+
+# Standard library imports
+import os
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+# Third party imports
+import numpy as np
+import scipy.fft
+from scipy import sparse
+from scipy.signal import welch
+
+# Local application imports
+from autoRS.typing import array_like_1d, array_like_2d
+from autoRS.spectrum import (
+    FFT_BACKENDS_DICT,
+    FFT_SIZE_POLICIES_DICT,
+    get_fft_settings,
+)
+
+# %% Global variables
+
+PSD_METHODS: Tuple[str, ...] = ("periodogram", "welch")
+"""Available power spectral density estimates."""
+
+WELCH_SEGMENT_LENGTH: int = 1024
+"""Default number of samples per segment of Welch's PSD estimate (segments overlap
+by 50%)."""
+
+KO_BANDWIDTH: float = 40.0
+"""Default bandwidth coefficient b of the Konno-Ohmachi smoothing window."""
+
+KO_POINTS_PER_DECADE: int = 100
+"""Points per decade of the default (log-spaced) frequencies of smoothed spectra."""
+
+KO_WINDOW_LIMIT: float = 10.0
+"""The Konno-Ohmachi window is truncated where b x |log10(f / fc)| exceeds this
+limit. Beyond it, the window is below 1e-4 of its central value."""
+
+KO_CACHE_SIZE: int = 16
+"""Maximum number of cached Konno-Ohmachi smoothing matrices."""
+
+_FOURIER_HEADER: str = "Frequency (Hz)"
+
+_ko_matrices: Dict[tuple, sparse.csr_matrix] = {}
+
+
+# %% Main functions
+
+
+def get_transform(
+    acc: Union[array_like_1d, array_like_2d],
+    fft_cache: Optional[dict] = None,
+    fft_backend: Optional[str] = None,
+    fft_size_policy: Optional[str] = None,
+    fft_workers: Optional[int] = None,
+) -> Tuple[np.ndarray, int]:
+    """Get the (zero padded) real FFT of `acc` along axis 0.
+
+    The shortest transform in `fft_cache` (eg. filled by the 'fft' RS method, see
+    `autoRS.spectrum._fft_rs`) is reused. Otherwise, the record is transformed with
+    the given FFT settings and the transform is added to `fft_cache`, so the
+    transform is only computed once for all the products of a record.
+
+    Returns
+    -------
+    xgfft : ndarray
+        The transform.
+    n_fft : int
+        The padded length of the transform.
+    """
+    if fft_cache:
+        n_fft = min(fft_cache)
+        return fft_cache[n_fft], n_fft
+
+    acc = np.asarray(acc)
+    backend, size_policy, workers, padding = get_fft_settings(
+        fft_backend, fft_size_policy, fft_workers
+    )
+    rfft, irfft = FFT_BACKENDS_DICT[backend]
+    n_fft = FFT_SIZE_POLICIES_DICT[size_policy](len(acc))
+    xgfft = rfft(acc, n_fft, axis=0, workers=workers)
+    if fft_cache is not None:
+        fft_cache[n_fft] = xgfft
+    return xgfft, n_fft
+
+
+def fourier_spectra(
+    acc: Union[array_like_1d, array_like_2d],
+    dt: float,
+    psd_method: str = "periodogram",
+    segment_length: Optional[int] = None,
+    fft_cache: Optional[dict] = None,
+    **kwargs,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Generate the Fourier amplitude spectrum (FAS) and the one-sided power spectral
+    density (PSD) of acceleration records (one per column for 2D inputs).
+
+    Parameters
+    ----------
+    acc : 1d or 2d array_like
+        Acceleration time history(s) with timestep `dt`.
+    dt : float
+        Timestep (s).
+    psd_method : str, optional
+        'periodogram' (default) computes the PSD from the same transform as the FAS.
+        'welch' averages the periodograms of 50% overlapping Hann-windowed segments
+        of `segment_length` samples, which reduces the variance of the estimate at
+        the cost of frequency resolution.
+    segment_length : int, optional
+        Samples per segment of the 'welch' PSD. Defaults to `WELCH_SEGMENT_LENGTH`
+        (at most the record length).
+    fft_cache : dict, optional
+        Transforms of `acc` shared with other products (see `get_transform`).
+    **kwargs
+        FFT settings (`fft_backend`, `fft_size_policy`, and `fft_workers`) used if
+        no cached transform is available.
+
+    Returns
+    -------
+    fas : ndarray
+        Fourier amplitude spectrum, |FFT| x dt (units of acc x s).
+    fas_frqs : ndarray
+        Frequencies (Hz) of the FAS. The record is zero padded to the transform
+        length, which interpolates the spectrum.
+    psd : ndarray
+        One-sided PSD (units of acc^2 / Hz), so that its integral over frequency is
+        the mean square of the record.
+    psd_frqs : ndarray
+        Frequencies (Hz) of the PSD.
+    """
+    if psd_method not in PSD_METHODS:
+        raise ValueError(f"PSD method '{psd_method}' is not one of {PSD_METHODS}.")
+    acc = np.asarray(acc)
+    n = len(acc)
+
+    xgfft, n_fft = get_transform(acc, fft_cache, **kwargs)
+    frqs = scipy.fft.rfftfreq(n_fft, d=dt)
+    fas = np.abs(xgfft) * dt
+
+    if psd_method == "periodogram":
+        # Double all terms except DC (and Nyquist, for even transform lengths)
+        psd = fas ** 2 * 2 / (n * dt)
+        psd[0] /= 2
+        if n_fft % 2 == 0:
+            psd[-1] /= 2
+        return fas, frqs, psd, frqs
+
+    nperseg = min(n, WELCH_SEGMENT_LENGTH if segment_length is None else segment_length)
+    psd_frqs, psd = welch(acc, fs=1 / dt, nperseg=nperseg, axis=0, detrend=False)
+    return fas, frqs, psd, psd_frqs
+
+
+def get_smoothing_frequencies(
+    frqs: array_like_1d, points_per_decade: int = KO_POINTS_PER_DECADE
+) -> np.ndarray:
+    """Log-spaced frequencies spanning the positive frequencies in `frqs`."""
+    frqs = np.asarray(frqs, dtype=float)
+    positive = frqs[frqs > 0]
+    low, high = np.log10(positive.min()), np.log10(positive.max())
+    n = max(int(np.ceil((high - low) * points_per_decade)) + 1, 2)
+    return np.logspace(low, high, n)
+
+
+def konno_ohmachi_matrix(
+    frqs: array_like_1d, smooth_frqs: array_like_1d, bandwidth: float = KO_BANDWIDTH
+) -> sparse.csr_matrix:
+    """Sparse matrix of Konno-Ohmachi smoothing weights, so that the spectra at
+    `smooth_frqs` are the matrix product with the spectra at `frqs`.
+
+    Row i holds the window W(f) = [sin(x) / x]^4, with x = b x log10(f / fc) and
+    fc = smooth_frqs[i], at the (increasing) input frequencies `frqs`, normalized
+    to a unit sum. The window only depends on f / fc, so it only covers the input
+    frequencies within a fixed log-frequency distance of fc (see `KO_WINDOW_LIMIT`).
+    The number of weights grows linearly with the number of input frequencies,
+    instead of the n_frqs x n_smooth_frqs weights of a direct evaluation. Zero
+    frequency inputs are ignored.
+
+    The matrices are cached for each set of input frequencies, output frequencies,
+    and bandwidth, so they are only computed once for all the spectra of a run.
+    """
+    frqs = np.asarray(frqs, dtype=float)
+    smooth_frqs = np.asarray(smooth_frqs, dtype=float)
+    key = (frqs.tobytes(), smooth_frqs.tobytes(), float(bandwidth))
+    if key in _ko_matrices:
+        return _ko_matrices[key]
+
+    if np.any(np.diff(frqs) <= 0):
+        raise ValueError("Input frequencies must be increasing.")
+    if not (np.all(smooth_frqs > 0) and bandwidth > 0):
+        raise ValueError("Output frequencies and bandwidth must be positive.")
+
+    # Input frequencies within the window of each output frequency
+    positive = np.flatnonzero(frqs > 0)
+    log_frqs = np.log10(frqs[positive])
+    log_smooth = np.log10(smooth_frqs)
+    half_width = KO_WINDOW_LIMIT / bandwidth
+    start = np.searchsorted(log_frqs, log_smooth - half_width, side="left")
+    counts = np.searchsorted(log_frqs, log_smooth + half_width, side="right") - start
+    rows = np.repeat(np.arange(len(smooth_frqs)), counts)
+    first = np.cumsum(counts) - counts
+    columns = np.arange(counts.sum()) + np.repeat(start - first, counts)
+
+    # np.sinc(x / pi) = sin(x) / x
+    weights = np.sinc(bandwidth * (log_frqs[columns] - log_smooth[rows]) / np.pi) ** 4
+    weights /= np.bincount(rows, weights, minlength=len(smooth_frqs))[rows]
+    matrix = sparse.csr_matrix(
+        (weights, (rows, positive[columns])), shape=(len(smooth_frqs), len(frqs))
+    )
+
+    if len(_ko_matrices) >= KO_CACHE_SIZE:
+        del _ko_matrices[next(iter(_ko_matrices))]
+    _ko_matrices[key] = matrix
+    return matrix
+
+
+def konno_ohmachi_smoothing(
+    spectra: Union[array_like_1d, array_like_2d],
+    frqs: array_like_1d,
+    smooth_frqs: Optional[array_like_1d] = None,
+    bandwidth: float = KO_BANDWIDTH,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Smooth spectra (eg. FAS, one per column for 2D inputs) defined at the
+    increasing frequencies `frqs` with the Konno-Ohmachi window of bandwidth
+    coefficient `bandwidth`.
+
+    The smoothed spectra are evaluated at `smooth_frqs`, which default to
+    `get_smoothing_frequencies(frqs)`. All the spectra are smoothed with a single
+    product with the (cached) sparse matrix from `konno_ohmachi_matrix`. Output
+    frequencies without input frequencies within the window are set to zero. Near
+    the lowest input frequencies, the main lobe of the window (fc x 10^(+/-pi/b))
+    may not span any input frequency, so the smoothed values are less meaningful.
+
+    Returns
+    -------
+    smoothed : ndarray
+        The smoothed spectra.
+    smooth_frqs : ndarray
+        Frequencies (Hz) of the smoothed spectra.
+    """
+    spectra = np.asarray(spectra)
+    if len(spectra) != len(frqs):
+        raise ValueError("Spectra must have one row per frequency.")
+    if smooth_frqs is None:
+        smooth_frqs = get_smoothing_frequencies(frqs)
+    matrix = konno_ohmachi_matrix(frqs, smooth_frqs, bandwidth)
+    return matrix @ spectra, np.asarray(smooth_frqs, dtype=float)
+
+
+def write_fourier_csv(
+    path: str,
+    frqs: np.ndarray,
+    values: np.ndarray,
+    column_names: Sequence[str],
+    header: str = "",
+) -> None:
+    """Write Fourier spectra (one per column of `values`) at the frequencies `frqs`
+    to a .csv file in the layout of the autoRS RS output files: the file name, the
+    `header` lines, the column titles, and the data."""
+    with open(path, "w", newline="") as file:
+        file.write(os.path.split(path)[-1])
+        file.write("\n" + header)
+        np.savetxt(
+            file,
+            np.column_stack((frqs, values)),
+            fmt="%.6e",
+            delimiter=",",
+            header=",".join([_FOURIER_HEADER] + list(column_names)),
+            comments="",
+        )
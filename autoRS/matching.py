@@ -0,0 +1,332 @@
+"""Spectral matching of acceleration time histories to a target response spectrum."""
+
+# %% Import required modules
+
+# Standard library imports
+from time import perf_counter
+from typing import Optional, Tuple
+
+# Third party imports
+import numpy as np
+import scipy.fft
+
+# Local application imports
+from autoRS.typing import array_like_1d
+from autoRS.spectrum import (
+    FFT_BACKENDS_DICT,
+    FFT_SIZE_POLICIES_DICT,
+    get_default_frequencies,
+    get_fft_settings,
+    _fft_padding_classes,
+)
+
+# %% Global variables
+
+MATCH_TOLERANCE: float = 0.05
+"""Default relative tolerance of the matched spectrum at every frequency."""
+
+MATCH_MAX_ITERATIONS: int = 20
+"""Default maximum number of matching iterations."""
+
+MATCH_OVERSAMPLING: int = 4
+"""Up-sampling factor of the response histories used to find the peak responses."""
+
+MATCH_PEAK_CANDIDATES: int = 4
+"""Number of local maxima of each up-sampled response history that are refined to
+find the peak response (see `_refined_peaks`)."""
+
+MATCH_UPDATE_FRACTION: float = 0.1
+"""Oscillators are only re-evaluated after an adjustment if the estimated relative
+change of their response exceeds this fraction of the matching tolerance."""
+
+
+# %% Utility functions
+
+
+def _refined_peaks(a: np.ndarray, block: int) -> np.ndarray:
+    """Peak values of the up-sampled histories `a` (>= 0) along axis 1.
+
+    The maxima of the `MATCH_PEAK_CANDIDATES` blocks of `block` samples with the
+    largest values are refined with a parabola through the 3 samples around them,
+    and the largest refined value is returned. Refining more than one candidate
+    avoids missing a peak that falls between the samples of a history."""
+    n_rows, n = a.shape
+    blocks = a.reshape(n_rows, n // block, block)
+    block_max = a[:, ::block].copy()
+    for i in range(1, block):
+        np.maximum(block_max, a[:, i::block], out=block_max)
+    n_candidates = min(MATCH_PEAK_CANDIDATES, block_max.shape[1])
+    j = np.argpartition(block_max, -n_candidates, axis=1)[:, -n_candidates:]
+    k = j * block + np.argmax(np.take_along_axis(blocks, j[:, :, None], axis=1), 2)
+
+    y0 = np.take_along_axis(a, k - 1, axis=1)
+    y1 = np.take_along_axis(a, k, axis=1)
+    y2 = np.take_along_axis(a, (k + 1) % n, axis=1)
+    curvature = y0 - 2 * y1 + y2
+    refine = (y1 >= y0) & (y1 >= y2) & (curvature < 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        peaks = np.where(refine, y1 - (y0 - y2) ** 2 / (8 * curvature), y1)
+    return peaks.max(axis=1)
+
+
+# %% Class definitions
+
+
+class SpectralMatcher:
+    """Iterative frequency domain spectral matching of a single acceleration record.
+
+    The record and its Fourier transforms (one per padding class of the 'fft' RS
+    method, see `autoRS.spectrum._fft_padding_classes`) are kept together with the
+    oscillator transfer functions, so each iteration only needs:
+
+    - One forward and inverse FFT to apply the adjustment to the record.
+    - One forward FFT per padding class to update the resident transforms.
+    - Inverse FFTs for the oscillators whose response is affected by the
+      adjustment. The change of each oscillator's response history is bounded by
+      the sum of the amplitude changes of its Fourier terms, and the oscillators
+      with a negligible change (accumulated over the adjustments) keep their
+      previous spectral acceleration until the final check.
+    """
+
+    def __init__(
+        self,
+        acc: array_like_1d,
+        time: array_like_1d,
+        frqs: Optional[array_like_1d] = None,
+        zeta: float = 0.05,
+        fft_backend: Optional[str] = None,
+        fft_size_policy: Optional[str] = None,
+        fft_workers: Optional[int] = None,
+        fft_padding: Optional[str] = None,
+    ) -> None:
+        """Set up the resident frequency domain representation of the record.
+
+        Parameters
+        ----------
+        acc : 1d array_like
+            Acceleration time history of the record.
+        time : 1d array_like
+            Uniformly spaced time values of `acc`.
+        frqs : 1d array_like, optional
+            Oscillator frequencies (Hz) of the spectrum. Defaults to the default RS
+            frequencies (see `autoRS.spectrum.get_default_frequencies`).
+        zeta : float, optional
+            Critical damping ratio. Defaults to 0.05.
+        fft_backend, fft_size_policy, fft_workers, fft_padding : optional
+            FFT settings, as for the 'fft' RS method (see `autoRS.spectrum._fft_rs`).
+        """
+        acc = np.asarray(acc, dtype=float)
+        if acc.ndim != 1:
+            raise ValueError("Spectral matching requires a single (1D) record.")
+        self.frqs = np.asarray(
+            get_default_frequencies() if frqs is None else frqs, dtype=float
+        )
+        self.zeta = zeta
+        self.dt = time[1] - time[0]
+        self.n = len(acc)
+
+        backend, size_policy, self._workers, padding = get_fft_settings(
+            fft_backend, fft_size_policy, fft_workers, fft_padding
+        )
+        self._rfft, self._irfft = FFT_BACKENDS_DICT[backend]
+        size_func = FFT_SIZE_POLICIES_DICT[size_policy]
+
+        # Transfer functions (absolute acceleration / ground acceleration) of the
+        # oscillators in each padding class
+        w = 2 * np.pi * self.frqs
+        self._classes = []
+        classes = _fft_padding_classes(
+            self.n, self.dt, w, zeta, padding, size_policy
+        )
+        for n_pad, idx in classes:
+            n_fft = size_func(n_pad)
+            wf = 2 * np.pi * scipy.fft.rfftfreq(n_fft, d=self.dt)
+            wn = w[idx, None]
+            transfer = (wn ** 2 + 2j * zeta * wn * wf) / (
+                wn ** 2 - wf ** 2 + 2j * zeta * wn * wf
+            )
+            self._classes.append((n_fft, idx, wf / (2 * np.pi), transfer))
+        self._n_max = max(n_fft for n_fft, *_ in self._classes)
+
+        self._rs = np.zeros(len(self.frqs))
+        self.acceleration = acc
+
+    @property
+    def acceleration(self) -> np.ndarray:
+        """The (adjusted) acceleration time history."""
+        return self._acc.copy()
+
+    @acceleration.setter
+    def acceleration(self, acc: array_like_1d) -> None:
+        self._acc = np.array(acc, dtype=float)
+        self._update_transforms()
+        self._stale = np.ones(len(self.frqs), dtype=bool)
+        self._drift = np.zeros(len(self.frqs))
+
+    def _update_transforms(self) -> None:
+        self._ffts = [
+            self._rfft(self._acc, n_fft, axis=0, workers=self._workers)
+            for n_fft, *_ in self._classes
+        ]
+
+    def response_spectrum(self, idx: Optional[np.ndarray] = None) -> np.ndarray:
+        """Evaluate the spectral accelerations of the oscillators with indices `idx`
+        (defaults to the oscillators that are out of date), and return the spectral
+        accelerations of all the oscillators."""
+        evaluate = self._stale.copy() if idx is None else np.zeros_like(self._stale)
+        if idx is not None:
+            evaluate[idx] = True
+
+        for (n_fft, class_idx, _, transfer), xgfft in zip(self._classes, self._ffts):
+            rows = np.flatnonzero(evaluate[class_idx])
+            if not len(rows):
+                continue
+            a = self._irfft(
+                transfer[rows] * xgfft,
+                MATCH_OVERSAMPLING * n_fft,
+                axis=1,
+                workers=self._workers,
+            )
+            peaks = _refined_peaks(np.abs(a), MATCH_OVERSAMPLING)
+            self._rs[class_idx[rows]] = peaks * MATCH_OVERSAMPLING
+
+        self._stale &= ~evaluate
+        self._drift[evaluate] = 0
+        return self._rs.copy()
+
+    def adjust(self, ratio: array_like_1d, threshold: float = 0.0) -> np.ndarray:
+        """Scale the Fourier amplitudes of the record by `ratio` (defined at the
+        oscillator frequencies and interpolated linearly in log-log space, with
+        constant extrapolation).
+
+        The oscillators whose relative change of peak response since they were last
+        evaluated may exceed `threshold` are marked as out of date (to be
+        re-evaluated by `response_spectrum`), and their indices are returned.
+        """
+        log_ratio = np.log(np.asarray(ratio, dtype=float))
+        log_frqs = np.log(self.frqs)
+
+        def gain(f: np.ndarray) -> np.ndarray:
+            with np.errstate(divide="ignore"):
+                return np.exp(np.interp(np.log(f), log_frqs, log_ratio))
+
+        f = scipy.fft.rfftfreq(self._n_max, d=self.dt)
+        xgfft = self._rfft(self._acc, self._n_max, axis=0, workers=self._workers)
+        self._acc = self._irfft(
+            xgfft * gain(f), self._n_max, axis=0, workers=self._workers
+        )[: self.n]
+
+        # Upper bound of the change of the response histories (and hence of their
+        # peaks) of each oscillator, relative to its last evaluated peak
+        for (n_fft, idx, f, transfer), xgfft in zip(self._classes, self._ffts):
+            change = np.abs(transfer) @ (np.abs(xgfft) * np.abs(gain(f) - 1))
+            self._drift[idx] += 2 * change / n_fft / self._rs[idx]
+        affected = self._drift > threshold
+
+        self._update_transforms()
+        self._stale |= affected
+        return np.flatnonzero(affected)
+
+    def match(
+        self,
+        target: array_like_1d,
+        tolerance: float = MATCH_TOLERANCE,
+        max_iterations: int = MATCH_MAX_ITERATIONS,
+        gain: float = 1.0,
+    ) -> Tuple[np.ndarray, int]:
+        """Iteratively adjust the record until its spectrum matches the `target`
+        spectral accelerations (at the oscillator frequencies) within the relative
+        `tolerance`, or for at most `max_iterations` adjustments. Each adjustment
+        scales the Fourier amplitudes by (target / spectrum) ** `gain`.
+
+        Returns
+        -------
+        rs : ndarray
+            Spectral accelerations of the matched record.
+        iterations : int
+            Number of adjustments.
+        """
+        target = np.asarray(target, dtype=float)
+        if target.shape != self.frqs.shape:
+            raise ValueError("Target must have one value per oscillator frequency.")
+        if not np.all(target > 0):
+            raise ValueError("Target spectral accelerations must be positive.")
+
+        threshold = MATCH_UPDATE_FRACTION * tolerance
+        rs = self.response_spectrum()
+        iterations = 0
+        while True:
+            converged = np.max(np.abs(rs / target - 1)) <= tolerance
+            if converged or iterations == max_iterations:
+                # Confirm the result with all the oscillators up to date
+                outdated = self._drift > 0
+                if not np.any(outdated):
+                    break
+                self._stale |= outdated
+            else:
+                self.adjust((target / rs) ** gain, threshold)
+                iterations += 1
+            rs = self.response_spectrum()
+        return rs, iterations
+
+
+# %% Main functions
+
+
+def spectral_match(
+    acc: array_like_1d,
+    time: array_like_1d,
+    target: array_like_1d,
+    frqs: Optional[array_like_1d] = None,
+    zeta: float = 0.05,
+    tolerance: float = MATCH_TOLERANCE,
+    max_iterations: int = MATCH_MAX_ITERATIONS,
+    gain: float = 1.0,
+    **kwargs,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Match an acceleration record to a target response spectrum by iteratively
+    scaling its Fourier amplitudes (see `SpectralMatcher`).
+
+    Parameters
+    ----------
+    acc : 1d array_like
+        Acceleration time history of the record.
+    time : 1d array_like
+        Uniformly spaced time values of `acc`.
+    target : 1d array_like
+        Target spectral accelerations at `frqs`.
+    frqs : 1d array_like, optional
+        Frequencies (Hz) of the target spectrum. Defaults to the default RS
+        frequencies.
+    zeta : float, optional
+        Critical damping ratio. Defaults to 0.05.
+    tolerance : float, optional
+        Relative tolerance of the match at every frequency. Defaults to
+        `MATCH_TOLERANCE`.
+    max_iterations : int, optional
+        Maximum number of adjustments. Defaults to `MATCH_MAX_ITERATIONS`.
+    gain : float, optional
+        Exponent applied to the spectral ratio of each adjustment (< 1 to relax the
+        iterations). Defaults to 1.
+    **kwargs
+        FFT settings (`fft_backend`, `fft_size_policy`, `fft_workers`, and
+        `fft_padding`, see `autoRS.spectrum._fft_rs`).
+
+    Returns
+    -------
+    acc : ndarray
+        Matched acceleration time history.
+    rs : ndarray
+        Spectral accelerations of the matched record.
+    frqs : ndarray
+        Frequencies in Hz.
+    """
+    t0 = perf_counter()
+    matcher = SpectralMatcher(acc, time, frqs, zeta, **kwargs)
+    rs, iterations = matcher.match(target, tolerance, max_iterations, gain)
+    error = np.max(np.abs(rs / np.asarray(target) - 1))
+    print(
+        "Spectral matching done. Iterations = {}, max error = {:.2%}, "
+        "time taken = {:.5f}s".format(iterations, error, perf_counter() - t0)
+    )
+    return matcher.acceleration, rs, matcher.frqs
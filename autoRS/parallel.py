@@ -0,0 +1,275 @@
+"""Parallel RS generation. The records are handed to the worker processes through
+shared memory, so they are not pickled."""
+
+# %% Import required modules
+
+# Standard library imports
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from autoRS.typing import array_like_1d, array_like_2d
+from autoRS.spectrum import (
+    RS_METHODS_DICT,
+    DEFAULT_METHOD,
+    get_default_frequencies,
+    get_fft_settings,
+)
+
+# %% Global variables
+
+N_PROCESSES: int = os.cpu_count() or 1
+"""Default number of worker processes."""
+
+TASKS_PER_PROCESS: int = 4
+"""Number of tasks per worker process, so that the work is balanced between the
+processes even if some tasks take longer."""
+
+# Shared arrays attached by a worker process (see `_attach`)
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_segments: List[SharedMemory] = []
+
+
+# %% Class definitions
+
+
+class SharedArrays:
+    """Arrays in shared memory segments, for worker processes to attach to (see
+    `map_shared`).
+
+    The parent process owns the segments: they are unlinked when the instance is
+    closed, which a `with` block does even if an exception is raised (eg. a
+    `BrokenProcessPool` when a worker crashes). Worker processes only map the
+    segments, and their mappings are released by the OS when they exit, however
+    they exit. If the parent process itself is killed, the segments are unlinked
+    by the `multiprocessing` resource tracker.
+    """
+
+    def __init__(
+        self, arrays: Optional[Dict[str, Union[array_like_1d, array_like_2d]]] = None
+    ) -> None:
+        """Copy the `arrays` (name: array) to new shared memory segments. The
+        memory layout (C or Fortran order) of each array is kept."""
+        self.specs: Dict[str, Tuple[str, Tuple[int, ...], str, str]] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self._segments: List[SharedMemory] = []
+        try:
+            for name, array in (arrays or {}).items():
+                self.add(name, array)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def empty(
+        self, name: str, shape: Tuple[int, ...], dtype=float, order: str = "C"
+    ) -> np.ndarray:
+        """Allocate a new shared array `name`, and return a writable view of it for
+        the parent process to fill in place (eg. as records are read), so the data
+        is not copied again to shared memory. The view is also kept in `arrays`."""
+        if name in self.specs:
+            raise ValueError(f"Shared array '{name}' already exists.")
+        dtype = np.dtype(dtype)
+        shape = tuple(shape)
+        segment = SharedMemory(
+            create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1)
+        )
+        self._segments.append(segment)
+        self.arrays[name] = np.ndarray(shape, dtype, segment.buf, order=order)
+        self.specs[name] = (segment.name, shape, dtype.str, order)
+        return self.arrays[name]
+
+    def add(self, name: str, array: Union[array_like_1d, array_like_2d]) -> None:
+        """Copy `array` to a new shared array `name`, keeping its memory layout."""
+        array = np.asarray(array)
+        order = "F" if array.flags.f_contiguous else "C"
+        self.empty(name, array.shape, array.dtype, order)[...] = array
+
+    def close(self) -> None:
+        """Close and unlink the shared memory segments."""
+        self.arrays = {}
+        for segment in self._segments:
+            try:
+                segment.close()
+            except BufferError:
+                pass  # Mapping released once the caller's views are deleted
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self._segments = []
+
+
+# %% Main functions
+
+
+def _attach(specs: Dict[str, Tuple[str, Tuple[int, ...], str, str]]) -> None:
+    """Worker process initializer: attach read-only, zero-copy views of the shared
+    arrays."""
+    for name, (segment_name, shape, dtype, order) in specs.items():
+        segment = SharedMemory(name=segment_name)
+        _worker_segments.append(segment)
+        array = np.ndarray(shape, dtype, segment.buf, order=order)
+        array.flags.writeable = False
+        _worker_arrays[name] = array
+
+
+def _run(func: Callable, task) -> object:
+    return func(_worker_arrays, task)
+
+
+def map_shared(
+    func: Callable[[Dict[str, np.ndarray], object], object],
+    arrays: Union[SharedArrays, Dict[str, Union[array_like_1d, array_like_2d]]],
+    tasks: Iterable,
+    n_processes: Optional[int] = None,
+) -> Iterator:
+    """Evaluate ``func(arrays, task)`` for each of the `tasks` in `n_processes`
+    worker processes (defaults to `N_PROCESSES`), and yield the results in order.
+
+    The `arrays` are copied once to shared memory (see `SharedArrays`), and each
+    worker attaches read-only views of them when it starts. Only the `tasks` and the
+    results are pickled, so they should be small (eg. indices and spectra). `func`
+    must be a module level function. The shared memory is released once all the
+    results are yielded, or if any task (or worker) fails. If `arrays` is already a
+    `SharedArrays`, it is used as is, and the caller closes it.
+    """
+    n_processes = N_PROCESSES if n_processes is None else n_processes
+    if isinstance(arrays, SharedArrays):
+        arrays = nullcontext(arrays)
+    else:
+        arrays = SharedArrays(arrays)
+    with arrays as shared:
+        with ProcessPoolExecutor(
+            max_workers=n_processes, initializer=_attach, initargs=(shared.specs,)
+        ) as executor:
+            futures = [executor.submit(_run, func, task) for task in tasks]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def _rs_task(
+    arrays: Dict[str, np.ndarray], task: Tuple[int, int, int, int, str, float, dict]
+) -> np.ndarray:
+    """RS of the records (columns) `start` to `stop` of the shared acceleration,
+    at the shared frequencies `frq_start` to `frq_stop`."""
+    start, stop, frq_start, frq_stop, method, zeta, kwargs = task
+    rs, _ = RS_METHODS_DICT[method](
+        arrays["acc"][:, start:stop],
+        arrays["time"],
+        arrays["frqs"][frq_start:frq_stop],
+        zeta,
+        **kwargs,
+    )
+    return rs
+
+
+def _worker_kwargs(method: str, n_processes: int, kwargs: dict) -> dict:
+    """Keyword arguments of the RS method in each of `n_processes` worker processes.
+    The 'fft' method's threads (`fft_workers`, see `get_fft_settings`) are divided
+    between the processes, unless they are given, so the workers do not
+    oversubscribe the CPUs."""
+    if method != "fft" or kwargs.get("fft_workers") is not None:
+        return kwargs
+    workers = get_fft_settings()[2]
+    return {**kwargs, "fft_workers": max(workers // n_processes, 1)}
+
+
+def parallel_response_spectrum(
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    zeta: float = 0.05,
+    high_frequency: bool = False,
+    method: str = DEFAULT_METHOD,
+    frqs: Optional[array_like_1d] = None,
+    n_processes: Optional[int] = None,
+    shared: Optional[SharedArrays] = None,
+    **kwargs,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Generate the RS of one or more records (columns of a 2D `acc`) in parallel
+    worker processes.
+
+    The records are placed in shared memory once, and the workers compute the RS
+    of blocks of records on zero-copy views of them (see `map_shared`). Each worker
+    only returns the spectra of its block. If there are fewer records than tasks,
+    the frequencies are also split into blocks, so a single large record is also
+    processed in parallel.
+
+    Parameters
+    ----------
+    acc : 1d or 2d array_like
+        Acceleration time history(s), with shape (n_time,) or (n_time, n_records).
+    time : 1d array_like
+        Time values of `acc`.
+    zeta, high_frequency, method
+        See `response_spectrum`.
+    frqs : 1d array_like, optional
+        Oscillator frequencies (Hz). Defaults to `get_default_frequencies`.
+    n_processes : int, optional
+        Number of worker processes. Defaults to `N_PROCESSES`. With 1 process, the
+        RS is computed in the current process.
+    shared : SharedArrays, optional
+        Shared memory whose "acc" array holds the records of `acc` in its first
+        columns (eg. filled in place as the records are read, see
+        `SharedArrays.empty`), so they are not copied again. The time and
+        frequencies are added to it if missing, and the caller closes it.
+    **kwargs
+        Additional keyword arguments for the RS method (see `response_spectrum`).
+        The FFT threads of the 'fft' method default to an equal share of
+        `DEFAULT_FFT_WORKERS` per worker process.
+
+    Returns
+    -------
+    rs : ndarray
+        Spectral accelerations, with shape (n_frqs,) or (n_frqs, n_records).
+    frqs : ndarray
+        Frequencies in Hz.
+    """
+    acc = np.asarray(acc, dtype=float)
+    frqs = get_default_frequencies(high_frequency) if frqs is None else frqs
+    frqs = np.asarray(frqs, dtype=float)
+    method = method if method in RS_METHODS_DICT else DEFAULT_METHOD
+    n_processes = N_PROCESSES if n_processes is None else n_processes
+    if n_processes <= 1:
+        return RS_METHODS_DICT[method](acc, time, frqs, zeta, **kwargs)
+
+    # Blocks of records, and blocks of frequencies if there are too few records
+    records = acc.reshape(len(acc), -1, order="F")
+    kwargs = _worker_kwargs(method, n_processes, kwargs)
+    n_tasks = n_processes * TASKS_PER_PROCESS
+    record_blocks = np.array_split(np.arange(records.shape[1]), n_tasks)
+    record_blocks = [block for block in record_blocks if len(block)]
+    n_frq_blocks = min(-(-n_tasks // len(record_blocks)), len(frqs))
+    frq_blocks = np.array_split(np.arange(len(frqs)), n_frq_blocks)
+    tasks = [
+        (r[0], r[-1] + 1, f[0], f[-1] + 1, method, zeta, kwargs)
+        for r in record_blocks
+        for f in frq_blocks
+    ]
+
+    with (SharedArrays() if shared is None else nullcontext(shared)) as arrays:
+        if "acc" not in arrays.specs:
+            arrays.empty("acc", records.shape, order="F")[...] = records
+        for name, array in (("time", time), ("frqs", frqs)):
+            if name not in arrays.specs:
+                arrays.add(name, array)
+        results = iter(map_shared(_rs_task, arrays, tasks, n_processes))
+        rs = np.empty((len(frqs), records.shape[1]))
+        for start, stop, frq_start, frq_stop, *_ in tasks:
+            rs[frq_start:frq_stop, start:stop] = next(results)
+    return (rs if acc.ndim > 1 else rs[:, 0]), frqs
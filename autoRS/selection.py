@@ -0,0 +1,234 @@
+"""Spectral index of many response spectra for nearest-neighbour record selection."""
+
+# %% Import required modules
+
+# Standard library imports
+import os
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from autoRS.typing import array_like_1d
+from autoRS.core import FloatTable, MotionSpectra
+from autoRS.spectrum import get_default_frequencies
+
+# %% Global variables
+
+INDEX_VERSION: int = 1
+"""Version of the spectral index file format."""
+
+INDEX_BLOCK_SIZE: int = 4096
+"""Number of spectra processed at a time when computing the moments of the indexed
+spectra for new query weights."""
+
+MOMENTS_CACHE_SIZE: int = 16
+"""Maximum number of query weights whose moments are cached by an index."""
+
+
+# %% Class definitions
+
+
+class SpectralIndex:
+    """Index of response spectra for fast nearest-neighbour record selection.
+
+    The spectra are stored as ln(S_a) on a common frequency grid, one contiguous
+    column per spectrum. A saved index is a `FloatTable` file (see
+    `FloatTable.save`) that is memory-mapped when opened.
+
+    Spectra are compared with a target spectrum after scaling them by the factor
+    that minimizes the weighted mean squared ln(S_a) difference, which is the
+    weighted mean of ln(target / spectrum). The misfit of every spectrum is then
+    given by matrix-vector products with the index (see `SpectralIndex.query`).
+    """
+
+    def __init__(
+        self, frequency: Optional[array_like_1d] = None, zeta: float = 0.05
+    ) -> None:
+        """Initialize an empty index on the grid `frequency` (Hz, defaults to the
+        default RS frequencies) for spectra with critical damping ratio `zeta`.
+        Repeated frequencies (up to round-off) are removed from the grid, eg. the
+        default frequencies include 3.6 Hz twice."""
+        frequency = get_default_frequencies() if frequency is None else frequency
+        frequency = np.sort(np.asarray(frequency, dtype=float))
+        distinct = np.diff(frequency, prepend=0) > 1e-9 * frequency
+        self.frequency = frequency[distinct]
+        self.zeta = float(zeta)
+        self._table = FloatTable(index=self.frequency, index_name="frequency")
+        self._pending: List[np.ndarray] = []
+        self._pending_names: List[str] = []
+        self._moments: Dict[bytes, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return self._table.shape[1] + len(self._pending_names)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Names of the indexed spectra."""
+        self._consolidate()
+        return self._table.column_names
+
+    @property
+    def log_acceleration(self) -> np.ndarray:
+        """ln(S_a) of the indexed spectra, with shape (n_frequencies, n_spectra)."""
+        self._consolidate()
+        if self._table._data is None:
+            return np.zeros((len(self.frequency), 0))
+        return self._table.data
+
+    def add(self, spectra: MotionSpectra, prefix: str = "") -> None:
+        """Add all the `spectra` to the index, named `prefix` + column name. The
+        spectra are interpolated (in log-log space) onto the index frequencies, and
+        held constant beyond their frequency range."""
+        if not np.allclose(spectra.zeta, self.zeta):
+            raise ValueError(
+                f"Spectra damping ratios {spectra.zeta} do not match the index "
+                f"damping ratio ({self.zeta})."
+            )
+        if not np.all(spectra.acceleration > 0):
+            raise ValueError("Spectral accelerations must be positive.")
+        sa = spectra.interpolate(self.frequency).acceleration
+        self._pending.append(np.log(sa))
+        self._pending_names.extend(prefix + name for name in spectra.column_names)
+
+    def add_folder(self, rs_folder: str) -> None:
+        """Add the spectra in all the autoRS '*_RS.csv' output files in `rs_folder`.
+        The spectra are named '<file name>/<column name>'. Files with spectra of a
+        different damping ratio are skipped."""
+        for fname in sorted(os.listdir(rs_folder)):
+            match = re.search(r"^(?P<stem>.+)_RS\.csv$", fname)
+            if not match:
+                continue
+            spectra = MotionSpectra.from_csv(os.path.join(rs_folder, fname))
+            try:
+                self.add(spectra, prefix=match.group("stem") + "/")
+            except ValueError as error:
+                print(f"{fname} skipped. {error}")
+
+    def save(self, path: str) -> None:
+        """Save the index to `path` (see `SpectralIndex.open`)."""
+        self._consolidate()
+        self._table.save(path, metadata={"version": INDEX_VERSION, "zeta": self.zeta})
+
+    @classmethod
+    def open(cls, path: str) -> "SpectralIndex":
+        """Open an index saved with `SpectralIndex.save`. The spectra are
+        memory-mapped, so opening the index only reads the file header."""
+        metadata = FloatTable.read_metadata(path)
+        if metadata.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} is not a spectral index.")
+        table = FloatTable.open(path)
+        index = cls(table.index, metadata["zeta"])
+        index._table = table
+        return index
+
+    def query(
+        self,
+        target: Union[MotionSpectra, array_like_1d],
+        k: int = 10,
+        frequency_range: Optional[Tuple[float, float]] = None,
+        weights: Optional[array_like_1d] = None,
+        scale_range: Optional[Tuple[float, float]] = None,
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Find the `k` indexed spectra closest to the `target` spectrum after
+        scaling.
+
+        Parameters
+        ----------
+        target : MotionSpectra or 1d array_like
+            Target spectrum, either a single spectrum or spectral accelerations at
+            the index frequencies.
+        k : int, optional
+            Number of matches. Defaults to 10.
+        frequency_range : (float, float), optional
+            Only compare the spectra at frequencies (Hz) within this range. Defaults
+            to all the index frequencies.
+        weights : 1d array_like, optional
+            Relative weights of the index frequencies. Defaults to uniform weights.
+        scale_range : (float, float), optional
+            Minimum and maximum scale factors. Defaults to no limits.
+
+        Returns
+        -------
+        names : list of str
+            Names of the closest spectra, from best to worst match.
+        scale_factors : ndarray
+            Scale factors applied to the spectra.
+        errors : ndarray
+            Weighted root mean square ln(target / scaled spectrum) misfits.
+        """
+        if isinstance(target, MotionSpectra):
+            if target.table.shape[1] != 1:
+                raise ValueError("Target must be a single spectrum.")
+            target = target.interpolate(self.frequency).acceleration[:, 0]
+        target = np.asarray(target, dtype=float)
+        if target.shape != self.frequency.shape:
+            raise ValueError("Target must have one value per index frequency.")
+        if not np.all(target > 0):
+            raise ValueError("Target spectral accelerations must be positive.")
+
+        w = np.ones(len(self.frequency)) if weights is None else np.array(weights)
+        if frequency_range is not None:
+            low, high = frequency_range
+            w[(self.frequency < low) | (self.frequency > high)] = 0
+        if not np.sum(w) > 0:
+            raise ValueError("No frequencies with positive weights.")
+        w = w / np.sum(w)
+
+        # Weighted moments of d = ln(target) - ln(S_a), for every spectrum:
+        # misfit(c) = <d, d> - 2 c <d, 1> + c^2, minimized by the ln(scale) c = <d, 1>
+        log_target = np.log(target)
+        mean, square = self._get_moments(w)
+        cross = (w * log_target) @ self.log_acceleration
+        d_mean = np.dot(w, log_target) - mean
+        d_square = np.dot(w, log_target ** 2) - 2 * cross + square
+
+        log_scale = d_mean
+        if scale_range is not None:
+            log_scale = np.clip(log_scale, *np.log(scale_range))
+        misfit = np.maximum(d_square - 2 * log_scale * d_mean + log_scale ** 2, 0)
+
+        k = min(k, len(misfit))
+        best = np.argpartition(misfit, k - 1)[:k] if k else np.zeros(0, dtype=int)
+        best = best[np.argsort(misfit[best])]
+        names = self.names
+        return (
+            [names[i] for i in best],
+            np.exp(log_scale[best]),
+            np.sqrt(misfit[best]),
+        )
+
+    # Private Helper methods
+    def _consolidate(self) -> None:
+        """Move the spectra added since the last consolidation into the table."""
+        if not self._pending:
+            return
+        if self._table._data is not None:
+            self._pending.insert(0, np.asarray(self._table.data))
+            self._pending_names[:0] = self._table.column_names
+        self._table = FloatTable(
+            raw_data=np.asfortranarray(np.column_stack(self._pending)),
+            index=self.frequency,
+            column_names=self._pending_names,
+            index_name="frequency",
+        )
+        self._pending, self._pending_names = [], []
+        self._moments = {}
+
+    def _get_moments(self, w: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Weighted means of ln(S_a) and ln(S_a)^2 of every indexed spectrum. The
+        moments are cached for the last `MOMENTS_CACHE_SIZE` sets of weights."""
+        log_sa = self.log_acceleration
+        key = w.tobytes()
+        if key not in self._moments:
+            mean = w @ log_sa
+            square = np.empty(log_sa.shape[1])
+            for start in range(0, log_sa.shape[1], INDEX_BLOCK_SIZE):
+                block = log_sa[:, start : start + INDEX_BLOCK_SIZE]
+                square[start : start + INDEX_BLOCK_SIZE] = w @ block ** 2
+            if len(self._moments) >= MOMENTS_CACHE_SIZE:
+                del self._moments[next(iter(self._moments))]
+            self._moments[key] = (mean, square)
+        return self._moments[key]
@@ -4,15 +4,24 @@
 
 # Standard library imports
 from __future__ import annotations
+import os
 from time import perf_counter
-from itertools import accumulate
-from typing import Tuple, Union, List
+from typing import Tuple, Union, List, Iterable, Iterator, Optional
 
 # Third party imports
 import numpy as np
+import scipy.fft
+from scipy.signal import lfilter, decimate, resample_poly
+
+try:
+    import pyfftw
+    import pyfftw.builders
+except ImportError:
+    pyfftw = None
 
 # Local application imports
-from autoRS.typing import array_like_1d
+from autoRS.typing import array_like_1d, array_like_2d
+from autoRS.core.utils import sliding_maximum
 
 # %% Utility functions
 
@@ -78,6 +87,230 @@ def get_default_frequencies(high_frequency: bool = False) -> np.ndarray:
     return frqs
 
 
+# %% FFT backends
+# Each backend is a pair of (rfft, irfft) functions with the signature
+# f(x, n, axis, workers). numpy and scipy cache the plans of recent transform sizes
+# internally; pyfftw plans are cached in `_PYFFTW_PLANS`.
+
+
+def _numpy_rfft(x: np.ndarray, n: int, axis: int = 0, workers: int = 1) -> np.ndarray:
+    return np.fft.rfft(x, n, axis=axis)
+
+
+def _numpy_irfft(x: np.ndarray, n: int, axis: int = 0, workers: int = 1) -> np.ndarray:
+    return np.fft.irfft(x, n, axis=axis)
+
+
+def _scipy_rfft(x: np.ndarray, n: int, axis: int = 0, workers: int = 1) -> np.ndarray:
+    return scipy.fft.rfft(x, n, axis=axis, workers=workers)
+
+
+def _scipy_irfft(x: np.ndarray, n: int, axis: int = 0, workers: int = 1) -> np.ndarray:
+    return scipy.fft.irfft(x, n, axis=axis, workers=workers)
+
+
+PYFFTW_PLAN_CACHE_SIZE = 32
+"""Maximum number of cached pyfftw plans."""
+
+_PYFFTW_PLANS = {}
+
+
+def _pyfftw_transform(
+    kind: str, x: np.ndarray, n: int, axis: int = 0, workers: int = 1
+) -> np.ndarray:
+    """Run a pyfftw 'rfft' or 'irfft' transform, reusing the plan of previous calls
+    with the same input shape, dtype, size and number of threads."""
+    key = (kind, x.shape, x.dtype.str, n, axis, workers)
+    plan = _PYFFTW_PLANS.get(key)
+    if plan is None:
+        builder = getattr(pyfftw.builders, kind)
+        empty = pyfftw.empty_aligned(x.shape, dtype=x.dtype)
+        plan = builder(empty, n=n, axis=axis, threads=workers)
+        if len(_PYFFTW_PLANS) >= PYFFTW_PLAN_CACHE_SIZE:
+            del _PYFFTW_PLANS[next(iter(_PYFFTW_PLANS))]
+        _PYFFTW_PLANS[key] = plan
+
+    # The plan's output array is overwritten by the next call
+    return plan(x).copy()
+
+
+def _pyfftw_rfft(x: np.ndarray, n: int, axis: int = 0, workers: int = 1) -> np.ndarray:
+    return _pyfftw_transform("rfft", x, n, axis, workers)
+
+
+def _pyfftw_irfft(x: np.ndarray, n: int, axis: int = 0, workers: int = 1) -> np.ndarray:
+    return _pyfftw_transform("irfft", x, n, axis, workers)
+
+
+def _pow2_size(n: int) -> int:
+    """Smallest power of 2 >= `n`."""
+    return int(2 ** np.ceil(np.log2(n)))
+
+
+def _fast_size(n: int) -> int:
+    """Smallest 5-smooth (2, 3, 5 factors only) number >= `n`."""
+    return scipy.fft.next_fast_len(int(n), real=True)
+
+
+FFT_BACKENDS_DICT = {
+    "numpy": (_numpy_rfft, _numpy_irfft),
+    "scipy": (_scipy_rfft, _scipy_irfft),
+}
+"""Dictionary with the (rfft, irfft) functions of the available FFT backends."""
+
+if pyfftw is not None:
+    FFT_BACKENDS_DICT["pyfftw"] = (_pyfftw_rfft, _pyfftw_irfft)
+
+FFT_BACKENDS = tuple(FFT_BACKENDS_DICT.keys())
+"""Tuple that lists the available FFT backends."""
+
+DEFAULT_FFT_BACKEND = "pyfftw" if pyfftw is not None else "scipy"
+"""Default FFT backend used by the 'fft' RS method."""
+
+FFT_SIZE_POLICIES_DICT = {
+    "pow2": _pow2_size,
+    "fast": _fast_size,
+}
+"""Dictionary with the functions that choose the FFT size from the minimum size."""
+
+DEFAULT_FFT_SIZE_POLICY = "fast"
+"""Default FFT size policy used by the 'fft' RS method."""
+
+DEFAULT_FFT_WORKERS = os.cpu_count() or 1
+"""Default number of threads used by the scipy and pyfftw FFT backends."""
+
+FFT_BLOCK_BYTES = 2 ** 26
+"""Approximate memory (bytes) used by the response histories of a block of
+oscillators and records calculated at once by the 'fft' method. Independent of the
+number of workers. At least one oscillator of one record is calculated at a time."""
+
+FFT_MULTIPLIER: int = 8
+"""Up-sampling factor of the sinc-interpolated response histories of the 'fft'
+method."""
+
+FFT_PADDING_POLICIES = ("damping", "fixed")
+"""Tuple that lists the padding policies of the 'fft' RS method."""
+
+DEFAULT_FFT_PADDING = "damping"
+"""Default padding policy used by the 'fft' RS method."""
+
+FFT_PAD_TOLERANCE = 1e-3
+"""Fraction of the free vibration amplitude allowed to wrap around with the
+'damping' padding policy."""
+
+FFT_MAX_PAD_FRACTION = 64
+"""Maximum padding (as a multiple of the record length) with the 'damping' padding
+policy."""
+
+FFT_MAX_PAD_WORK = 1.0
+"""Maximum transform work (n_fft log2 n_fft of the merged padding classes) of the
+'damping' padding policy for the default frequencies, relative to the 'fixed'
+policy. Above it (ie. for records that are short compared to the decay length of the
+oscillators), the oscillators that need more padding than the 'fixed' policy are
+padded as with the 'fixed' policy. Increase it to keep the full 'damping' padding
+(eg. with light damping), at the cost of speed."""
+
+FFT_PAD_MERGE_RATIO = 1.1
+"""Padding classes of the 'damping' policy are merged into a larger class if their
+padded length is within this ratio of it, to reduce the number of transforms."""
+
+
+def get_fft_settings(
+    backend: Optional[str] = None,
+    size_policy: Optional[str] = None,
+    workers: Optional[int] = None,
+    padding: Optional[str] = None,
+) -> Tuple[str, str, int, str]:
+    """Resolve the FFT backend, size policy, number of workers, and padding policy
+    used by the 'fft' RS method, replacing None with the defaults.
+
+    Raises
+    ------
+    ValueError
+        If the backend, size policy, or padding policy is not available.
+    """
+    backend = DEFAULT_FFT_BACKEND if backend is None else backend
+    size_policy = DEFAULT_FFT_SIZE_POLICY if size_policy is None else size_policy
+    workers = DEFAULT_FFT_WORKERS if workers is None else int(workers)
+    padding = DEFAULT_FFT_PADDING if padding is None else padding
+    if backend not in FFT_BACKENDS_DICT:
+        raise ValueError(
+            f"FFT backend '{backend}' is not available. Use one of {FFT_BACKENDS}."
+        )
+    if size_policy not in FFT_SIZE_POLICIES_DICT:
+        raise ValueError(
+            f"FFT size policy '{size_policy}' is not one of "
+            f"{tuple(FFT_SIZE_POLICIES_DICT.keys())}."
+        )
+    if padding not in FFT_PADDING_POLICIES:
+        raise ValueError(
+            f"FFT padding policy '{padding}' is not one of {FFT_PADDING_POLICIES}."
+        )
+    return backend, size_policy, max(workers, 1), padding
+
+
+def _fft_padding_classes(
+    n: int,
+    dt: float,
+    w: np.ndarray,
+    zeta: float,
+    padding: str = "damping",
+    size_policy: str = DEFAULT_FFT_SIZE_POLICY,
+) -> List[Tuple[int, np.ndarray]]:
+    """Group oscillators with angular frequencies `w` into padding classes for the
+    'fft' RS method, for a record with `n` samples at timestep `dt`.
+
+    With the 'fixed' policy, all oscillators are padded to 1.5 x the record length.
+    With the 'damping' policy, each oscillator needs enough padding for its free
+    vibration after the end of the record to decay to `FFT_PAD_TOLERANCE` before
+    wrapping around, ie. t_pad = -ln(tol) / (zeta w). The padding is rounded up to
+    n x 2**(j / 2) / 16 (for integer j >= 0, and at most `FFT_MAX_PAD_FRACTION` x n),
+    so that oscillators with similar padding share the same transform size, and
+    classes within `FFT_PAD_MERGE_RATIO` of a larger class are merged into it. If the
+    transform work of the classes (with the transform sizes of `size_policy`) for the
+    default frequencies is more than `FFT_MAX_PAD_WORK` times that of the 'fixed'
+    policy, the padding is limited to that of the 'fixed' policy. The oscillators
+    that need less padding keep their classes.
+
+    Returns
+    -------
+    classes : list of (int, ndarray) tuples
+        Minimum padded record length and indices of the oscillators in each class.
+    """
+    n_fixed = int(np.ceil(1.5 * n))
+    if padding == "fixed":
+        return [(n_fixed, np.arange(len(w)))]
+
+    # Padded lengths of the classes, and the (larger) class each one is merged into
+    n_classes = int(np.ceil(2 * np.log2(FFT_MAX_PAD_FRACTION * 16))) + 1
+    n_pads = np.ceil(n * (1 + 2 ** (np.arange(n_classes) / 2) / 16)).astype(int)
+    merged = np.arange(n_classes)
+    for j in range(n_classes - 2, -1, -1):
+        if n_pads[merged[j + 1]] <= FFT_PAD_MERGE_RATIO * n_pads[j]:
+            merged[j] = merged[j + 1]
+
+    def get_classes(w: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            pad_fraction = -np.log(FFT_PAD_TOLERANCE) / (zeta * w) / (n * dt)
+        pad_fraction = np.minimum(pad_fraction, FFT_MAX_PAD_FRACTION)
+        classes = np.ceil(2 * np.log2(pad_fraction * 16))
+        return merged[np.clip(classes, 0, n_classes - 1).astype(int)]
+
+    # Transform work of the classes for the default frequencies. It only depends on
+    # the record (not on the oscillators calculated), so that the RS of an
+    # oscillator is the same in any set of frequencies
+    size_func = FFT_SIZE_POLICIES_DICT[size_policy]
+    n_ffts = np.array([size_func(n_pad) for n_pad in n_pads])
+    work = n_ffts * np.log2(n_ffts)
+    default_classes = get_classes(2 * np.pi * get_default_frequencies())
+    fixed_work = size_func(n_fixed) * np.log2(size_func(n_fixed))
+    if np.mean(work[default_classes]) > FFT_MAX_PAD_WORK * fixed_work:
+        n_pads = np.minimum(n_pads, n_fixed)
+
+    classes = n_pads[get_classes(w)]
+    return [(int(j), np.flatnonzero(classes == j)) for j in np.unique(classes)]
+
+
 # %% Raw private response spectrum generation functions
 # TODO: Experiment with Numba to improve efficiency
 
@@ -152,23 +385,102 @@ def _get_step_matrix(
     return A, B
 
 
+def _transmitted_frequency_ratio(zeta: float) -> float:
+    """Ratio of input frequency to oscillator frequency above which the input is
+    transmitted to the absolute acceleration of the oscillator by less than
+    `TRANSMISSIBILITY_TOLERANCE`."""
+
+    # Solve sqrt(1 + (2 zeta r)^2) / r^2 = tol for the frequency ratio, r (r >> 1)
+    tol = TRANSMISSIBILITY_TOLERANCE
+    r_squared = (4 * zeta ** 2 + (16 * zeta ** 4 + 4 * tol ** 2) ** 0.5) / 2 / tol ** 2
+    return r_squared ** 0.5
+
+
+def _step_upsampling_factors(
+    dt: float, frqs: np.ndarray, zeta: float = 0.05
+) -> np.ndarray:
+    """Integer factors by which `_step_rs` up-samples a time history with timestep
+    `dt` for the oscillators at frequencies `frqs`."""
+    max_frqs = np.asarray(frqs) * _transmitted_frequency_ratio(zeta)
+    ratios = STEP_SAMPLING_RATIO * np.minimum(max_frqs * dt, 0.5)
+    return np.maximum(np.ceil(np.round(ratios, 9)), 1).astype(int)
+
+
+def _step_histories(
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    frqs: array_like_1d,
+    zeta: float = 0.05,
+    upsample: bool = True,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Generate the absolute acceleration response histories of the oscillators at
+    `frqs` with the step-by-step method of `_step_rs` (see `_step_rs` for the
+    parameters). Up-sampled oscillators have up-sampled histories.
+
+    The records are transformed together, with the time along the last axis of the
+    work arrays, and the oscillators are processed in blocks within
+    `fft_block_bytes` (at least one oscillator for all the records at a time, see
+    `_fft_rs` to also split the records).
+
+    Yields
+    ------
+    idx : ndarray
+        Indices of a block of oscillators in `frqs`.
+    histories : ndarray
+        Response histories of the block along axis 1, ie. with shape
+        (len(idx), n_time) + acc.shape[1:].
+    """
+
+    # Enforce ndarray type
+    frqs = np.asarray(frqs)
+    acc = np.asarray(acc, dtype=float)
+
+    # Instantiate angular frequency array
+    w = frqs * 2 * np.pi
+
+    # Define timestep from input signal
+    dt = time[1] - time[0]
+
+    # Up-sampling factor required by each oscillator
+    factors = np.ones(len(frqs), dtype=int)
+    if upsample:
+        factors = _step_upsampling_factors(dt, frqs, zeta)
+
+    # Calculate response for the oscillators in each up-sampling group
+    for factor in np.unique(factors):
+        group = np.flatnonzero(factors == factor)
+        acc_up = acc if factor == 1 else resample_poly(acc, factor, 1, axis=0)
+        for k, z in _filter_histories(acc_up, dt / factor, w[group], zeta):
+            yield group[k : k + 1], z[np.newaxis]
+
+
 def _step_rs(
-    acc: array_like_1d, time: array_like_1d, frqs: array_like_1d, zeta: float = 0.05,
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    frqs: array_like_1d,
+    zeta: float = 0.05,
+    upsample: bool = True,
 ) -> [np.ndarray, np.ndarray]:
     """Generate acceleration response spectrum by the step-by-step method [1].
-    The algorithm matches the RS results from SHAKE2000. The theory behind
+    Without up-sampling (`upsample` = False), the algorithm matches the RS results
+    from SHAKE2000. The theory behind
     the algorithm assumes a 'segmentally-linear' acceleration time history (TH).
     Hence, the implicit assumption is that the time history sampling frequency is
     much higher (>8x) than the highest frequency within the TH.
 
-    Use the `_fft_rs` method if there is frequency content close to the
-    nyquist frequency. Or, use `scipy.signal.resample` to up-sample the acc. TH
-    prior to using `_step_rs`.
+    If the sampling frequency is less than `STEP_SAMPLING_RATIO` times the highest
+    frequency that affects an oscillator (the frequency above which its
+    transmissibility is less than `TRANSMISSIBILITY_TOLERANCE`, or the nyquist
+    frequency, if lower), the TH is up-sampled by the smallest integer factor that
+    satisfies this with a polyphase filter (`scipy.signal.resample_poly`) for that
+    oscillator. The up-sampled THs are shared by all oscillators that need the
+    same factor.
 
     Parameters
     ----------
-    acc : 1d array_like
-        Input 1D acceleration time history.
+    acc : 1d or 2d array_like
+        Input acceleration time history. A 2D input is treated as multiple records
+        (one per column) that share the same `time`.
     time : 1d array_like
         Input 1D time values for the acceleration time history, `acc`.
     frqs : 1d array_like
@@ -176,11 +488,15 @@ def _step_rs(
     zeta : float, optional
         Critical damping ratio (dimensionless). Defaults to 0.05. Should be between 0
         and 1.
+    upsample : bool, optional
+        Up-sample the TH for oscillators that need it. Defaults to True. If False,
+        the TH is used as is for all oscillators (as SHAKE2000 does).
 
     Returns
     -------
     rs : ndarray
-        Array with spectral accelerations (same units as input acc).
+        Array with spectral accelerations (same units as input acc). Has shape
+        (n_frqs, n_records) for 2D inputs.
     frqs : ndarray
         Array with frequencies in Hz.
 
@@ -193,36 +509,128 @@ def _step_rs(
 
     # Enforce ndarray type
     frqs = np.asarray(frqs)
+    acc = np.asarray(acc, dtype=float)
+
+    rs = np.zeros(frqs.shape + acc.shape[1:])
+    for idx, z in _step_histories(acc, time, frqs, zeta, upsample):
+        rs[idx] = np.max(np.absolute(z), axis=1)
 
-    # Instantiate angular frequency and spectral acceleration arrays
+    return rs, frqs
+
+
+def _fft_histories(
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    frqs: array_like_1d,
+    zeta: float = 0.05,
+    fft_backend: Optional[str] = None,
+    fft_size_policy: Optional[str] = None,
+    fft_workers: Optional[int] = None,
+    fft_padding: Optional[str] = None,
+    fft_cache: Optional[dict] = None,
+    fft_block_bytes: Optional[int] = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Generate the absolute acceleration response histories of the oscillators at
+    `frqs` with the frequency domain method of `_fft_rs` (see `_fft_rs` for the
+    parameters). The histories are sinc-interpolated and include the zero padding.
+
+    The records are transformed together, with the time along the last axis of the
+    work arrays, and the oscillators are processed in blocks within
+    `fft_block_bytes` (at least one oscillator for all the records at a time, see
+    `_fft_rs` to also split the records).
+
+    Yields
+    ------
+    idx : ndarray
+        Indices of a block of oscillators in `frqs`.
+    histories : ndarray
+        Response histories of the block along axis 1, ie. with shape
+        (len(idx), n_time) + acc.shape[1:].
+    """
+
+    # Enforce ndarray type
+    frqs = np.asarray(frqs)
+    acc = np.asarray(acc)
+
+    # Get FFT functions
+    backend, size_policy, workers, padding = get_fft_settings(
+        fft_backend, fft_size_policy, fft_workers, fft_padding
+    )
+    rfft, irfft = FFT_BACKENDS_DICT[backend]
+    size_func = FFT_SIZE_POLICIES_DICT[size_policy]
+    if fft_block_bytes is None:
+        fft_block_bytes = FFT_BLOCK_BYTES
+
+    # Instantiate angular frequency array
     w = frqs * 2 * np.pi
-    rs = 0 * w
 
-    # Define timestep from input signal
-    dt = time[1] - time[0]
+    # Define minimum timestep from input signal
+    dt_min = time[1] - time[0]
 
-    # Calculate response for a spring with each wn
-    for k, wn in enumerate(w):
+    # Calculate n_fft, the 0 padded length of the time history for each
+    # class of oscillators; rounded up to an efficient FFT size
+    n = len(acc)
+    classes = _fft_padding_classes(n, dt_min, w, zeta, padding, size_policy)
+    for n_pad, group in classes:
+        n_fft = size_func(n_pad)
+
+        # Get FFT of input acceleration (shared through `fft_cache`)
+        if fft_cache is not None and n_fft in fft_cache:
+            xgfft = fft_cache[n_fft]
+        else:
+            xgfft = rfft(acc, n_fft, axis=0, workers=workers)
+            if fft_cache is not None:
+                fft_cache[n_fft] = xgfft
+        frqt = scipy.fft.rfftfreq(n_fft, d=dt_min)
+
+        # Fourier terms of the records along the last axis, so the inverse
+        # transforms of each record are contiguous
+        xgfft = np.moveaxis(xgfft, 0, -1)
+        wf = frqt * 2 * np.pi
 
-        # Calculate response acceleration time history
-        A, B = _get_step_matrix(wn, zeta, dt)
+        # Oscillators per block
+        block = max(int(fft_block_bytes // _fft_oscillator_bytes(n_fft, acc)), 1)
 
-        # Define utility function to be used with itertools.accumulate
-        def func(x_i: array_like_1d, a_i: array_like_1d) -> np.ndarray:
-            return np.dot(A, x_i) + np.dot(B, a_i)
+        # Calculate response for blocks of springs (along axis 0) with each wn
+        for start in range(0, len(group), block):
+            idx = group[start : start + block]
+            wn = w[idx].reshape((-1,) + (1,) * acc.ndim)
 
-        act = np.column_stack((acc[:-1], acc[1:]))
-        act = np.append(np.array([[0, 0], [0, acc[0]]]), act, axis=0)
-        x = np.array(list(accumulate(act, func)))
-        temp = -np.array([wn ** 2, 2 * zeta * wn])
-        z = np.dot(x, temp)
-        rs[k] = np.max(np.absolute(z))
+            # Displacement of spring mass (fourier terms)
+            xfft = -xgfft / (-(wf ** 2) + 2 * zeta * wn * 1j * wf + wn ** 2)
+
+            # Relative acceleration of spring mass (fourier terms)
+            accfft = -xfft * wf ** 2
+
+            # Absolute acceleration of spring mass (fourier terms)
+            abs_accfft = accfft + xgfft
+
+            # Get absolute acceleration of spring mass (time domain)
+            # Up-sample so that the final time history is sinc-
+            # interpolated with `FFT_MULTIPLIER` total points
+            a = irfft(abs_accfft, FFT_MULTIPLIER * n_fft, axis=-1, workers=workers)
+            a *= FFT_MULTIPLIER
+            yield idx, np.moveaxis(a, -1, 1)
 
-    return rs, frqs
+
+def _fft_oscillator_bytes(n_fft: int, acc: np.ndarray) -> int:
+    """Approximate memory (bytes) of the response histories of one oscillator for
+    all the records of `acc` with the 'fft' method: the up-sampled histories (and
+    the inverse transform buffers) and the complex fourier terms."""
+    return (3 * FFT_MULTIPLIER + 5) * 8 * n_fft * acc[0].size
 
 
 def _fft_rs(
-    acc: array_like_1d, time: array_like_1d, frqs: array_like_1d, zeta: float = 0.05,
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    frqs: array_like_1d,
+    zeta: float = 0.05,
+    fft_backend: Optional[str] = None,
+    fft_size_policy: Optional[str] = None,
+    fft_workers: Optional[int] = None,
+    fft_padding: Optional[str] = None,
+    fft_cache: Optional[dict] = None,
+    fft_block_bytes: Optional[int] = None,
 ) -> [np.ndarray, np.ndarray]:
     """Generate acceleration response spectrum using a frequency domain
     method at the given frequencies. This is physically accurate if the true
@@ -231,8 +639,10 @@ def _fft_rs(
 
     Parameters
     ----------
-    acc : 1d array_like
-        Input 1D acceleration time history.
+    acc : 1d or 2d array_like
+        Input acceleration time history. A 2D input is treated as multiple records
+        (one per column) that share the same `time`. The records are transformed
+        together, in blocks within `fft_block_bytes`.
     time : 1d array_like
         Input 1D time values for the acceleration time history, `acc`.
     frqs : 1d array_like
@@ -240,98 +650,507 @@ def _fft_rs(
     zeta : float, optional
         Critical damping ratio (dimensionless). Defaults to 0.05. Should be between 0
         and 1.
+    fft_backend : str, optional
+        FFT backend (see `FFT_BACKENDS`). Defaults to `DEFAULT_FFT_BACKEND`.
+    fft_size_policy : str, optional
+        Policy used to round up the padded record length to an efficient FFT size
+        (see `FFT_SIZE_POLICIES_DICT`). Defaults to `DEFAULT_FFT_SIZE_POLICY`.
+    fft_workers : int, optional
+        Number of threads used by the scipy and pyfftw backends. Defaults to
+        `DEFAULT_FFT_WORKERS`.
+    fft_padding : str, optional
+        Zero padding policy (see `FFT_PADDING_POLICIES` and `_fft_padding_classes`).
+        Defaults to `DEFAULT_FFT_PADDING`.
+    fft_cache : dict, optional
+        Transforms of `acc`, keyed by the padded transform length. Cached transforms
+        are reused, and the missing ones are computed and added to the cache, so
+        other products of the same record (eg. Fourier spectra, see
+        `autoRS.fourier`) can reuse them.
+    fft_block_bytes : int, optional
+        Approximate memory (bytes) of the response histories of the oscillators
+        and records whose inverse transforms are batched together. Defaults to
+        `FFT_BLOCK_BYTES`.
 
     Returns
     -------
     rs : ndarray
-        Array with spectral accelerations (same units as input acc).
+        Array with spectral accelerations (same units as input acc). Has shape
+        (n_frqs, n_records) for 2D inputs.
     frqs : ndarray
         Array with frequencies in Hz. Same as `frequencies`.
     """
 
     # Enforce ndarray type
     frqs = np.asarray(frqs)
+    acc = np.asarray(acc)
 
-    # Instantiate angular frequency and spectral acceleration arrays
-    w = frqs * 2 * np.pi
-    rs = 0 * w
+    rs = np.zeros(frqs.shape + acc.shape[1:])
 
-    # Define minimum timestep from input signal
-    dt_min = time[1] - time[0]
+    # Blocks of records, so that one oscillator of a block (at the longest padding)
+    # is within `fft_block_bytes`. The transforms are only cached for a single block
+    _, size_policy, _, padding = get_fft_settings(
+        fft_backend, fft_size_policy, fft_workers, fft_padding
+    )
+    if fft_block_bytes is None:
+        fft_block_bytes = FFT_BLOCK_BYTES
+    records = acc.reshape(len(acc), -1)
+    classes = _fft_padding_classes(
+        len(acc), time[1] - time[0], frqs * 2 * np.pi, zeta, padding, size_policy
+    )
+    n_fft = FFT_SIZE_POLICIES_DICT[size_policy](max(n_pad for n_pad, _ in classes))
+    record_bytes = _fft_oscillator_bytes(n_fft, records[:, :1])
+    n_block = max(int(fft_block_bytes // record_bytes), 1)
+    if records.shape[1] > n_block:
+        fft_cache = None
+    rs_records = rs.reshape(len(frqs), -1)
+
+    for start in range(0, records.shape[1], n_block):
+        histories = _fft_histories(
+            records[:, start : start + n_block] if acc.ndim > 1 else acc,
+            time,
+            frqs,
+            zeta,
+            fft_backend,
+            fft_size_policy,
+            fft_workers,
+            fft_padding,
+            fft_cache,
+            fft_block_bytes,
+        )
+        for idx, a in histories:
+            # Peak absolute acceleration of spring mass
+            peaks = np.max(np.absolute(a), axis=1)
+            rs_records[idx, start : start + n_block] = peaks.reshape(len(idx), -1)
 
-    # Calculate n, the integer to determine 0 padding at the end
-    # of the time history; making n a power of 2 improves the
-    # efficiency of the fft algorithm
-    n = len(acc)
-    n_fft = int(2 ** (np.ceil(np.log(1.5 * n) / np.log(2))))
+    return rs, frqs
+
+
+def _get_step_filter(
+    w: float, zeta: float, dt: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Express the step-by-step recurrence of [1] as an equivalent 2nd order
+    IIR filter from the ground acceleration to the absolute acceleration of the
+    oscillator.
+
+    Filtering ``[0, a_0, a_1, ...]`` with ``scipy.signal.lfilter(b, a, ...)``
+    reproduces the response of `_step_rs` (without up-sampling). Since the filter
+    state is only two values per oscillator, the response can be carried across
+    chunks of a record with the `zi` argument of `lfilter`.
+
+    Parameters
+    ----------
+    w : float
+        Angular frequency in rads/s.
 
-    # Get n for upsampling by sinc-interpolating so there are
-    # `multiplier` times as many points
-    multiplier = 8
+    zeta : float
+        Critical damping ratio (dimensionless).
+
+    dt : float
+        Timestep in s.
+
+    Returns
+    -------
+    b : (3,) ndarray
+        Numerator coefficients of the filter.
+
+    a : (3,) ndarray
+        Denominator coefficients of the filter.
+
+    References
+    ----------
+    .. [1] Nigam, Jennings, April 1969. Calculation of response Sepctra
+        from Stong-Motion Earthquake Records. Bulletin of the Seismological
+        Society of America. Vol 59, no. 2.
+    """
+
+    A, B = _get_step_matrix(w, zeta, dt)
+
+    # State space form: y_(i+1) = A y_i + B_d a_i, z_i = c y_i + D a_i,
+    # with the state y_i = x_i - B[:, 1] a_i
+    c = -np.array([w ** 2, 2 * zeta * w])
+    b_d = np.dot(A, B[:, 1]) + B[:, 0]
+    d = np.dot(c, B[:, 1])
 
-    # Get FFT of input acceleration
-    xgfft = np.fft.rfft(acc, n_fft)
-    frqt = np.fft.rfftfreq(n_fft, d=dt_min)
+    # Transfer function c (zI - A)^-1 b_d + d, with
+    # adj(zI - A) = z I + adj_0 and det(zI - A) = z^2 - trace z + det
+    trace = A[0, 0] + A[1, 1]
+    det = A[0, 0] * A[1, 1] - A[0, 1] * A[1, 0]
+    adj_0 = np.array([[-A[1, 1], A[0, 1]], [A[1, 0], -A[0, 0]]])
+
+    b = np.array(
+        [d, np.dot(c, b_d) - d * trace, np.dot(c, np.dot(adj_0, b_d)) + d * det]
+    )
+    a = np.array([1, -trace, det])
+
+    return b, a
+
+
+def _filter_histories(
+    acc: np.ndarray, dt: float, w: np.ndarray, zeta: float,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Generate the absolute acceleration response history of each oscillator with
+    angular frequency in `w` to the acceleration `acc` (along axis 0) sampled at
+    `dt`, using the step-by-step filter from `_get_step_filter`. Yields the index
+    of the oscillator in `w` and its response history (which starts from rest)."""
+
+    # The recurrence starts from rest with a zero acceleration sample
+    acc = np.concatenate((np.zeros((1,) + acc.shape[1:]), acc))
 
-    # Calculate response for a spring with each wn
     for k, wn in enumerate(w):
+        b, a = _get_step_filter(wn, zeta, dt)
+        yield k, lfilter(b, a, acc, axis=0)
+
+
+def _filter_peaks(
+    acc: np.ndarray, dt: float, w: np.ndarray, zeta: float,
+) -> np.ndarray:
+    """Peak absolute acceleration response of the oscillators with angular
+    frequencies `w` to the acceleration `acc` (along axis 0) sampled at `dt`, using
+    the step-by-step filter from `_get_step_filter`."""
+    rs = np.zeros(w.shape + acc.shape[1:])
+    for k, z in _filter_histories(acc, dt, w, zeta):
+        rs[k] = np.max(np.absolute(z), axis=0)
+    return rs
+
+
+def _multirate_samples_per_period(zeta: float) -> float:
+    """Samples per oscillator period needed by `_multirate_rs` so that the input
+    content removed by decimation (above ~0.4 times the sampling rate) is
+    transmitted to the oscillator by less than `TRANSMISSIBILITY_TOLERANCE`."""
+    samples_per_period = _transmitted_frequency_ratio(zeta) / 0.4
+    return max(samples_per_period, MULTIRATE_MIN_SAMPLES_PER_PERIOD)
+
+
+def _multirate_levels(
+    n: int, dt: float, frqs: np.ndarray, samples_per_period: float,
+) -> np.ndarray:
+    """Octave levels (decimation by 2**level) at which `_multirate_rs` steps the
+    oscillators at frequencies `frqs` for a time history with `n` samples at
+    timestep `dt`. Short records are not decimated below `_MULTIRATE_MIN_SAMPLES`
+    samples."""
+    levels = np.floor(-np.log2(dt * samples_per_period * np.asarray(frqs)))
+    max_level = max(int(np.log2(n / _MULTIRATE_MIN_SAMPLES)), 0)
+    return np.clip(levels, 0, max_level).astype(int)
+
+
+def _multirate_histories(
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    frqs: array_like_1d,
+    zeta: float = 0.05,
+    samples_per_period: float = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Generate the absolute acceleration response histories of the oscillators at
+    `frqs` with the multirate step-by-step method of `_multirate_rs` (see
+    `_multirate_rs` for the parameters). Decimated oscillators have decimated
+    histories.
+
+    The records are transformed together, with the time along the last axis of the
+    work arrays, and the oscillators are processed in blocks within
+    `fft_block_bytes` (at least one oscillator for all the records at a time, see
+    `_fft_rs` to also split the records).
+
+    Yields
+    ------
+    idx : ndarray
+        Indices of a block of oscillators in `frqs`.
+    histories : ndarray
+        Response histories of the block along axis 1, ie. with shape
+        (len(idx), n_time) + acc.shape[1:].
+    """
 
-        # Angular frequencies of fft
-        wf = frqt * 2 * np.pi
+    if samples_per_period is None:
+        samples_per_period = _multirate_samples_per_period(zeta)
 
-        # Displacement of spring mass (fourier terms)
-        xfft = -xgfft / (-(wf ** 2) + 2 * zeta * wn * 1j * wf + wn ** 2)
+    # Enforce ndarray type
+    frqs = np.asarray(frqs)
+    acc = np.asarray(acc, dtype=float)
+    dt = time[1] - time[0]
 
-        # Relative acceleration of spring mass (fourier terms)
-        accfft = -xfft * wf ** 2
+    # Octave level (decimation by 2**level) of each oscillator
+    levels = _multirate_levels(len(acc), dt, frqs, samples_per_period)
 
-        # Absolute acceleration of spring mass (fourier terms)
-        abs_accfft = accfft + xgfft
+    signal = acc
+    for level in range(levels.max() + 1):
+        if level > 0:
+            signal = decimate(signal, 2, ftype="fir", axis=0)
+        band = np.flatnonzero(levels == level)
+        w = 2 * np.pi * frqs[band]
+        for k, z in _filter_histories(signal, dt * 2 ** level, w, zeta):
+            yield band[k : k + 1], z[np.newaxis]
 
-        # Get absolute acceleration of spring mass (time domain)
-        # Up-sample so that the final time history is sinc-
-        # interpolated with `n_multiplier` total points
-        a = np.fft.irfft(abs_accfft, n=multiplier * n_fft) * multiplier
 
-        # Peak absolute acceleration of spring mass
-        rs[k] = np.max(np.absolute(a))
+def _multirate_rs(
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    frqs: array_like_1d,
+    zeta: float = 0.05,
+    samples_per_period: float = None,
+) -> [np.ndarray, np.ndarray]:
+    """Generate acceleration response spectrum by the step-by-step method [1],
+    evaluating each oscillator at a reduced sampling rate.
+
+    The input is anti-alias filtered and decimated by 2 repeatedly (polyphase FIR,
+    zero phase), and each oscillator is stepped at the lowest of these octave rates
+    that still gives `samples_per_period` samples per oscillator period. Each
+    decimated signal is shared by all the oscillators in its octave band.
+
+    The decimation removes input content above ~0.4 times the oscillator's sampling
+    rate, and the peaks are sampled more coarsely. By default, the sampling rate is
+    chosen so that the oscillator's transmissibility of the removed content is below
+    `TRANSMISSIBILITY_TOLERANCE` (~20 samples per period at 5% damping, more for
+    higher damping), and at least `MULTIRATE_MIN_SAMPLES_PER_PERIOD`. Results then
+    vary from the full rate step method by <1% on average (<5% for 95% of
+    frequencies) for typical earthquake records.
+
+    Parameters
+    ----------
+    acc : 1d or 2d array_like
+        Input acceleration time history. A 2D input is treated as multiple records
+        (one per column) that share the same `time`.
+    time : 1d array_like
+        Input 1D time values for the acceleration time history, `acc`.
+    frqs : 1d array_like
+        1D array of frequencies where the response is calculated.
+    zeta : float, optional
+        Critical damping ratio (dimensionless). Defaults to 0.05. Should be between 0
+        and 1.
+    samples_per_period : float, optional
+        Minimum number of samples per oscillator period. Defaults to
+        `_multirate_samples_per_period(zeta)`.
+
+    Returns
+    -------
+    rs : ndarray
+        Array with spectral accelerations (same units as input acc). Has shape
+        (n_frqs, n_records) for 2D inputs.
+    frqs : ndarray
+        Array with frequencies in Hz.
+
+    References
+    ----------
+    .. [1] Nigam, Jennings, April 1969. Calculation of response Spectra
+        from Strong-Motion Earthquake Records. Bulletin of the Seismological
+        Society of America. Vol 59, no. 2.
+    """
+
+    # Enforce ndarray type
+    frqs = np.asarray(frqs)
+    acc = np.asarray(acc, dtype=float)
+
+    rs = np.zeros(frqs.shape + acc.shape[1:])
+    for idx, z in _multirate_histories(acc, time, frqs, zeta, samples_per_period):
+        rs[idx] = np.max(np.absolute(z), axis=1)
+
+    return rs, frqs
+
+
+def _adaptive_rs(
+    rs_func,
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    frqs: array_like_1d,
+    zeta: float = 0.05,
+    tolerance: float = None,
+    max_frequencies: int = None,
+    **kwargs,
+) -> [np.ndarray, np.ndarray]:
+    """Generate acceleration response spectrum with the RS method `rs_func`,
+    refining the frequencies `frqs` where the spectrum is under-resolved.
+
+    Each iteration adds an oscillator at the (log) midpoint of every interval next
+    to a spectral peak, or next to a point that deviates from the log-log line
+    through its neighbours by more than `ADAPTIVE_CURVATURE`, if the interval is
+    wider than `tolerance` x the frequency. Only the new oscillators are evaluated.
+    Refinement stops when no intervals need refining, or when there are
+    `max_frequencies` oscillators; peaks with the highest spectral accelerations
+    are refined first. Peaks are then found to within `tolerance` x the peak
+    frequency. For 2D inputs, the envelope of the records is refined.
+
+    Parameters
+    ----------
+    rs_func : function
+        RS method (see `RS_METHODS_DICT`).
+    acc : 1d or 2d array_like
+        Input acceleration time history. A 2D input is treated as multiple records
+        (one per column) that share the same `time`.
+    time : 1d array_like
+        Input 1D time values for the acceleration time history, `acc`.
+    frqs : 1d array_like
+        1D array of increasing base frequencies.
+    zeta : float, optional
+        Critical damping ratio (dimensionless). Defaults to 0.05.
+    tolerance : float, optional
+        Relative frequency tolerance. Defaults to `ADAPTIVE_TOLERANCE`.
+    max_frequencies : int, optional
+        Maximum total number of frequencies. Defaults to `ADAPTIVE_MAX_FREQUENCIES`.
+    **kwargs
+        Additional keyword arguments for `rs_func`.
+
+    Returns
+    -------
+    rs : ndarray
+        Array with spectral accelerations (same units as input acc). Has shape
+        (n_frqs, n_records) for 2D inputs.
+    frqs : ndarray
+        Array with the refined (increasing) frequencies in Hz.
+    """
+
+    tolerance = ADAPTIVE_TOLERANCE if tolerance is None else tolerance
+    if max_frequencies is None:
+        max_frequencies = ADAPTIVE_MAX_FREQUENCIES
+
+    frqs = np.asarray(frqs, dtype=float)
+    rs, _ = rs_func(acc, time, frqs, zeta, **kwargs)
+
+    while len(frqs) < max_frequencies:
+        log_frqs = np.log(frqs)
+        log_rs = np.log(rs.max(axis=1) if rs.ndim == 2 else rs)
+
+        # Interior points that are peaks, or where the spectrum bends sharply
+        left, right = log_rs[:-2], log_rs[2:]
+        peaks = (log_rs[1:-1] >= left) & (log_rs[1:-1] >= right)
+        weights = (log_frqs[1:-1] - log_frqs[:-2]) / (log_frqs[2:] - log_frqs[:-2])
+        deviation = np.absolute(log_rs[1:-1] - (left + (right - left) * weights))
+        bends = deviation > ADAPTIVE_CURVATURE
+
+        # Intervals (i, i + 1) next to the flagged points, with a priority: peaks
+        # by their spectral acceleration, then bends
+        priority = np.full(len(frqs) - 1, -np.inf)
+        for flags, score in ((bends, log_rs[1:-1] - 1e3), (peaks, log_rs[1:-1])):
+            idx = np.flatnonzero(flags)
+            for side in (idx, idx + 1):
+                priority[side] = np.maximum(priority[side], score[flags])
+
+        # Only refine intervals wider than the tolerance
+        priority[np.diff(log_frqs) <= np.log(1 + tolerance)] = -np.inf
+        intervals = np.flatnonzero(priority > -np.inf)
+        if len(intervals) == 0:
+            break
+        intervals = intervals[np.argsort(-priority[intervals], kind="stable")]
+        intervals = intervals[: max_frequencies - len(frqs)]
+
+        # Evaluate the new oscillators and merge them into the grid
+        new_frqs = np.exp((log_frqs[intervals] + log_frqs[intervals + 1]) / 2)
+        new_rs, _ = rs_func(acc, time, new_frqs, zeta, **kwargs)
+        frqs = np.concatenate((frqs, new_frqs))
+        rs = np.concatenate((rs, new_rs))
+        order = np.argsort(frqs, kind="stable")
+        frqs, rs = frqs[order], rs[order]
 
     return rs, frqs
 
 
+def _rotated_peaks(
+    z1: np.ndarray, z2: np.ndarray, angles: np.ndarray, max_bytes: int,
+) -> np.ndarray:
+    """Peak absolute values of the rotated response histories
+    cos(angle) `z1` + sin(angle) `z2` (along axis 1) of a block of oscillators (along
+    axis 0) for each of the `angles` (in radians). Time is processed in chunks so
+    that the rotated values held in memory take up at most about `max_bytes`.
+
+    Returns
+    -------
+    peaks : ndarray
+        Array with shape (n_oscillators, n_angles).
+    """
+    cos = np.cos(angles)[np.newaxis, :, np.newaxis]
+    sin = np.sin(angles)[np.newaxis, :, np.newaxis]
+    n_osc, n_time = z1.shape
+
+    # Two arrays of rotated values are held at once (the rotated values and the
+    # `sin` term), which are reused for all the chunks
+    chunk = max(max_bytes // (2 * 8 * n_osc * len(angles)), 1)
+    rotated = np.empty((n_osc, len(angles), min(chunk, n_time)))
+    term = np.empty_like(rotated)
+
+    peaks = np.zeros((n_osc, len(angles)))
+    for start in range(0, n_time, chunk):
+        stop = min(start + chunk, n_time)
+        r, t = rotated[..., : stop - start], term[..., : stop - start]
+        np.multiply(cos, z1[:, np.newaxis, start:stop], out=r)
+        np.multiply(sin, z2[:, np.newaxis, start:stop], out=t)
+        np.add(r, t, out=r)
+        np.absolute(r, out=r)
+        np.maximum(peaks, np.max(r, axis=2), out=peaks)
+    return peaks
+
+
 # %% Global Variables
 
 RS_METHODS_DICT = {
     "fft": _fft_rs,
     "shake": _step_rs,
+    "multirate": _multirate_rs,
 }
 """Dictionary that provides access to the available RS generation algorithms."""
 
+RS_HISTORIES_DICT = {
+    "fft": _fft_histories,
+    "shake": _step_histories,
+    "multirate": _multirate_histories,
+}
+"""Dictionary that provides access to the response history generators of the RS
+generation algorithms."""
+
 RS_METHODS = tuple(RS_METHODS_DICT.keys())
 """Tuple that lists the available RS generation algorithms."""
 
 DEFAULT_METHOD = "fft"
 """Default RS algorithm method."""
 
+MULTIRATE_MIN_SAMPLES_PER_PERIOD = 10
+"""Minimum number of samples per oscillator period used by the 'multirate' method."""
+
+TRANSMISSIBILITY_TOLERANCE = 0.02
+"""Transmissibility below which input content is considered to not affect an
+oscillator (used by the 'multirate' and 'shake' methods)."""
+
+_MULTIRATE_MIN_SAMPLES = 64
+
+ROTD_MEMORY_BUDGET = 2 ** 26
+"""Approximate memory (bytes) used by the blocks of response histories and rotated
+response values held at once by `rotd_spectrum`."""
+
+ADAPTIVE_TOLERANCE = 0.005
+"""Default relative frequency tolerance for adaptive frequency refinement."""
+
+ADAPTIVE_MAX_FREQUENCIES = 400
+"""Default maximum number of frequencies with adaptive frequency refinement."""
+
+ADAPTIVE_CURVATURE = 0.1
+"""Deviation (in log spectral acceleration) from the log-log line through the
+neighbouring points above which the spectrum is refined."""
+
+STEP_SAMPLING_RATIO = 8
+"""Minimum ratio of the sampling frequency to the highest frequency that affects an
+oscillator used by the 'shake' method before up-sampling the input."""
+
 
 # %% Public RS generation functions
 
 
 def response_spectrum(
-    acc: array_like_1d,
+    acc: Union[array_like_1d, array_like_2d],
     time: array_like_1d,
     zeta: float = 0.05,
     high_frequency: bool = False,
     method=DEFAULT_METHOD,
     # additional_frequencies: Optional[array_like_1d] = None,
     # verbose = True,
+    adaptive: bool = False,
+    adaptive_tolerance: Optional[float] = None,
+    max_frequencies: Optional[int] = None,
+    **kwargs,
 ) -> [np.ndarray, np.ndarray]:
     """Generate acceleration response spectrum (RS) using one of the vailable methods.
 
     Parameters
     ----------
-    acc : 1d array_like
-        Input 1D acceleration time history.
+    acc : 1d or 2d array_like
+        Input acceleration time history. A 2D input of shape (n_time, n_records)
+        (eg. `MotionHistoryBatch.acceleration`) generates the spectra of all
+        records in one call.
     time : 1d array_like
         Input 1D time values for the acceleration time history, `acc`.
     zeta : float, optional, default = 0.05
@@ -345,13 +1164,29 @@ def response_spectrum(
         accurate and generally faster. The 'shake' step-by-step method is a common
         implementation in industry (eg. SHAKE2000). Results may vary on average by <1%
         provided the signal sampling frequency is > 8 x the highest frequency content.
+        The 'multirate' method is a faster step-by-step method that decimates the
+        input for low frequency oscillators (see `_multirate_rs`).
+    adaptive : bool, optional, default = False
+        If true, oscillators are added to the default frequencies where the
+        spectrum is under-resolved, eg. around narrow peaks (see `_adaptive_rs`).
+    adaptive_tolerance : float, optional
+        Relative frequency tolerance of the adaptive refinement. Defaults to
+        `ADAPTIVE_TOLERANCE`.
+    max_frequencies : int, optional
+        Maximum total number of frequencies of the adaptive refinement. Defaults to
+        `ADAPTIVE_MAX_FREQUENCIES`.
+    **kwargs
+        Additional keyword arguments for the RS method, eg. `fft_backend`,
+        `fft_size_policy`, `fft_workers`, `fft_padding`, `fft_cache`, and
+        `fft_block_bytes` for the 'fft' method (see `_fft_rs`).
 
     Returns
     -------
     rs : ndarray
-        Array with spectral accelerations (same units as input acc).
+        Array with spectral accelerations (same units as input acc). Has shape
+        (n_frqs, n_records) for 2D inputs.
     frqs : ndarray
-        Array with frequencies in Hz.
+        Array with frequencies in Hz. Non-uniformly refined if `adaptive`.
     """
 
     rs_func = RS_METHODS_DICT.get(method, RS_METHODS_DICT[DEFAULT_METHOD])
@@ -363,7 +1198,19 @@ def response_spectrum(
     frqs = get_default_frequencies(high_frequency=high_frequency)
 
     # Run RS algorithm
-    rs, _ = rs_func(acc, time, frqs, zeta)
+    if adaptive:
+        rs, frqs = _adaptive_rs(
+            rs_func,
+            acc,
+            time,
+            frqs,
+            zeta,
+            tolerance=adaptive_tolerance,
+            max_frequencies=max_frequencies,
+            **kwargs,
+        )
+    else:
+        rs, _ = rs_func(acc, time, frqs, zeta, **kwargs)
 
     # End timer and print timing info
     t1 = perf_counter()
@@ -375,3 +1222,241 @@ def response_spectrum(
     )
 
     return rs, frqs
+
+
+def streaming_response_spectrum(
+    chunks: Iterable[Union[array_like_1d, array_like_2d]],
+    dt: float,
+    frqs: Optional[array_like_1d] = None,
+    zeta: float = 0.05,
+    high_frequency: bool = False,
+) -> [np.ndarray, np.ndarray]:
+    """Generate acceleration response spectrum (RS) by the step-by-step method
+    from an acceleration time history that is supplied in consecutive chunks.
+
+    Each oscillator is run as the equivalent IIR filter of the step recurrence
+    (see `_get_step_filter`) with its state carried across chunk boundaries and
+    its peak response updated after every chunk. Memory use is
+    O(chunk + n_frqs) regardless of the record length, and the results are the
+    same as `_step_rs` on the whole record without up-sampling.
+
+    Parameters
+    ----------
+    chunks : iterable of 1d or 2d array_like
+        Consecutive chunks of the acceleration time history, eg. a generator,
+        or a file-backed iterator such as
+        ``(chunk["acc"] for chunk in FloatTable.open(path).iterchunks(n))``.
+        2D chunks of shape (n, n_records) are treated as multiple records.
+    dt : float
+        Timestep of the acceleration time history in s.
+    frqs : 1d array_like, optional
+        1D array of frequencies where the response is calculated. Defaults
+        to `get_default_frequencies(high_frequency)`.
+    zeta : float, optional, default = 0.05
+        Critical damping ratio (dimensionless). Should be between 0 and 1.
+    high_frequency : bool, optional, default = False
+        Frequency range of the RS if `frqs` is not given. See
+        `get_default_frequencies`.
+
+    Returns
+    -------
+    rs : ndarray
+        Array with spectral accelerations (same units as input acc). Has shape
+        (n_frqs, n_records) for 2D chunks.
+    frqs : ndarray
+        Array with frequencies in Hz.
+    """
+
+    if frqs is None:
+        frqs = get_default_frequencies(high_frequency=high_frequency)
+    frqs = np.asarray(frqs)
+    w = frqs * 2 * np.pi
+
+    filters = [_get_step_filter(wn, zeta, dt) for wn in w]
+    rs = None
+    zi = None
+
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=float)
+        if len(chunk) == 0:
+            continue
+
+        # The recurrence starts from rest with a zero acceleration sample
+        if rs is None:
+            rs = np.zeros(w.shape + chunk.shape[1:])
+            zi = np.zeros(w.shape + (2,) + chunk.shape[1:])
+            chunk = np.concatenate((np.zeros((1,) + chunk.shape[1:]), chunk))
+
+        for k, (b, a) in enumerate(filters):
+            z, zi[k] = lfilter(b, a, chunk, axis=0, zi=zi[k])
+            rs[k] = np.maximum(rs[k], np.max(np.absolute(z), axis=0))
+
+    if rs is None:
+        raise ValueError("No acceleration values were supplied in `chunks`.")
+
+    return rs, frqs
+
+
+def rolling_response_spectrum(
+    acc: Union[array_like_1d, array_like_2d],
+    time: array_like_1d,
+    window: float,
+    step: float,
+    frqs: Optional[array_like_1d] = None,
+    zeta: float = 0.05,
+    high_frequency: bool = False,
+) -> [np.ndarray, np.ndarray, np.ndarray]:
+    """Generate time-varying acceleration response spectra over sliding windows
+    of the acceleration time history (a spectrogram of SA).
+
+    Each oscillator is run once over the whole record by the step-by-step method
+    (see `_get_step_filter`), and the peak of its absolute acceleration within
+    each window is found with `sliding_maximum`. The cost is therefore
+    independent of the window overlap. Note that the oscillators are not
+    restarted at the start of each window, so the spectra include the response
+    carried into the window by earlier motion. The first window is identical to
+    the step-by-step RS of the first `window` seconds of the record.
+
+    Parameters
+    ----------
+    acc : 1d or 2d array_like
+        Input acceleration time history. A 2D input is treated as multiple records
+        (one per column) that share the same `time`.
+    time : 1d array_like
+        Input 1D time values for the acceleration time history, `acc`.
+    window : float
+        Duration of each window in s.
+    step : float
+        Time between the starts of consecutive windows in s.
+    frqs : 1d array_like, optional
+        1D array of frequencies where the response is calculated. Defaults
+        to `get_default_frequencies(high_frequency)`.
+    zeta : float, optional, default = 0.05
+        Critical damping ratio (dimensionless). Should be between 0 and 1.
+    high_frequency : bool, optional, default = False
+        Frequency range of the RS if `frqs` is not given. See
+        `get_default_frequencies`.
+
+    Returns
+    -------
+    rs : ndarray
+        Array with spectral accelerations (same units as input acc) of shape
+        (n_windows, n_frqs), or (n_windows, n_frqs, n_records) for 2D inputs.
+    frqs : ndarray
+        Array with frequencies in Hz.
+    window_start : ndarray
+        Start time of each window in s.
+    """
+
+    if frqs is None:
+        frqs = get_default_frequencies(high_frequency=high_frequency)
+    frqs = np.asarray(frqs)
+    acc = np.asarray(acc, dtype=float)
+    time = np.asarray(time)
+    w = frqs * 2 * np.pi
+
+    # Convert the window and step durations to numbers of samples
+    dt = time[1] - time[0]
+    n_window = int(round(window / dt))
+    n_step = max(int(round(step / dt)), 1)
+    if not 1 <= n_window <= len(acc):
+        raise ValueError(
+            f"`window` ({window}s) must be between `dt` and the record duration."
+        )
+    n_windows = (len(acc) - n_window) // n_step + 1
+
+    # The recurrence starts from rest with a zero acceleration sample
+    acc = np.concatenate((np.zeros((1,) + acc.shape[1:]), acc))
+
+    rs = np.zeros((n_windows,) + w.shape + acc.shape[1:])
+    for k, wn in enumerate(w):
+        b, a = _get_step_filter(wn, zeta, dt)
+        z = lfilter(b, a, acc, axis=0)[1:]
+        rs[:, k] = sliding_maximum(np.absolute(z), n_window, n_step)
+
+    return rs, frqs, time[np.arange(n_windows) * n_step]
+
+
+def rotd_spectrum(
+    acc_h1: array_like_1d,
+    acc_h2: array_like_1d,
+    time: array_like_1d,
+    percentiles: Union[float, array_like_1d] = (50, 100),
+    zeta: float = 0.05,
+    high_frequency: bool = False,
+    method: str = DEFAULT_METHOD,
+    frqs: Optional[array_like_1d] = None,
+    n_angles: int = 180,
+    max_bytes: Optional[int] = None,
+    **kwargs,
+) -> [np.ndarray, np.ndarray]:
+    """Generate orientation-independent RotDnn acceleration response spectra (eg.
+    RotD50, RotD100) of a two-component horizontal ground motion.
+
+    The oscillator response is linear, so the response to the ground motion rotated
+    by an angle theta is cos(theta) r1 + sin(theta) r2, where r1 and r2 are the
+    responses to the two components. Only the two response histories of each
+    oscillator are generated (with the response history generator of `method`,
+    see `RS_HISTORIES_DICT`), and the peaks for all angles are found from them in
+    vectorized blocks (see `_rotated_peaks`). The RotDnn spectrum is the nn-th
+    percentile of the peaks over the angles in [0, 180) degrees.
+
+    The oscillators are processed in blocks sized from `max_bytes`: half of it for
+    the response histories of a block (the 'fft' method batches its oscillators
+    within it, the step methods generate one oscillator at a time), and half for the
+    rotated values. So memory does not grow with the record length beyond a single
+    oscillator's response histories.
+
+    Parameters
+    ----------
+    acc_h1, acc_h2 : 1d array_like
+        Input acceleration time histories of the two horizontal components.
+    time : 1d array_like
+        Input 1D time values for the acceleration time histories.
+    percentiles : float or 1d array_like, optional, default = (50, 100)
+        Percentiles of the peak response over all angles, eg. 50 for RotD50 and
+        100 for RotD100.
+    zeta : float, optional, default = 0.05
+        Critical damping ratio (dimensionless). Should be between 0 and 1.
+    high_frequency : bool, optional, default = False
+        Frequency range of the RS if `frqs` is not given. See
+        `get_default_frequencies`.
+    method : str, optional, default = `DEFAULT_METHOD`
+        The RS method to be used. See `RS_METHODS`.
+    frqs : 1d array_like, optional
+        1D array of frequencies where the response is calculated. Defaults
+        to `get_default_frequencies(high_frequency)`.
+    n_angles : int, optional, default = 180
+        Number of equally spaced rotation angles in [0, 180) degrees.
+    max_bytes : int, optional
+        Approximate memory (bytes) of the blocks of response histories and rotated
+        values. Defaults to `ROTD_MEMORY_BUDGET`.
+    **kwargs
+        Additional keyword arguments for the RS method (see `response_spectrum`).
+
+    Returns
+    -------
+    rotd : ndarray
+        Array with the RotDnn spectral accelerations (same units as input acc) with
+        shape (n_frqs, n_percentiles), or (n_frqs,) for a single percentile.
+    frqs : ndarray
+        Array with frequencies in Hz.
+    """
+
+    if frqs is None:
+        frqs = get_default_frequencies(high_frequency=high_frequency)
+    frqs = np.asarray(frqs)
+    acc = np.column_stack((acc_h1, acc_h2)).astype(float)
+    histories_func = RS_HISTORIES_DICT.get(method, RS_HISTORIES_DICT[DEFAULT_METHOD])
+    angles = np.arange(n_angles) * np.pi / n_angles
+    if max_bytes is None:
+        max_bytes = ROTD_MEMORY_BUDGET
+    if histories_func is _fft_histories:
+        kwargs.setdefault("fft_block_bytes", max_bytes // 2)
+
+    rotd = np.zeros(frqs.shape + np.shape(percentiles))
+    for idx, z in histories_func(acc, time, frqs, zeta, **kwargs):
+        peaks = _rotated_peaks(z[..., 0], z[..., 1], angles, max_bytes // 2)
+        rotd[idx] = np.moveaxis(np.percentile(peaks, percentiles, axis=1), 0, -1)
+
+    return rotd, frqs
@@ -0,0 +1,156 @@
+"""Out-of-core processing of wide .csv time history files: the columns are spilled
+to a temporary columnar store in a single pass over the file, and read back in
+blocks of columns."""
+
+# %% Import required modules
+
+# Standard library imports
+import tempfile
+from itertools import chain, islice
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Third party imports
+import numpy as np
+
+# %% Global variables
+
+MEMORY_BUDGET: float = 512.0
+"""Default memory budget (MB) of out-of-core .csv processing."""
+
+CSV_DELETECHARS: str = " !#$%&'()*+,-./:;<=>?[\\]^{|}~"
+"""Characters removed from .csv column names (see `np.genfromtxt`)."""
+
+_PARSE_BYTES_PER_VALUE: int = 320
+"""Approximate peak memory used by `np.genfromtxt` per parsed value, including
+the text lines."""
+
+_BYTES_PER_FLOAT: int = 8
+
+
+# %% Class definitions
+
+
+class ColumnStore:
+    """Temporary on-disk store of float columns, written in blocks of rows and read
+    in blocks of columns.
+
+    Each block of rows is written with its columns stored contiguously, so a block
+    of columns is read with one contiguous read per block of rows, and the memory
+    used only depends on the number of columns read. The store is deleted when it
+    is closed (or garbage collected).
+    """
+
+    def __init__(
+        self, column_names: Sequence[str], directory: Optional[str] = None
+    ) -> None:
+        """Initialize an empty store for the columns `column_names`, in a temporary
+        file in `directory` (defaults to the system temporary directory)."""
+        self.column_names = tuple(column_names)
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._chunks: List[Tuple[int, int]] = []  # (byte offset, rows) of each block
+        self.n_rows = 0
+
+    def __enter__(self) -> "ColumnStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.n_rows, len(self.column_names)
+
+    def append(self, rows: np.ndarray) -> None:
+        """Append a block of rows with shape (n_rows, n_columns)."""
+        rows = np.asarray(rows, dtype="<f8").reshape(-1, len(self.column_names))
+        if not len(rows):
+            return
+        self._file.seek(0, 2)
+        self._chunks.append((self._file.tell(), len(rows)))
+        self._file.write(rows.tobytes(order="F"))
+        self.n_rows += len(rows)
+
+    def read_columns(self, start: int, stop: int) -> np.ndarray:
+        """Read the columns `start` to `stop` (excluded) into an (n_rows,
+        stop - start) Fortran-ordered array."""
+        stop = min(stop, len(self.column_names))
+        n_columns = max(stop - start, 0)
+        out = np.empty((self.n_rows, n_columns), order="F")
+        row = 0
+        for offset, n_rows in self._chunks:
+            self._file.seek(offset + start * n_rows * _BYTES_PER_FLOAT)
+            block = np.fromfile(self._file, dtype="<f8", count=n_columns * n_rows)
+            out[row : row + n_rows] = block.reshape((n_columns, n_rows)).T
+            row += n_rows
+        return out
+
+    def iter_columns(
+        self, start: int = 0, block_size: int = 1
+    ) -> Iterator[Tuple[str, np.ndarray]]:
+        """Iterate over (name, values) of the columns from `start`, reading
+        `block_size` columns at a time. The values are copies, so only one block is
+        held in memory at a time."""
+        for first in range(start, len(self.column_names), block_size):
+            block = self.read_columns(first, first + block_size)
+            for j, name in enumerate(self.column_names[first : first + block_size]):
+                yield name, block[:, j].copy()
+            del block
+
+    def close(self) -> None:
+        """Close and delete the store."""
+        self._file.close()
+
+
+# %% Main functions
+
+
+def block_size(n_rows: int, memory_budget: float = MEMORY_BUDGET) -> int:
+    """Number of columns of `n_rows` values that fit in half of the
+    `memory_budget` (MB). The other half is left for processing the columns."""
+    return max(int(memory_budget * 2 ** 20 / 2 // (n_rows * _BYTES_PER_FLOAT)), 1)
+
+
+def processing_bytes(memory_budget: float = MEMORY_BUDGET, n_processes: int = 1) -> int:
+    """Bytes of the `memory_budget` (MB) left for processing the columns read in
+    blocks of `block_size`, shared equally by `n_processes` processes."""
+    return max(int(memory_budget * 2 ** 20 / 2 // max(n_processes, 1)), 1)
+
+
+def spill_csv(
+    path: str,
+    memory_budget: float = MEMORY_BUDGET,
+    skip_header: int = 1,
+    directory: Optional[str] = None,
+) -> ColumnStore:
+    """Parse a .csv file with column names (after `skip_header` lines) in a single
+    pass, spilling the values into a `ColumnStore`. The file is parsed in blocks of
+    rows sized so that parsing a block uses at most half of the `memory_budget`
+    (MB), so the memory used does not depend on the file size.
+
+    Values are parsed as by `np.genfromtxt` (missing values are NaN), and the
+    column names are cleaned in the same way.
+    """
+    with open(path, "r") as file:
+        lines = iter(file)
+        for _ in range(skip_header):
+            next(lines, None)
+        first_lines = list(islice(lines, 2))
+        names = np.genfromtxt(
+            first_lines,
+            delimiter=",",
+            names=True,
+            deletechars=CSV_DELETECHARS,
+        ).dtype.names
+        lines = chain(first_lines[1:], lines)
+        rows_per_block = max(
+            int(memory_budget * 2 ** 20 / 2 // (len(names) * _PARSE_BYTES_PER_VALUE)), 1
+        )
+
+        store = ColumnStore(names, directory)
+        while True:
+            block = list(islice(lines, rows_per_block))
+            if not block:
+                break
+            values = np.genfromtxt(block, delimiter=",", usecols=range(len(names)))
+            store.append(values)
+    return store
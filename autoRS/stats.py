@@ -0,0 +1,164 @@
+"""Streaming statistics of many response spectra, updated one spectrum at a time."""
+
+# %% Import required modules
+
+# Standard library imports
+from typing import Sequence, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from autoRS.typing import array_like_1d, array_like_2d
+from autoRS.core import MotionSpectra
+
+# %% Global variables
+
+SUMMARY_FNAME: str = "RS_summary.csv"
+"""Name of the summary file written to the RS folder."""
+
+SUMMARY_QUANTILES: Sequence[float] = (0.5, 0.84)
+"""Quantiles (fractions) included in the summary file."""
+
+LOG_BIN_WIDTH: float = 0.005
+"""Width of the histogram bins used to estimate quantiles, in natural log units.
+Quantiles are linearly interpolated within a bin, so their relative error is well
+below 0.5%."""
+
+
+# %% Class definitions
+
+
+class SpectraStatistics:
+    """Running statistics per frequency of a set of spectra.
+
+    The statistics are updated as each spectrum is produced, so the memory used does
+    not depend on the number of spectra:
+
+    - Mean and variance of ln(S_a) with Welford's algorithm.
+    - Quantiles from a histogram of ln(S_a) with bins of fixed width
+      (`LOG_BIN_WIDTH`). The histogram only spans the range of bins seen so far.
+    - Minimum and maximum envelopes.
+    """
+
+    def __init__(self, frequency: array_like_1d) -> None:
+        """Initialize empty statistics for spectra defined at `frequency` (Hz)."""
+        self.frequency = np.asarray(frequency, dtype=float)
+        n_frqs = len(self.frequency)
+        self.count = 0
+        self._mean = np.zeros(n_frqs)
+        self._m2 = np.zeros(n_frqs)
+        self._min = np.full(n_frqs, np.inf)
+        self._max = np.full(n_frqs, -np.inf)
+
+        # Histogram counts of ln(S_a). Column j is the bin [k, k + 1) * LOG_BIN_WIDTH
+        # with k = self._offset + j.
+        self._counts = np.zeros((n_frqs, 0), dtype=np.int64)
+        self._offset = 0
+
+    def _expand(self, low: int, high: int) -> None:
+        """Extend the histogram to cover the bins from `low` to `high`."""
+        if self._counts.shape[1] == 0:
+            self._offset = low
+            self._counts = np.zeros((len(self.frequency), high - low + 1), np.int64)
+            return
+        low = min(low, self._offset)
+        high = max(high, self._offset + self._counts.shape[1] - 1)
+        if low == self._offset and high - low + 1 == self._counts.shape[1]:
+            return
+        counts = np.zeros((len(self.frequency), high - low + 1), dtype=np.int64)
+        start = self._offset - low
+        counts[:, start : start + self._counts.shape[1]] = self._counts
+        self._counts, self._offset = counts, low
+
+    def update(self, acceleration: Union[array_like_1d, array_like_2d]) -> None:
+        """Add spectral accelerations with shape (n_frequencies,) for one spectrum,
+        or (n_frequencies, n_spectra) for several spectra. The accelerations must be
+        positive and finite."""
+        sa = np.asarray(acceleration, dtype=float)
+        if sa.ndim == 1:
+            sa = sa[:, None]
+        if sa.shape[0] != len(self.frequency):
+            raise ValueError("Spectra must have one row per frequency.")
+        if not np.all(np.isfinite(sa) & (sa > 0)):
+            raise ValueError("Spectral accelerations must be positive and finite.")
+
+        log_sa = np.log(sa)
+        for column in log_sa.T:
+            self.count += 1
+            delta = column - self._mean
+            self._mean += delta / self.count
+            self._m2 += delta * (column - self._mean)
+        np.minimum(self._min, sa.min(axis=1), out=self._min)
+        np.maximum(self._max, sa.max(axis=1), out=self._max)
+
+        bins = np.floor(log_sa / LOG_BIN_WIDTH).astype(np.int64)
+        self._expand(bins.min(), bins.max())
+        n_bins = self._counts.shape[1]
+        flat = (bins - self._offset) + n_bins * np.arange(len(self.frequency))[:, None]
+        self._counts += np.bincount(
+            flat.ravel(), minlength=self._counts.size
+        ).reshape(self._counts.shape)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Geometric mean, i.e. exp(mean(ln(S_a)))."""
+        return np.exp(self._mean)
+
+    @property
+    def log_std(self) -> np.ndarray:
+        """Sample standard deviation of ln(S_a)."""
+        if self.count < 2:
+            return np.zeros(len(self.frequency))
+        return np.sqrt(self._m2 / (self.count - 1))
+
+    @property
+    def minimum(self) -> np.ndarray:
+        """Lower envelope of the spectra."""
+        return self._min.copy()
+
+    @property
+    def maximum(self) -> np.ndarray:
+        """Upper envelope of the spectra."""
+        return self._max.copy()
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Estimate the quantile `q` (0 <= q <= 1) of the spectra at each frequency.
+
+        The bin containing the quantile is found from the cumulative histogram, and
+        the quantile is linearly interpolated in ln(S_a) within the bin. The result
+        is bounded by the minimum and maximum envelopes.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+        if self.count == 0:
+            raise ValueError("No spectra have been added.")
+
+        cumulative = np.cumsum(self._counts, axis=1)
+        target = q * self.count
+        rows = np.arange(len(self.frequency))
+        j = np.minimum(
+            np.sum(cumulative < target, axis=1), self._counts.shape[1] - 1
+        )
+        below = cumulative[rows, j] - self._counts[rows, j]
+        fraction = (target - below) / np.maximum(self._counts[rows, j], 1)
+        log_sa = (self._offset + j + np.clip(fraction, 0, 1)) * LOG_BIN_WIDTH
+        return np.clip(np.exp(log_sa), self._min, self._max)
+
+    def to_spectra(
+        self, quantiles: Sequence[float] = SUMMARY_QUANTILES, zeta: float = 0.05
+    ) -> MotionSpectra:
+        """Summary of the statistics as spectra with the columns: geometric mean
+        (S_a_mean), standard deviation of ln(S_a) (ln_std), the `quantiles` (eg.
+        S_a_p50), and the minimum and maximum envelopes (S_a_min, S_a_max)."""
+        columns = {"S_a_mean": self.mean, "ln_std": self.log_std}
+        for q in quantiles:
+            columns["S_a_p{:g}".format(100 * q)] = self.quantile(q)
+        columns["S_a_min"] = self.minimum
+        columns["S_a_max"] = self.maximum
+        return MotionSpectra(
+            self.frequency,
+            np.column_stack(list(columns.values())),
+            zeta=zeta,
+            column_names=list(columns.keys()),
+        )
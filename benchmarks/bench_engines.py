@@ -0,0 +1,176 @@
+"""Benchmarks of the RS engines (`_fft_rs`, `_step_rs`, and `_multirate_rs`)."""
+
+# %% Import required modules
+
+# Standard library imports
+from itertools import product
+from typing import Dict, Iterator, Sequence
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from context import autoRS
+from autoRS.spectrum import (
+    FFT_PADDING_POLICIES,
+    _fft_rs,
+    _step_rs,
+    _multirate_rs,
+    rolling_response_spectrum,
+    streaming_response_spectrum,
+)
+from common import (
+    Case,
+    DAMPING_COUNTS,
+    DAMPING_RATIOS,
+    DT,
+    FREQUENCY_COUNTS,
+    generate_record,
+    get_frequencies,
+)
+
+# %% Global variables
+
+ENGINES = {
+    "_fft_rs": _fft_rs,
+    "_step_rs": _step_rs,
+    "_multirate_rs": _multirate_rs,
+}
+"""RS engines benchmarked."""
+
+PADDING_LENGTHS: Sequence[int] = (1_000, 2_000, 4_000, 10_000)
+"""Record lengths (samples) of the 'fft' padding policy cases, where the 'damping'
+policy should not be slower than the 'fixed' policy."""
+
+BATCH_LENGTHS: Sequence[int] = (1_000, 20_000)
+"""Record lengths (samples) of the cases comparing the 'fft' method for several
+records at once (batched) with a loop over the records, which should not be
+faster."""
+
+BATCH_RECORDS: int = 20
+"""Number of records of the batched 'fft' cases."""
+
+ROLLING_LENGTHS: Sequence[int] = (4_000, 20_000)
+"""Record lengths (samples) of the cases comparing `rolling_response_spectrum` with
+restarting the step method in every window, which should be several times
+slower."""
+
+ROLLING_WINDOW: int = 2_000
+"""Window length (samples) of the rolling RS cases."""
+
+ROLLING_STEP: int = 100
+"""Step between the windows (samples) of the rolling RS cases."""
+
+
+# %% Functions
+
+
+def get_relative_error(
+    acc: np.ndarray, time: np.ndarray, frqs: np.ndarray, zetas: Sequence[float]
+) -> Dict[str, float]:
+    """Mean and 95th percentile relative error of `_multirate_rs` against the full
+    rate `_step_rs` (without up-sampling), over the oscillators and damping ratios."""
+    errors = np.concatenate(
+        [
+            np.absolute(
+                _multirate_rs(acc, time, frqs, zeta)[0]
+                / _step_rs(acc, time, frqs, zeta, upsample=False)[0]
+                - 1
+            )
+            for zeta in zetas
+        ]
+    )
+    return {
+        "mean_relative_error": float(np.mean(errors)),
+        "p95_relative_error": float(np.quantile(errors, 0.95)),
+    }
+
+
+def cases(lengths: Sequence[int], quick: bool = False) -> Iterator[Case]:
+    """RS of one record for each engine, record length, oscillator count, and
+    damping count. The quick suite only uses the default frequencies and one
+    damping ratio. The `_multirate_rs` cases also record its relative error (see
+    `get_relative_error`), and the padding policies of `_fft_rs` are compared for
+    short records (see `PADDING_LENGTHS`), as are batched and looped records (see
+    `BATCH_LENGTHS`) and the rolling RS (see `ROLLING_LENGTHS`). Throughput is in
+    samples x oscillators x damping ratios per s."""
+    frequency_counts = FREQUENCY_COUNTS[:1] if quick else FREQUENCY_COUNTS
+    damping_counts = DAMPING_COUNTS[:1] if quick else DAMPING_COUNTS
+    for n, n_frqs, n_zetas in product(lengths, frequency_counts, damping_counts):
+        acc = generate_record(n)
+        time = np.arange(n) * DT
+        frqs = get_frequencies(n_frqs)
+        zetas = DAMPING_RATIOS[:n_zetas]
+        for name, engine in ENGINES.items():
+            metrics = None
+            if engine is _multirate_rs:
+                metrics = get_relative_error(acc, time, frqs, zetas)
+            yield Case(
+                name,
+                {"n_samples": n, "n_frequencies": n_frqs, "n_damping": n_zetas},
+                lambda engine=engine, acc=acc, time=time, frqs=frqs, zetas=zetas: [
+                    engine(acc, time, frqs, zeta) for zeta in zetas
+                ],
+                n * n_frqs * n_zetas,
+                "oscillator-samples/s",
+                metrics,
+            )
+
+    # Padding policies of the 'fft' method for short records, with one FFT worker
+    frqs = get_frequencies(FREQUENCY_COUNTS[0])
+    for n, padding in product(PADDING_LENGTHS, FFT_PADDING_POLICIES):
+        acc = generate_record(n)
+        time = np.arange(n) * DT
+        yield Case(
+            "_fft_rs_padding",
+            {"n_samples": n, "n_frequencies": len(frqs), "padding": padding},
+            lambda acc=acc, time=time, padding=padding: _fft_rs(
+                acc, time, frqs, fft_padding=padding, fft_workers=1
+            ),
+            n * len(frqs),
+            "oscillator-samples/s",
+        )
+
+    # Several records at once, or one at a time
+    for n in BATCH_LENGTHS:
+        acc = generate_record(n, BATCH_RECORDS)
+        time = np.arange(n) * DT
+        for batched in (True, False):
+            yield Case(
+                "_fft_rs_records",
+                {"n_samples": n, "n_records": BATCH_RECORDS, "batched": batched},
+                lambda acc=acc, time=time, batched=batched: (
+                    _fft_rs(acc, time, frqs)
+                    if batched
+                    else [_fft_rs(record, time, frqs) for record in acc.T]
+                ),
+                n * len(frqs) * BATCH_RECORDS,
+                "oscillator-samples/s",
+            )
+
+    # Rolling RS, or the step method restarted in every window
+    for n in ROLLING_LENGTHS:
+        acc = generate_record(n)
+        time = np.arange(n) * DT
+        starts = range(0, n - ROLLING_WINDOW + 1, ROLLING_STEP)
+        yield Case(
+            "rolling_response_spectrum",
+            {"n_samples": n, "n_windows": len(starts), "rolling": True},
+            lambda acc=acc, time=time: rolling_response_spectrum(
+                acc, time, ROLLING_WINDOW * DT, ROLLING_STEP * DT, frqs=frqs
+            ),
+            n * len(frqs),
+            "oscillator-samples/s",
+        )
+        yield Case(
+            "rolling_response_spectrum",
+            {"n_samples": n, "n_windows": len(starts), "rolling": False},
+            lambda acc=acc, starts=starts: [
+                streaming_response_spectrum(
+                    [acc[i : i + ROLLING_WINDOW]], DT, frqs
+                )[0]
+                for i in starts
+            ],
+            n * len(frqs),
+            "oscillator-samples/s",
+        )
@@ -0,0 +1,66 @@
+"""Benchmarks of `cumulative_integral`, integrating many records in one 2D call
+against a loop over the records."""
+
+# %% Import required modules
+
+# Standard library imports
+from typing import Iterator, Sequence
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from context import autoRS
+from autoRS.core.utils import (
+    cumulative_integral,
+    integration_methods,
+    integration_spacing,
+)
+from common import Case, DT, generate_record
+
+# %% Global variables
+
+INTEGRATION_RECORDS: int = 20
+"""Number of records integrated per case. The batched cases should be faster than
+the looped cases."""
+
+
+# %% Functions
+
+
+def cases(lengths: Sequence[int], quick: bool = False) -> Iterator[Case]:
+    """Integrate `INTEGRATION_RECORDS` records with each integration method, in one
+    2D call into an existing array (batched) and one record at a time (looped), for
+    each record length. Throughput is in samples per s, over all the records."""
+    methods = ["simpson 1/3"] if quick else list(integration_methods)
+    for n in lengths:
+        y = generate_record(n, INTEGRATION_RECORDS)
+        t = np.arange(n) * DT
+        out = np.empty(y.shape)
+        spacing = integration_spacing(t)
+        for method in methods:
+            params = {
+                "n_samples": n,
+                "n_records": INTEGRATION_RECORDS,
+                "method": method,
+            }
+            work = n * INTEGRATION_RECORDS
+            yield Case(
+                "cumulative_integral(batched)",
+                params,
+                lambda y=y, out=out, spacing=spacing, method=method: (
+                    cumulative_integral(y, spacing=spacing, out=out, method=method)
+                ),
+                work,
+                "samples/s",
+            )
+            yield Case(
+                "cumulative_integral(looped)",
+                params,
+                lambda y=y, t=t, method=method: [
+                    cumulative_integral(y[:, i], t, method=method)
+                    for i in range(y.shape[1])
+                ],
+                work,
+                "samples/s",
+            )
@@ -0,0 +1,55 @@
+"""End-to-end benchmark of the folder pipeline (`autoRS.generate_rs`)."""
+
+# %% Import required modules
+
+# Standard library imports
+import os
+from contextlib import redirect_stdout
+from typing import Iterator, Sequence
+
+# Local application imports
+from context import autoRS
+from autoRS.spectrum import DEFAULT_METHOD, get_default_frequencies
+from bench_readers import CSV_COLUMNS, _write_ahl, _write_csv
+from common import Case, generate_record
+
+
+# %% Functions
+
+
+def _run_pipeline(directory: str) -> None:
+    """Run `generate_rs` in `directory`, without printing."""
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            autoRS.generate_rs()
+    finally:
+        os.chdir(cwd)
+
+
+def cases(
+    lengths: Sequence[int], quick: bool = False, directory: str = "."
+) -> Iterator[Case]:
+    """Generate the RS of a folder with one .ahl record and one .csv file with
+    `CSV_COLUMNS` records, for each record length, with the default settings. Each
+    case works in a new sub folder of `directory`. Throughput is in samples x
+    oscillators per s, over all the records."""
+    n_frqs = len(get_default_frequencies())
+    for n in lengths:
+        case_directory = os.path.join(directory, f"pipeline_{n}")
+        th_directory = os.path.join(case_directory, "th")
+        os.makedirs(th_directory, exist_ok=True)
+        acc = generate_record(n)
+        _write_ahl(os.path.join(th_directory, "record.ahl"), acc)
+        _write_csv(os.path.join(th_directory, "records.csv"), acc)
+        with open(os.path.join(case_directory, autoRS.SETTINGS_FNAME), "w") as file:
+            file.write(f"folder = th\nmethod = {DEFAULT_METHOD}\n")
+
+        yield Case(
+            "generate_rs",
+            {"n_samples": n, "n_records": CSV_COLUMNS + 1, "method": DEFAULT_METHOD},
+            lambda case_directory=case_directory: _run_pipeline(case_directory),
+            n * n_frqs * (CSV_COLUMNS + 1),
+            "oscillator-samples/s",
+        )
@@ -0,0 +1,113 @@
+"""Benchmarks of the time history file readers in `autoRS.rw`."""
+
+# %% Import required modules
+
+# Standard library imports
+import os
+from typing import Callable, Dict, Iterator, Sequence, Tuple
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from context import autoRS
+from autoRS.rw import (
+    read_shk_ahl,
+    read_dmd_acc,
+    read_fort_txt,
+    read_csv_multi,
+    read_peer_record,
+)
+from common import Case, DT, generate_record
+
+# %% Global variables
+
+CSV_COLUMNS: int = 4
+"""Number of acceleration columns in the generated .csv files."""
+
+
+# %% File writers
+# Each function writes a record `acc` in the format read by the matching reader.
+
+
+def _write_ahl(path: str, acc: np.ndarray) -> None:
+    with open(path, "w") as file:
+        file.write("SHAKE2000 AHL File - Acceleration Time History\n")
+        file.write("{:>10}{:>10}{:>10}    3    8   15\n".format(0, len(acc), DT))
+        file.write("Benchmark record\n")
+        for start in range(0, len(acc), 8):
+            file.write("".join(f"{a:15.6f}" for a in acc[start : start + 8]) + "\n")
+
+
+def _write_dmd_acc(path: str, acc: np.ndarray) -> None:
+    with open(path, "w") as file:
+        for i in range(5):
+            file.write(f"D-MOD benchmark header line {i + 1}\n")
+        file.write(f"Time step {DT}\n")
+        for i, a in enumerate(acc):
+            file.write(f"{(i + 1) * DT:.3f} {a:.6f} {a:.6f} {a / 2:.6f}\n")
+        file.write("0 0 0 0\n")
+
+
+def _write_fort_txt(path: str, acc: np.ndarray) -> None:
+    with open(path, "w") as file:
+        for i in range(8):
+            file.write(f"Fortran benchmark header line {i + 1}\n")
+        for start in range(0, len(acc), 8):
+            file.write("".join(f"{a:9.6f}" for a in acc[start : start + 8]) + "\n")
+
+
+def _write_csv(path: str, acc: np.ndarray) -> None:
+    columns = np.column_stack([np.arange(len(acc)) * DT] + [acc] * CSV_COLUMNS)
+    with open(path, "w") as file:
+        file.write("Benchmark record\n")
+        file.write(",".join(["time"] + [f"x_acc @ {i}" for i in range(CSV_COLUMNS)]))
+        file.write("\n")
+        np.savetxt(file, columns, fmt="%.6e", delimiter=",")
+
+
+def _write_peer(path: str, acc: np.ndarray) -> None:
+    with open(path, "w") as file:
+        file.write("PEER NGA STRONG MOTION DATABASE RECORD\n")
+        file.write("Benchmark, 1/1/2000, Station, UP\n")
+        file.write("ACCELERATION TIME SERIES IN UNITS OF G\n")
+        file.write(f"NPTS= {len(acc)}, DT= {DT:.4f} SEC\n")
+        for start in range(0, len(acc), 5):
+            file.write("".join(f"{a:15.7E}" for a in acc[start : start + 5]) + "\n")
+
+
+READERS: Dict[str, Tuple[Callable[[str], object], Callable, str, int]] = {
+    "read_shk_ahl": (read_shk_ahl, _write_ahl, ".ahl", 1),
+    "read_dmd_acc": (read_dmd_acc, _write_dmd_acc, ".acc", 3),
+    "read_fort_txt": (read_fort_txt, _write_fort_txt, ".txt", 1),
+    "read_csv_multi": (
+        lambda path: read_csv_multi(path, header=2),
+        _write_csv,
+        ".csv",
+        CSV_COLUMNS + 1,
+    ),
+    "read_peer_record": (read_peer_record, _write_peer, ".AT2", 1),
+}
+"""Reader, file writer, file extension, and values per sample of each format."""
+
+
+# %% Functions
+
+
+def cases(
+    lengths: Sequence[int], quick: bool = False, directory: str = "."
+) -> Iterator[Case]:
+    """Read a generated file of each format for each record length. The files are
+    written to `directory`. Throughput is in values read per s."""
+    for n in lengths:
+        acc = generate_record(n)
+        for name, (reader, writer, ext, values_per_sample) in READERS.items():
+            path = os.path.join(directory, f"{name}_{n}{ext}")
+            writer(path, acc)
+            yield Case(
+                name,
+                {"n_samples": n},
+                lambda reader=reader, path=path: reader(path),
+                n * values_per_sample,
+                "values/s",
+            )
@@ -0,0 +1,76 @@
+"""Benchmarks of `FloatTable` construction and opening of saved tables."""
+
+# %% Import required modules
+
+# Standard library imports
+import os
+from typing import Iterator, Sequence
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from context import autoRS
+from autoRS.core import FloatTable
+from common import Case, DT, generate_record
+
+# %% Global variables
+
+TABLE_COLUMNS: int = 8
+"""Number of columns of the benchmarked tables."""
+
+
+# %% Functions
+
+
+def cases(
+    lengths: Sequence[int], quick: bool = False, directory: str = "."
+) -> Iterator[Case]:
+    """Construct tables of `TABLE_COLUMNS` records from a 2D array, from a
+    dictionary of columns, and by appending rows in chunks, for each record length.
+    Also open a table saved in `directory` and read the end of its last column,
+    which should only read the header and that column. Throughput is in values per
+    s."""
+    for n in lengths:
+        data = generate_record(n, TABLE_COLUMNS)
+        index = np.arange(n) * DT
+        columns = {f"Col{i}": data[:, i] for i in range(TABLE_COLUMNS)}
+        chunk = max(n // 10, 1)
+
+        def append_rows(data=data, index=index, chunk=chunk):
+            table = FloatTable(raw_data=data[:chunk], index=index[:chunk])
+            for start in range(chunk, len(data), chunk):
+                table.append_rows(
+                    data[start : start + chunk], index[start : start + chunk]
+                )
+            return table
+
+        params = {"n_samples": n, "n_columns": TABLE_COLUMNS}
+        work = n * TABLE_COLUMNS
+        yield Case(
+            "FloatTable(array)",
+            params,
+            lambda data=data, index=index: FloatTable(raw_data=data, index=index),
+            work,
+            "values/s",
+        )
+        yield Case(
+            "FloatTable(dict)",
+            params,
+            lambda columns=columns, index=index: FloatTable(
+                raw_data=columns, index=index
+            ),
+            work,
+            "values/s",
+        )
+        yield Case("FloatTable.append_rows", params, append_rows, work, "values/s")
+
+        path = os.path.join(directory, f"table_{n}.bin")
+        FloatTable(raw_data=data, index=index).save(path)
+        yield Case(
+            "FloatTable.open",
+            params,
+            lambda path=path: FloatTable.open(path)[f"Col{TABLE_COLUMNS - 1}"][-1],
+            work,
+            "values/s",
+        )
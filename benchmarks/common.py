@@ -0,0 +1,113 @@
+"""Timing, memory measurement, and input generation shared by the benchmarks."""
+
+# %% Import required modules
+
+# Standard library imports
+import gc
+import tracemalloc
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from context import autoRS
+from autoRS.spectrum import get_default_frequencies
+
+# %% Global variables
+
+LENGTHS: Sequence[int] = (1_000, 10_000, 100_000, 1_000_000)
+"""Record lengths (samples) of the full benchmark suite."""
+
+QUICK_LENGTHS: Sequence[int] = (1_000, 10_000)
+"""Record lengths (samples) of the quick benchmark suite."""
+
+FREQUENCY_COUNTS: Sequence[int] = (100, 115, 500)
+"""Oscillator counts: the default (0.1-100Hz) and extended (0.1-1000Hz) RS
+frequencies, and a dense log-spaced grid (0.1-100Hz)."""
+
+DAMPING_RATIOS: Sequence[float] = (0.05, 0.02, 0.1)
+"""Damping ratios. A damping count of n uses the first n ratios."""
+
+DAMPING_COUNTS: Sequence[int] = (1, 3)
+"""Number of damping ratios per benchmark case."""
+
+DT: float = 0.005
+"""Timestep (s) of the generated records."""
+
+REPEAT: int = 3
+"""Default number of timed runs per case (the fastest is reported)."""
+
+
+# %% Class definitions
+
+
+class Case(NamedTuple):
+    """A benchmark case: `func` processes `work` units (eg. samples x
+    oscillators), so the throughput is `work` / time in `unit` per s. Optional
+    `metrics` (eg. the error of an approximate method) are added to its result."""
+
+    name: str
+    params: dict
+    func: Callable[[], object]
+    work: float
+    unit: str
+    metrics: Optional[Dict[str, float]] = None
+
+
+# %% Functions
+
+
+def measure(func: Callable[[], object], repeat: int = REPEAT) -> Dict[str, float]:
+    """Run `func` once with `tracemalloc` to get its peak (Python and NumPy)
+    memory, which also warms up caches, then time `repeat` more runs.
+
+    Returns
+    -------
+    measurement : dict
+        Fastest and median wall times (s) of the timed runs, and peak traced memory
+        (MB) above the memory in use before the run.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        func()
+        times.append(perf_counter() - t0)
+    return {
+        "time_s": min(times),
+        "median_s": median(times),
+        "repeat": repeat,
+        "peak_memory_mb": peak / 2 ** 20,
+    }
+
+
+def generate_record(n: int, n_records: int = 1, seed: int = 0) -> np.ndarray:
+    """Generate `n_records` broadband acceleration records (g) with `n` samples at
+    timestep `DT`: filtered white noise with a build-up and decay envelope. Returns
+    an array of shape (n,) or (n, n_records)."""
+    rng = np.random.default_rng(seed)
+    noise = rng.standard_normal((n, n_records))
+    noise = noise - 0.9 * np.roll(noise, 1, axis=0)  # Mild high pass
+    t = np.arange(n) / n
+    envelope = np.minimum(t / 0.1, 1) * np.exp(-3 * np.maximum(t - 0.5, 0))
+    acc = 0.1 * noise * envelope[:, None]
+    return acc[:, 0] if n_records == 1 else acc
+
+
+def get_frequencies(n_frqs: int) -> np.ndarray:
+    """Oscillator frequencies for the counts in `FREQUENCY_COUNTS`."""
+    for high_frequency in (False, True):
+        frqs = get_default_frequencies(high_frequency=high_frequency)
+        if len(frqs) == n_frqs:
+            return frqs
+    return np.geomspace(0.1, 100, n_frqs)
@@ -0,0 +1,16 @@
+"""
+File is used to import the autoRS package so it can be benchmarked by the benchmark
+scripts.
+"""
+
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..")  # '..' implies the
+    ),  # parent folder
+)
+
+import autoRS
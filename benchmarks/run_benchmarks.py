@@ -0,0 +1,250 @@
+"""Run the autoRS benchmarks, store the results as JSON, and compare two results.
+
+Usage (from the repository root)::
+
+    python benchmarks/run_benchmarks.py run [--suite SUITE] [--quick] [--output PATH]
+    python benchmarks/run_benchmarks.py compare BASE.json NEW.json [--threshold 1.2]
+
+Results are written to `benchmarks/results/<commit>.json` by default, so results of
+two commits can be compared to find regressions.
+"""
+
+# %% Import required modules
+
+# Standard library imports
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+# Third party imports
+import numpy as np
+import scipy
+
+# Local application imports
+import bench_engines
+import bench_integration
+import bench_pipeline
+import bench_readers
+import bench_table
+from common import LENGTHS, QUICK_LENGTHS, REPEAT, measure
+
+# %% Global variables
+
+BENCHMARK_DIR: str = os.path.dirname(os.path.abspath(__file__))
+"""Directory of the benchmark scripts."""
+
+RESULTS_DIR: str = os.path.join(BENCHMARK_DIR, "results")
+"""Default directory of the JSON results."""
+
+SUITES = {
+    "engines": bench_engines.cases,
+    "readers": bench_readers.cases,
+    "table": bench_table.cases,
+    "integration": bench_integration.cases,
+    "pipeline": bench_pipeline.cases,
+}
+"""Benchmark suites, each a function generating the benchmark cases."""
+
+FILE_SUITES = ("readers", "table", "pipeline")
+"""Suites writing input files to a temporary directory."""
+
+REGRESSION_THRESHOLD: float = 1.2
+"""Time or memory ratio (new / base) above which a case is a regression."""
+
+
+# %% Functions
+
+
+def get_commit() -> str:
+    """Short hash of the current git commit, with a '-dirty' suffix if the tree has
+    uncommitted changes, or 'unknown' outside of a git repository."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARK_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BENCHMARK_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + "-dirty" if status else commit
+
+
+def get_metadata() -> dict:
+    """Commit, date, and environment of a benchmark run."""
+    return {
+        "commit": get_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suites(
+    suites: Sequence[str],
+    lengths: Sequence[int],
+    quick: bool = False,
+    repeat: int = REPEAT,
+) -> List[dict]:
+    """Measure the cases of `suites` for the record `lengths` and print a line for
+    each case."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for suite in suites:
+            kwargs = {"directory": directory} if suite in FILE_SUITES else {}
+            for case in SUITES[suite](lengths, quick=quick, **kwargs):
+                measurement = measure(case.func, repeat=repeat)
+                result = {
+                    "suite": suite,
+                    "name": case.name,
+                    "params": case.params,
+                    **measurement,
+                    "throughput": case.work / measurement["time_s"],
+                    "unit": case.unit,
+                    **(case.metrics or {}),
+                }
+                results.append(result)
+                print(
+                    "{:<13}{:<30}{:<56}{:>10.4f} s{:>10.1f} MB{:>12.3e} {}".format(
+                        suite,
+                        case.name,
+                        format_params(case.params),
+                        result["time_s"],
+                        result["peak_memory_mb"],
+                        result["throughput"],
+                        case.unit,
+                    ),
+                    flush=True,
+                )
+    return results
+
+
+def format_params(params: dict) -> str:
+    return ", ".join(f"{key}={value}" for key, value in params.items())
+
+
+def result_key(result: dict) -> str:
+    """Key identifying the case of a result across runs."""
+    return "{}:{}:{}".format(
+        result["suite"], result["name"], format_params(result["params"])
+    )
+
+
+def compare(
+    base: dict, new: dict, threshold: float = REGRESSION_THRESHOLD
+) -> List[str]:
+    """Print the time and peak memory ratios (new / base) of the cases common to two
+    benchmark runs, and return the keys of the cases slower or using more memory
+    than `threshold` times the base."""
+    base_results = {result_key(result): result for result in base["results"]}
+    print(
+        "Base: {} ({}), new: {} ({})".format(
+            base["metadata"]["commit"],
+            base["metadata"]["timestamp"],
+            new["metadata"]["commit"],
+            new["metadata"]["timestamp"],
+        )
+    )
+    regressions = []
+    for result in new["results"]:
+        key = result_key(result)
+        if key not in base_results:
+            continue
+        base_result = base_results[key]
+        time_ratio = result["time_s"] / base_result["time_s"]
+        memory_ratio = (result["peak_memory_mb"] + 1) / (
+            base_result["peak_memory_mb"] + 1
+        )  # Offset of 1MB to ignore small absolute changes
+        regression = time_ratio > threshold or memory_ratio > threshold
+        if regression:
+            regressions.append(key)
+        print(
+            "{:<90}{:>8.2f}x time{:>8.2f}x memory{}".format(
+                key, time_ratio, memory_ratio, "  REGRESSION" if regression else ""
+            )
+        )
+    print(f"{len(regressions)} regression(s) above {threshold:.2f}x.")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks.")
+    run_parser.add_argument(
+        "--suite",
+        choices=list(SUITES) + ["all"],
+        nargs="+",
+        default=["all"],
+        help="Suites to run (default: all).",
+    )
+    run_parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Short records, default frequencies, and one damping ratio only.",
+    )
+    run_parser.add_argument(
+        "--lengths", type=int, nargs="+", help="Record lengths (samples) to run."
+    )
+    run_parser.add_argument(
+        "--repeat", type=int, default=REPEAT, help="Timed runs per case."
+    )
+    run_parser.add_argument(
+        "--output", help="JSON results path (default: results/<commit>.json)."
+    )
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results.")
+    compare_parser.add_argument("base", help="JSON results of the base commit.")
+    compare_parser.add_argument("new", help="JSON results of the new commit.")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Time or memory ratio flagged as a regression.",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.base) as file:
+            base = json.load(file)
+        with open(args.new) as file:
+            new = json.load(file)
+        return 1 if compare(base, new, args.threshold) else 0
+
+    suites = list(SUITES) if "all" in args.suite else args.suite
+    lengths = args.lengths or (QUICK_LENGTHS if args.quick else LENGTHS)
+    metadata = get_metadata()
+    results = run_suites(suites, lengths, quick=args.quick, repeat=args.repeat)
+    output: Dict[str, object] = {
+        "metadata": {**metadata, "quick": args.quick, "repeat": args.repeat},
+        "results": results,
+    }
+    path = args.output or os.path.join(RESULTS_DIR, f"{metadata['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(output, file, indent=2)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
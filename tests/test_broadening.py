@@ -0,0 +1,76 @@
+"""Unit tests for autoRS.broadening."""
+
+# Standard library imports
+import unittest
+import os
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+from autoRS.broadening import (
+    broaden,
+    design_spectrum,
+    write_design_spectrum,
+)
+from autoRS.core import MotionSpectra
+from autoRS.core.utils import loglog_interpolate
+from autoRS.spectrum import get_default_frequencies
+
+
+class TestBroadening(unittest.TestCase):
+    def setUp(self):
+        # Floor spectra with narrow peaks at a few frequencies
+        rng = np.random.default_rng(0)
+        self.frqs = get_default_frequencies()
+        peaks = rng.uniform(1, 20, size=(1, 30))
+        self.acc = 0.2 + np.exp(-(np.log(self.frqs[:, None] / peaks) / 0.05) ** 2)
+
+    def test_brute_force(self):
+        broadened = broaden(self.acc, self.frqs, 0.15)
+        self.assertEqual(broadened.shape, self.acc.shape)
+
+        # Maximum of the (log-log interpolated) spectra sampled densely over each
+        # window [f / 1.15, f / 0.85]
+        expected = np.array(
+            [
+                loglog_interpolate(
+                    np.geomspace(f / 1.15, f / 0.85, 2001), self.frqs, self.acc
+                ).max(axis=0)
+                for f in self.frqs
+            ]
+        )
+        np.testing.assert_allclose(broadened, expected, rtol=2e-3)
+        self.assertTrue(np.all(broadened >= expected * (1 - 1e-12)))
+
+        # The broadened peak covers +/-15% of the peak frequency
+        broadened = broaden([1, 1, 2, 1, 1], [8.4, 8.5, 10, 11.5, 11.6])
+        np.testing.assert_allclose(broadened[1:4], 2)
+        self.assertTrue(broadened[0] < 2 and broadened[4] < 2)
+        np.testing.assert_allclose(broaden(self.acc, self.frqs, 0), self.acc)
+
+    def test_design_spectrum(self):
+        enveloped, broadened = design_spectrum(self.acc, self.frqs)
+        np.testing.assert_array_equal(enveloped, self.acc.max(axis=1))
+        np.testing.assert_allclose(broadened, broaden(self.acc, self.frqs).max(axis=1))
+
+        path = "test_design.csv"
+        self.addCleanup(os.remove, path)
+        write_design_spectrum(path, self.acc, self.frqs, zeta=0.02)
+        design = MotionSpectra.from_csv(path)
+        self.assertEqual(design.column_names, ("S_a_envelope", "S_a_broadened"))
+        np.testing.assert_allclose(design.zeta, 0.02)
+        np.testing.assert_allclose(design.acceleration[:, 1], broadened, atol=1e-5)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            broaden(self.acc[1:], self.frqs)
+        with self.assertRaises(ValueError):
+            broaden(self.acc, self.frqs, 1)
+        with self.assertRaises(ValueError):
+            broaden(-self.acc, self.frqs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Unit tests for autoRS.combination."""
+
+# Standard library imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+from autoRS.combination import combine_spectra, group_columns
+
+
+class TestCombination(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.names = ["x_n1", "y_n1", "z_n1", "x_n2", "y_n2", "x_n3", "other"]
+        self.acc = rng.uniform(0.1, 2, size=(50, len(self.names)))
+
+    def test_group_columns(self):
+        self.assertEqual(
+            group_columns(self.names), {"n1": [0, 1, 2], "n2": [3, 4]},
+        )
+        self.assertEqual(
+            group_columns(self.names, r"^(?P<node>[xyz])_n\d$"),
+            {"x": [0, 3, 5], "y": [1, 4]},
+        )
+        with self.assertRaises(ValueError):
+            group_columns(self.names, r"^[xyz]_(.+)$")
+
+    def test_combine_spectra(self):
+        combined, names = combine_spectra(
+            self.acc, self.names, methods=("srss", "100-40-40")
+        )
+        self.assertEqual(names, ["n1_SRSS", "n2_SRSS", "n1_100-40-40", "n2_100-40-40"])
+        np.testing.assert_allclose(
+            combined[:, 0], np.sqrt(np.sum(self.acc[:, :3] ** 2, axis=1))
+        )
+        np.testing.assert_allclose(
+            combined[:, 1], np.sqrt(np.sum(self.acc[:, 3:5] ** 2, axis=1))
+        )
+
+        # 100-40-40: worst case of 100% of one component and 40% of the others
+        for column, idx in ((2, [0, 1, 2]), (3, [3, 4])):
+            total = self.acc[:, idx].sum(axis=1)
+            expected = np.max(
+                [self.acc[:, i] + 0.4 * (total - self.acc[:, i]) for i in idx], axis=0
+            )
+            np.testing.assert_allclose(combined[:, column], expected)
+
+        combined, names = combine_spectra(self.acc[:, -2:], self.names[-2:])
+        self.assertEqual((combined.shape, names), ((50, 0), []))
+        with self.assertRaises(ValueError):
+            combine_spectra(self.acc, self.names, methods=("abs",))
+
+
+if __name__ == "__main__":
+    unittest.main()
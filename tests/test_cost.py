@@ -0,0 +1,157 @@
+"""Unit tests for autoRS.cost."""
+
+# Standard library imports
+import unittest
+import os
+import json
+from time import perf_counter
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+from autoRS.cost import (
+    calibrate,
+    load_cost_model,
+    estimate_cost,
+    choose_method,
+    WORK_FUNCTIONS,
+    COST_MODEL_VERSION,
+    COST_MODEL_PATH,
+    EXACT_METHODS,
+    FFT_SETTING_KEYS,
+    _cost_models,
+    _is_valid,
+)
+from autoRS.spectrum import (
+    RS_METHODS_DICT,
+    get_default_frequencies,
+    get_fft_settings,
+    _step_upsampling_factors,
+)
+
+
+class TestCostModel(unittest.TestCase):
+    path = "test_cost_model.json"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = calibrate(cls.path, sizes=(1024, 4096))
+        cls.frqs = get_default_frequencies()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+
+    def test_default_path(self):
+        # The default cost model is kept in the user cache directory
+        self.assertTrue(os.path.isabs(COST_MODEL_PATH))
+        self.assertEqual(os.path.basename(os.path.dirname(COST_MODEL_PATH)), "autoRS")
+
+    def test_calibrate(self):
+        with open(self.path, "r") as file:
+            model = json.load(file)
+        self.assertEqual(model, self.model)
+        self.assertEqual(model["version"], COST_MODEL_VERSION)
+        self.assertEqual(set(model["coefficients"]), set(WORK_FUNCTIONS))
+        for coefficients in model["coefficients"].values():
+            self.assertEqual(len(coefficients), 2)
+            self.assertTrue(all(c >= 0 for c in coefficients))
+
+    def test_load(self):
+        # Loaded from disk without recalibrating
+        _cost_models.clear()
+        mtime = os.path.getmtime(self.path)
+        self.assertEqual(load_cost_model(self.path), self.model)
+        self.assertEqual(os.path.getmtime(self.path), mtime)
+
+        # Recalibrated if the file is out of date
+        path = "test_cost_model_old.json"
+        with open(path, "w") as file:
+            json.dump({"version": 0}, file)
+        try:
+            model = load_cost_model(path)
+            self.assertEqual(model["version"], COST_MODEL_VERSION)
+        finally:
+            os.remove(path)
+
+    def test_fft_settings(self):
+        # The model is only valid for the FFT settings it was calibrated for
+        self.assertEqual(
+            [self.model[key] for key in FFT_SETTING_KEYS], list(get_fft_settings())
+        )
+        self.assertTrue(_is_valid(self.model))
+        for key, value in (
+            ("fft_backend", "other"),
+            ("fft_size_policy", "other"),
+            ("fft_workers", -1),
+            ("fft_padding", "other"),
+        ):
+            self.assertFalse(_is_valid({**self.model, key: value}))
+
+    def test_estimate_kwargs(self):
+        # The shake work follows the upsample setting
+        frqs = get_default_frequencies(high_frequency=True)
+        self.assertGreater(_step_upsampling_factors(0.005, frqs).max(), 1)
+        costs = [
+            estimate_cost("shake", 10000, 0.005, frqs, model=self.model, upsample=u)
+            for u in (True, False)
+        ]
+        self.assertGreater(costs[0], costs[1])
+        self.assertEqual(
+            costs[0], estimate_cost("shake", 10000, 0.005, frqs, model=self.model)
+        )
+
+        # And the choice of method
+        method, cost = choose_method(
+            10000,
+            0.005,
+            frqs,
+            model=self.model,
+            method_kwargs={"shake": {"upsample": False}},
+        )
+        self.assertLessEqual(cost, costs[1])
+        if method == "shake":
+            self.assertEqual(cost, costs[1])
+
+    def test_estimate(self):
+        for method in WORK_FUNCTIONS:
+            costs = [
+                estimate_cost(method, n, 0.005, self.frqs, model=self.model)
+                for n in (1000, 10000, 100000)
+            ]
+            self.assertTrue(all(np.diff(costs) > 0))
+            cost_4 = estimate_cost(
+                method, 1000, 0.005, self.frqs, n_records=4, model=self.model
+            )
+            self.assertGreater(cost_4, costs[0])
+
+    def test_choose_method(self):
+        n, dt = 20000, 0.005
+        method, cost = choose_method(
+            n, dt, self.frqs, model=self.model, methods=tuple(WORK_FUNCTIONS)
+        )
+        self.assertIn(method, WORK_FUNCTIONS)
+        for other in WORK_FUNCTIONS:
+            self.assertLessEqual(
+                cost, estimate_cost(other, n, dt, self.frqs, model=self.model)
+            )
+
+        # Only the exact methods are chosen by default
+        exact_method, _ = choose_method(n, dt, self.frqs, model=self.model)
+        self.assertIn(exact_method, EXACT_METHODS)
+        self.assertNotIn("multirate", EXACT_METHODS)
+
+        # Estimated and actual costs have the same order of magnitude
+        acc = np.random.default_rng(0).standard_normal(n)
+        t0 = perf_counter()
+        RS_METHODS_DICT[method](acc, np.arange(n) * dt, self.frqs)
+        actual = perf_counter() - t0
+        print(f"\n{method}: estimated {cost:.4f}s, actual {actual:.4f}s")
+        self.assertLess(actual / cost, 10)
+        self.assertGreater(actual / cost, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
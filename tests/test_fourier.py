@@ -0,0 +1,121 @@
+"""Unit tests for autoRS.fourier."""
+
+# Standard library imports
+import unittest
+import os
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+from autoRS.fourier import (
+    fourier_spectra,
+    get_transform,
+    konno_ohmachi_matrix,
+    konno_ohmachi_smoothing,
+    write_fourier_csv,
+)
+from autoRS.spectrum import _fft_rs, get_default_frequencies
+from autoRS.rw import read_shk_ahl, read_csv_multi
+
+
+class TestFourierSpectra(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, cls.dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)
+        cls.time = np.arange(len(acc)) * cls.dt
+
+    def test_fas_psd(self):
+        fas, fas_frqs, psd, psd_frqs = fourier_spectra(
+            self.acc, self.dt, fft_size_policy="pow2"
+        )
+        n_fft = len(fas_frqs) * 2 - 2
+        expected = np.abs(np.fft.rfft(self.acc, n_fft)) * self.dt
+        np.testing.assert_allclose(fas, expected, rtol=1e-10, atol=1e-12)
+        np.testing.assert_array_equal(fas_frqs, np.fft.rfftfreq(n_fft, self.dt))
+        np.testing.assert_array_equal(psd_frqs, fas_frqs)
+
+        # The integral of the one-sided PSD is the mean square of the record
+        mean_square = np.mean(self.acc ** 2)
+        df = psd_frqs[1]
+        self.assertAlmostEqual(np.sum(psd) * df / mean_square, 1, places=6)
+
+        _, _, psd, psd_frqs = fourier_spectra(
+            self.acc, self.dt, psd_method="welch", segment_length=256
+        )
+        self.assertEqual(len(psd_frqs), 129)
+        self.assertAlmostEqual(np.sum(psd) * psd_frqs[1] / mean_square, 1, delta=0.1)
+
+        # Several records at once
+        fas2, _, psd2, _ = fourier_spectra(
+            np.column_stack((self.acc, 2 * self.acc)), self.dt, fft_size_policy="pow2"
+        )
+        np.testing.assert_allclose(fas2[:, 1], 2 * fas)
+        with self.assertRaises(ValueError):
+            fourier_spectra(self.acc, self.dt, psd_method="other")
+
+    def test_shared_transform(self):
+        # The RS transforms are reused
+        fft_cache = {}
+        frqs = get_default_frequencies()
+        rs, _ = _fft_rs(self.acc, self.time, frqs, fft_cache=fft_cache)
+        rs_check, _ = _fft_rs(self.acc, self.time, frqs)
+        np.testing.assert_array_equal(rs, rs_check)
+        n_cached = len(fft_cache)
+        self.assertGreater(n_cached, 0)
+
+        xgfft, n_fft = get_transform(self.acc, fft_cache)
+        self.assertEqual(n_fft, min(fft_cache))
+        self.assertIs(xgfft, fft_cache[n_fft])
+        fas, fas_frqs, _, _ = fourier_spectra(self.acc, self.dt, fft_cache=fft_cache)
+        self.assertEqual(len(fas_frqs), n_fft // 2 + 1)
+        self.assertEqual(len(fft_cache), n_cached)
+
+        # Without RS transforms, the transform is computed once for both products
+        fft_cache = {}
+        fourier_spectra(self.acc, self.dt, fft_cache=fft_cache)
+        self.assertEqual(len(fft_cache), 1)
+
+    def test_konno_ohmachi(self):
+        fas, frqs, _, _ = fourier_spectra(self.acc, self.dt)
+        smoothed, smooth_frqs = konno_ohmachi_smoothing(fas, frqs, bandwidth=40)
+        self.assertAlmostEqual(smooth_frqs[0], frqs[1])
+        self.assertAlmostEqual(smooth_frqs[-1], frqs[-1])
+
+        # Direct evaluation of the full window, where its main lobe spans several
+        # input frequencies
+        n = len(smooth_frqs)
+        for i in (n // 3, 2 * n // 3, n - 1):
+            x = 40 * np.log10(frqs[1:] / smooth_frqs[i])
+            window = np.sinc(x / np.pi) ** 4
+            expected = np.dot(window, fas[1:]) / np.sum(window)
+            self.assertAlmostEqual(smoothed[i] / expected, 1, delta=1e-3)
+
+        # Constant spectra are unchanged, and several spectra share the cached matrix
+        spectra = np.column_stack((fas, np.ones_like(fas)))
+        smoothed2, _ = konno_ohmachi_smoothing(spectra, frqs, smooth_frqs, 40)
+        np.testing.assert_allclose(smoothed2[:, 0], smoothed)
+        np.testing.assert_allclose(smoothed2[:, 1], 1)
+        self.assertIs(
+            konno_ohmachi_matrix(frqs, smooth_frqs, 40),
+            konno_ohmachi_matrix(frqs.copy(), smooth_frqs, 40.0),
+        )
+        with self.assertRaises(ValueError):
+            konno_ohmachi_smoothing(fas[1:], frqs)
+
+    def test_write(self):
+        path = "test_fourier.csv"
+        self.addCleanup(os.remove, path)
+        fas, frqs, _, _ = fourier_spectra(self.acc, self.dt)
+        write_fourier_csv(path, frqs, fas, ["FAS"], header="Header\n\n")
+        frqs_read, (fas_read,) = read_csv_multi(path, header=4)
+        np.testing.assert_allclose(frqs_read, frqs, rtol=1e-5)
+        np.testing.assert_allclose(fas_read, fas, rtol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
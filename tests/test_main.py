@@ -5,10 +5,18 @@ import unittest
 import os
 import shutil
 import re
+import io
+from contextlib import redirect_stdout
+
+# Third party imports
+import numpy as np
 
 # Local Application Imports
 from context import autoRS
-from autoRS.rw import read_csv_multi
+from autoRS.rw import read_csv_multi, read_shk_ahl
+from autoRS.spectrum import _step_rs, get_fft_settings
+from autoRS.core import MotionSpectra
+from autoRS.spill import processing_bytes
 
 
 class TestMain(unittest.TestCase):
@@ -16,7 +24,7 @@ class TestMain(unittest.TestCase):
         with open("test_settings1.txt", "w") as file:
             file.write("folder=   C:\\Users\n" "sdf=a\n" "zeta=0.07\n" "ext=  n\n")
         with open("test_settings2.txt", "w") as file:
-            file.write("  folder   =  hello\n" "method= shake")
+            file.write("  folder   =  hello\n" "method= shake\n" "upsample = n")
         if not os.path.isdir(os.path.join("test_resources", "RS")):
             os.mkdir(os.path.join("test_resources", "RS"))
 
@@ -42,6 +50,7 @@ class TestMain(unittest.TestCase):
         autoRS.get_settings("test_settings2.txt")
         self.assertEqual(autoRS.settings["folder"], "hello")
         self.assertEqual(autoRS.settings["method"], "shake")
+        self.assertEqual(autoRS.settings["upsample"], False)
 
     def test_get_settings3(self):
         autoRS.write_default_settings("test_settings3.txt")
@@ -66,6 +75,9 @@ class TestMain(unittest.TestCase):
         rs_path = os.path.join("test_resources", "RS", "test.csv",)
         autoRS.generate_rs_from_ahl(th_path, rs_path)
         self.assertTrue(os.path.isfile(rs_path))
+        spectra = MotionSpectra.from_csv(rs_path)
+        self.assertEqual(spectra.column_names, ("S_a",))
+        self.assertEqual(spectra.zeta[0], autoRS.settings["zeta"])
 
     def test_rs_from_csv(self):
         th_path = os.path.join("test_resources", "multi_col.csv",)
@@ -92,6 +104,172 @@ class TestMain(unittest.TestCase):
         # be generated.
         self.assertFalse(os.path.isfile(rs_path))
 
+    def test_combination(self):
+        default_settings = autoRS.settings
+        th_path = os.path.join("test_resources", "RS", "xyz.csv")
+        with open(os.path.join("test_resources", "multi_col.csv"), "r") as file:
+            lines = file.readlines()
+        lines[1] = "time,x_acc @ 1,y_acc @ 1,z_acc @ 1,x_acc @ 2,\n"
+        with open(th_path, "w") as file:
+            file.writelines(lines)
+        try:
+            autoRS.settings = autoRS.process_settings(
+                {
+                    "combination": " SRSS, 100-40-40,other",
+                    "grouping": r"^[xyz]_(.+)$",
+                    "summary": "y",
+                }
+            )
+            self.assertEqual(autoRS.settings["combination"], ("srss", "100-40-40"))
+            self.assertEqual(autoRS.settings["grouping"], autoRS.GROUP_PATTERN)
+
+            rs_path = os.path.join("test_resources", "RS", "test10.csv")
+            records = autoRS.generate_rs_from_csv(th_path, rs_path)
+            spectra = MotionSpectra.from_csv(rs_path)
+            self.assertEqual(
+                spectra.column_names[-2:],
+                ("acc_@_1_SRSS_S_a", "acc_@_1_100-40-40_S_a"),
+            )
+            components = spectra.acceleration[:, :3]
+            np.testing.assert_allclose(
+                spectra.acceleration[:, -2],
+                np.sqrt(np.sum(components ** 2, axis=1)),
+                rtol=1e-5,
+            )
+
+            # Only the RS of the records are returned for the summary statistics
+            self.assertEqual(records.column_names, spectra.column_names[:-2])
+            statistics = autoRS.update_statistics(None, records)
+            self.assertEqual(statistics.count, 4)
+        finally:
+            autoRS.settings = default_settings
+
+    def test_out_of_core(self):
+        default_settings = autoRS.settings
+        th_path = os.path.join("test_resources", "multi_col.csv")
+        try:
+            autoRS.settings = autoRS.process_settings({"memory": "0.1"})
+            self.assertEqual(autoRS.settings["memory"], 0.1)
+
+            # The fft blocks use the memory left after reading the columns
+            self.assertEqual(
+                autoRS.get_rs_kwargs("fft"), {"fft_block_bytes": processing_bytes(0.1)}
+            )
+            autoRS.settings = autoRS.process_settings(
+                {"memory": "0.1", "processes": "2"}
+            )
+            self.assertEqual(
+                autoRS.get_rs_kwargs("fft"),
+                {"fft_block_bytes": processing_bytes(0.1, n_processes=2)},
+            )
+            self.assertEqual(autoRS.get_rs_kwargs("multirate"), {})
+
+            autoRS.settings = autoRS.process_settings({"memory": "0.1"})
+            rs_path = os.path.join("test_resources", "RS", "test11.csv")
+            spectra = autoRS.generate_rs_from_csv(th_path, rs_path)
+            autoRS.settings = default_settings
+            expected = autoRS.generate_rs_from_csv(th_path, rs_path)
+            self.assertEqual(spectra.column_names, expected.column_names)
+            np.testing.assert_array_equal(spectra.acceleration, expected.acceleration)
+        finally:
+            autoRS.settings = default_settings
+
+    def test_parallel(self):
+        default_settings = autoRS.settings
+        try:
+            rs_path = os.path.join("test_resources", "RS", "test12.csv")
+            expected = autoRS.generate_rs_from_csv(
+                os.path.join("test_resources", "multi_col.csv"), rs_path
+            )
+            autoRS.settings = autoRS.process_settings({"processes": "2"})
+            self.assertEqual(autoRS.settings["processes"], 2)
+            spectra = autoRS.generate_rs_from_csv(
+                os.path.join("test_resources", "multi_col.csv"), rs_path
+            )
+            self.assertEqual(spectra.column_names, expected.column_names)
+            np.testing.assert_allclose(spectra.acceleration, expected.acceleration)
+
+            # Out of core, in batches of columns
+            autoRS.settings = autoRS.process_settings(
+                {"processes": "2", "memory": "0.3"}
+            )
+            spectra = autoRS.generate_rs_from_csv(
+                os.path.join("test_resources", "multi_col.csv"), rs_path
+            )
+            np.testing.assert_allclose(spectra.acceleration, expected.acceleration)
+        finally:
+            autoRS.settings = default_settings
+
+    def test_print_fft_settings(self):
+        # The FFT threads are shared by the worker processes
+        default_settings = autoRS.settings
+        try:
+            for processes in (1, 2):
+                autoRS.settings = autoRS.process_settings({"processes": processes})
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    autoRS.print_fft_settings()
+                backend, size_policy, workers, padding = get_fft_settings()
+                self.assertEqual(
+                    output.getvalue(),
+                    "FFT backend = {}, size policy = {}, workers = {}, "
+                    "padding = {}\n".format(
+                        backend, size_policy, max(workers // processes, 1), padding
+                    ),
+                )
+        finally:
+            autoRS.settings = default_settings
+
+    def test_rs_method(self):
+        th_path = os.path.join("test_resources", "shake_acc_eg.ahl",)
+        rs_path = os.path.join("test_resources", "RS", "test6.csv",)
+        default_settings = autoRS.settings
+        cost_model_path = autoRS.cost.COST_MODEL_PATH
+        autoRS.cost.COST_MODEL_PATH = "test_main_cost_model.json"
+        try:
+            for method in autoRS.AVAILABLE_METHODS:
+                autoRS.settings = autoRS.process_settings({"method": method})
+                self.assertEqual(autoRS.settings["method"], method)
+
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    autoRS.generate_rs_from_ahl(th_path, rs_path)
+
+                # The method used is logged and written to the RS file header
+                match = re.search(r"Method = (\w+)", output.getvalue())
+                used = match.group(1)
+                if method == autoRS.AUTO_METHOD:
+                    self.assertIn(used, autoRS.EXACT_METHODS)
+                    self.assertIn("estimated time = ", output.getvalue())
+                else:
+                    self.assertEqual(used, method)
+                with open(rs_path, "r") as file:
+                    self.assertIn(f"method = ,{used}", file.read())
+
+            # The shake method uses the records as is (like SHAKE2000) on request
+            for upsample in (True, False):
+                autoRS.settings = autoRS.process_settings(
+                    {"method": "shake", "upsample": "y" if upsample else "n"}
+                )
+                spectra = autoRS.generate_rs_from_ahl(th_path, rs_path)
+                acc, dt = read_shk_ahl(th_path)
+                expected, _ = _step_rs(
+                    acc, np.arange(len(acc)) * dt, spectra.frequency, upsample=upsample
+                )
+                np.testing.assert_allclose(spectra.acceleration[:, 0], expected)
+                with open(rs_path, "r") as file:
+                    self.assertIn(f"upsample = ,{upsample}", file.read())
+
+            # The auto method only chooses the approximate methods on request
+            autoRS.settings = autoRS.process_settings(
+                {"method": autoRS.AUTO_METHOD, "approximate": "y"}
+            )
+            self.assertTrue(autoRS.settings["approximate"])
+            self.assertIn(autoRS.get_rs_method(2 ** 16, 0.005)[0], autoRS.RS_METHODS)
+        finally:
+            autoRS.settings = default_settings
+            autoRS.cost.COST_MODEL_PATH = cost_model_path
+
     def test_make_RS_folder(self):
         rs_dir = autoRS.make_RS_folder("test_resources")
         self.assertTrue(os.path.isdir(os.path.join("test_resources", "RS")))
@@ -112,6 +290,102 @@ class TestMain(unittest.TestCase):
         autoRS.generate_rs()
         self.assertTrue(len(os.listdir(os.path.join("RS"))) == 1)
 
+    def test_summary(self):
+        default_settings = autoRS.settings
+        try:
+            autoRS.settings = autoRS.process_settings(
+                {"folder": "test_resources", "summary": "y", "broadening": "y"}
+            )
+            self.assertTrue(autoRS.settings["summary"])
+            self.assertEqual(autoRS.settings["broadening"], 0.15)
+            self.assertFalse(
+                autoRS.process_settings({"broadening": "1.5"})["broadening"]
+            )
+            statistics = None
+            for fname in ("shake_acc_eg.ahl", "multi_col.csv"):
+                th_path = os.path.join("test_resources", fname)
+                rs_path = os.path.join("test_resources", "RS", "test7.csv")
+                if fname.endswith("ahl"):
+                    spectra = autoRS.generate_rs_from_ahl(th_path, rs_path)
+                else:
+                    spectra = autoRS.generate_rs_from_csv(th_path, rs_path)
+                statistics = autoRS.update_statistics(statistics, spectra)
+            self.assertEqual(statistics.count, 5)
+
+            rs_folder = os.path.join("test_resources", "RS")
+            autoRS.write_summary(statistics, rs_folder)
+            summary = MotionSpectra.from_csv(
+                os.path.join(rs_folder, autoRS.SUMMARY_FNAME)
+            )
+            self.assertIn("S_a_p84", summary.column_names)
+            self.assertTrue(
+                all(summary.table["S_a_max"] >= summary.table["S_a_min"])
+            )
+
+            autoRS.write_design(statistics, rs_folder)
+            design = MotionSpectra.from_csv(
+                os.path.join(rs_folder, autoRS.DESIGN_FNAME)
+            )
+            np.testing.assert_allclose(
+                design.table["S_a_envelope"], summary.table["S_a_max"], atol=1e-5
+            )
+            self.assertTrue(
+                all(design.table["S_a_broadened"] >= design.table["S_a_envelope"])
+            )
+
+            # Spectra with non-positive accelerations are excluded
+            sa = spectra.acceleration.copy()
+            sa[0, 1] = 0
+            invalid = MotionSpectra(spectra.frequency, sa)
+            with redirect_stdout(io.StringIO()):
+                statistics = autoRS.update_statistics(None, invalid)
+            self.assertEqual(statistics.count, sa.shape[1] - 1)
+        finally:
+            autoRS.settings = default_settings
+
+    def test_fourier(self):
+        default_settings = autoRS.settings
+        rs_folder = os.path.join("test_resources", "RS")
+        try:
+            for method, fourier, smoothing in (
+                ("fft", "y", "y"),
+                ("shake", "welch", "20"),
+            ):
+                autoRS.settings = autoRS.process_settings(
+                    {"method": method, "fourier": fourier, "smoothing": smoothing}
+                )
+                self.assertIn(autoRS.settings["fourier"], ("periodogram", "welch"))
+                self.assertIn(autoRS.settings["smoothing"], (40, 20))
+                self.assertFalse(
+                    autoRS.process_settings({"smoothing": "-1"})["smoothing"]
+                )
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    autoRS.process_settings({"smoothing": smoothing})
+                self.assertIn("Smoothing only applies", output.getvalue())
+
+                rs_path = os.path.join(rs_folder, "test8_RS.csv")
+                th_path = os.path.join("test_resources", "shake_acc_eg.ahl")
+                autoRS.generate_rs_from_ahl(th_path, rs_path)
+                fas_path = os.path.join(rs_folder, "test8_FAS.csv")
+                self.assertEqual(autoRS.get_fourier_path(rs_path, "FAS"), fas_path)
+                with open(fas_path, "r") as file:
+                    self.assertIn("Frequency (Hz),FAS", file.read())
+
+                rs_path = os.path.join(rs_folder, "test9_RS.csv")
+                th_path = os.path.join("test_resources", "multi_col.csv")
+                autoRS.generate_rs_from_csv(th_path, rs_path)
+                psd_path = os.path.join(rs_folder, "test9_PSD.csv")
+                frqs, psd = read_csv_multi(psd_path, header=7)
+                self.assertEqual(len(psd), 4)
+                self.assertTrue(all(len(column) == len(frqs) for column in psd))
+                ko_path = os.path.join(rs_folder, "test9_FAS_KO.csv")
+                frqs, fas = read_csv_multi(ko_path, header=7)
+                self.assertEqual(len(fas), 4)
+                self.assertTrue(np.all(np.diff(frqs) > 0))
+        finally:
+            autoRS.settings = default_settings
+
     def tearDown(self):
         tear_down_functions = [
             lambda: os.remove("test_settings1.txt"),
@@ -120,6 +394,7 @@ class TestMain(unittest.TestCase):
             lambda: os.remove("single_col_w_comma.csv"),
             lambda: shutil.rmtree(os.path.join("test_resources", "RS")),
             lambda: shutil.rmtree(os.path.join("RS")),
+            lambda: os.remove("test_main_cost_model.json"),
         ]
         for function in tear_down_functions:
             try:
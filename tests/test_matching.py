@@ -0,0 +1,95 @@
+"""Unit tests for autoRS.matching."""
+
+# Standard library imports
+import unittest
+import os
+import io
+from contextlib import redirect_stdout
+
+# Third party imports
+import numpy as np
+import scipy.fft
+
+# Local Application Imports
+from context import autoRS
+from autoRS.matching import (
+    SpectralMatcher,
+    spectral_match,
+    _refined_peaks,
+)
+from autoRS.spectrum import get_default_frequencies, _fft_rs
+from autoRS.rw import read_shk_ahl
+
+
+class TestSpectralMatching(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)
+        cls.time = np.arange(len(acc)) * dt
+        cls.frqs = get_default_frequencies()
+        cls.rs, _ = _fft_rs(cls.acc, cls.time, cls.frqs)
+
+        # Target: spectrum of the record with smoothly modified Fourier amplitudes,
+        # so that an exact match exists
+        f = scipy.fft.rfftfreq(len(acc), dt)
+        shape = 1.2 * np.exp(0.4 * np.sin(1.3 * np.log(np.maximum(f, 0.05) / 0.1)))
+        modified = scipy.fft.irfft(scipy.fft.rfft(cls.acc) * shape, len(acc))
+        cls.target, _ = _fft_rs(modified, cls.time, cls.frqs)
+
+    def test_response_spectrum(self):
+        matcher = SpectralMatcher(self.acc, self.time, self.frqs)
+        np.testing.assert_allclose(matcher.response_spectrum(), self.rs, rtol=0.01)
+
+        # Only out of date oscillators are re-evaluated
+        affected = matcher.adjust(np.ones(len(self.frqs)))
+        self.assertEqual(len(affected), 0)
+        np.testing.assert_allclose(matcher.acceleration, self.acc, atol=1e-12)
+
+        ratio = np.where((self.frqs > 5) & (self.frqs < 8), 1.5, 1)
+        affected = matcher.adjust(ratio, threshold=0.05)
+        self.assertIn(np.argmin(np.abs(self.frqs - 6)), affected)
+        self.assertNotIn(np.argmin(np.abs(self.frqs - 0.5)), affected)
+
+    def test_refined_peaks(self):
+        # Sinusoids sampled at 8 samples per period (between the peaks), and a
+        # slightly higher peak next to a sampled maximum
+        t = np.arange(64)
+        a = np.abs(np.cos(np.pi * t / 4 + np.array([[np.pi / 8], [np.pi / 16]])))
+        self.assertTrue(np.all(a.max(axis=1) < 0.99))
+        np.testing.assert_allclose(_refined_peaks(a, 4), 1, rtol=0.01)
+        b = np.zeros((1, 64))
+        b[0, 10:13] = (0.5, 1, 0.5)
+        b[0, 40:43] = (1.0, 1, 0)
+        self.assertGreater(_refined_peaks(b, 4)[0], 1)
+
+    def test_match(self):
+        for tolerance in (0.05, 0.02):
+            output = io.StringIO()
+            with redirect_stdout(output):
+                acc, rs, frqs = spectral_match(
+                    self.acc, self.time, self.target, tolerance=tolerance
+                )
+            self.assertIn("Spectral matching done", output.getvalue())
+            np.testing.assert_array_equal(frqs, self.frqs)
+            self.assertEqual(acc.shape, self.acc.shape)
+            self.assertLessEqual(np.max(np.abs(rs / self.target - 1)), tolerance)
+
+            # The matched record's spectrum agrees with the 'fft' RS method
+            rs_check, _ = _fft_rs(acc, self.time, self.frqs)
+            np.testing.assert_allclose(rs, rs_check, rtol=0.01)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            SpectralMatcher(np.column_stack((self.acc, self.acc)), self.time)
+        matcher = SpectralMatcher(self.acc, self.time, self.frqs)
+        with self.assertRaises(ValueError):
+            matcher.match(self.target[:-1])
+        with self.assertRaises(ValueError):
+            matcher.match(np.zeros(len(self.frqs)))
+
+
+if __name__ == "__main__":
+    unittest.main()
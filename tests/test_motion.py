@@ -10,9 +10,10 @@ from numpy.lib.recfunctions import structured_to_unstructured
 
 # Local Application Imports
 from context import autoRS
-from autoRS.core import MotionHistory, MotionSpectra
+from autoRS.core import MotionHistory, MotionHistoryBatch, MotionSpectra
 from autoRS.core.table import EmptyInputError, SizeMismatchError
 from autoRS.core.utils import cumulative_integral
+from autoRS.spectrum import response_spectrum
 
 # %% Tests
 motion_cols = ("acceleration", "velocity", "displacement")
@@ -134,7 +135,234 @@ class TestMotionHistory(unittest.TestCase):
         self.assertTrue(all(pct_diff_vel < 0.5))
 
 
+    def test_append(self):
+        """A MotionHistory can be filled incrementally with blocks of accelerations.
+        The derived motions match the motions of the complete record."""
+        mh = MotionHistory()
+        for start in range(0, len(self.acc), 1000):
+            mh.append(self.acc[start : start + 1000], self.t[start : start + 1000])
+            mh.velocity
+        self.assertTrue(np.allclose(mh.time, self.t))
+        self.assertTrue((mh.acceleration == self.acc).all())
+        self.assertTrue(np.allclose(mh.velocity, self.vel))
+        self.assertTrue(np.allclose(mh.displacement, self.disp))
+
+        mh = MotionHistory(dt=self.dt, acceleration=self.acc[:10])
+        mh.append(self.acc[10:20])
+        self.assertTrue(np.allclose(mh.time, self.t[:20]))
+
+        with self.assertRaises(ValueError):
+            MotionHistory(displacement=self.disp).append(self.acc)
+
+    def test_window(self):
+        """Time windows of a MotionHistory are read-only views that keep the original
+        time values."""
+        mh = MotionHistory(dt=self.dt, acceleration=self.acc)
+        window = mh.window(1, 2)
+        self.assertTrue(np.allclose(window.time[[0, -1]], [1, 2]))
+        self.assertTrue(np.shares_memory(window._table.data, mh._table.data))
+        start = np.searchsorted(self.t, 1 - 1e-9)
+        self.assertTrue((window.acceleration == self.acc[start : start + 201]).all())
+        self.assertTrue(np.allclose(window.velocity, self.vel[start : start + 201]))
+        self.assertEqual(len(mh.window(end=0.5).time), 101)
+
+        # Replacing the motions of the parent does not change existing windows
+        velocity = window.velocity
+        mh.acceleration = np.cos(self.t)
+        self.assertTrue((window.acceleration == self.acc[start : start + 201]).all())
+        self.assertTrue((window.velocity == velocity).all())
+        self.assertTrue(np.allclose(mh.acceleration, np.cos(self.t)))
+
+        with self.assertRaises(EmptyInputError):
+            MotionHistory().window(0, 1)
+
+
+class TestMotionHistoryBatch(unittest.TestCase):
+
+    th_path = os.path.join("../tests", "test_resources", "multi_col.csv")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        th_raw = np.genfromtxt(
+            self.th_path,
+            delimiter=",",
+            skip_header=1,
+            names=True,
+            deletechars=" !#$%&'()*+,-./:;<=>?[\\]^{|}~",
+        )
+        th_raw = structured_to_unstructured(th_raw)
+        self.acc = th_raw[:, 1:-1]
+        self.dt = 0.005
+        self.t = np.arange(0, len(self.acc) * self.dt, self.dt)
+
+    def test_init(self):
+        """A batch is defined by 2D motion arrays with one record per column. The
+        records share a single time index."""
+        batch = MotionHistoryBatch(dt=self.dt, acceleration=self.acc)
+        self.assertEqual(batch.shape, self.acc.shape)
+        self.assertEqual(len(batch), self.acc.shape[1])
+        self.assertEqual(batch.record_names[0], "Rec0")
+        self.assertTrue(np.allclose(batch.time, self.t))
+        self.assertTrue((batch.acceleration == self.acc).all())
+
+        batch = MotionHistoryBatch(acceleration=self.acc[:, 0], record_names=["a"])
+        self.assertEqual(batch.shape, (len(self.acc), 1))
+
+        with self.assertRaises(ValueError):
+            MotionHistoryBatch(time=self.t)
+        with self.assertRaises(SizeMismatchError):
+            MotionHistoryBatch(time=[1, 2, 3], acceleration=self.acc)
+        with self.assertRaises(SizeMismatchError):
+            MotionHistoryBatch(acceleration=self.acc, record_names=["a"])
+        with self.assertRaises(EmptyInputError):
+            MotionHistoryBatch(acceleration=[])
+
+    def test_derived_motions(self):
+        """Velocities and displacements of all records are calculated together and
+        match the results for each record calculated separately."""
+        batch = MotionHistoryBatch(time=self.t, acceleration=self.acc)
+        for i in range(self.acc.shape[1]):
+            mh = MotionHistory(time=self.t, acceleration=self.acc[:, i])
+            self.assertTrue(np.allclose(batch.velocity[:, i], mh.velocity))
+            self.assertTrue(np.allclose(batch.displacement[:, i], mh.displacement))
+
+        vel = batch.velocity[:, 0]
+        batch = MotionHistoryBatch(time=self.t, displacement=batch.displacement)
+        pct_diff_vel = np.abs(batch.velocity[:, 0] - vel) / np.ptp(vel) * 100
+        self.assertTrue((pct_diff_vel < 0.5).all())
+
+        with self.assertRaises(ValueError):
+            batch.acceleration[0, 0] = 1
+
+    def test_record_views(self):
+        """Records are MotionHistory objects that share memory with the batch."""
+        batch = MotionHistoryBatch(
+            dt=self.dt, acceleration=self.acc, record_names=["a", "b", "c", "d"]
+        )
+        record = batch["b"]
+        self.assertIsInstance(record, MotionHistory)
+        self.assertTrue(np.shares_memory(record._table.data, batch.acceleration))
+        self.assertTrue((record.acceleration == self.acc[:, 1]).all())
+        self.assertTrue((record.displacement == batch.displacement[:, 1]).all())
+        self.assertTrue((record.time == batch.time).all())
+        self.assertTrue((batch[-1].acceleration == self.acc[:, -1]).all())
+        self.assertEqual(len(list(batch)), 4)
+
+        # Setting a motion of a record detaches it from the batch
+        velocity = batch.velocity[:, 1].copy()
+        with self.assertRaises(ValueError):
+            record._table.data[0, 0] = 1
+        record.acceleration = np.ones(len(self.acc))
+        self.assertFalse(np.shares_memory(record._table.data, batch.acceleration))
+        self.assertTrue((record.acceleration == 1).all())
+        self.assertTrue((batch.acceleration[:, 1] == self.acc[:, 1]).all())
+        self.assertTrue((batch.velocity[:, 1] == velocity).all())
+
+        with self.assertRaises(KeyError):
+            batch["e"]
+        with self.assertRaises(IndexError):
+            batch[4]
+
+    def test_window(self):
+        """Time windows of a batch are read-only views of all the records."""
+        batch = MotionHistoryBatch(dt=self.dt, acceleration=self.acc)
+        window = batch.window(1, 2)
+        self.assertEqual(window.shape, (201, len(batch)))
+        self.assertTrue(np.shares_memory(window.displacement, batch.displacement))
+        self.assertTrue(np.allclose(window[1].time, window.time))
+        self.assertTrue(np.allclose(window[1].velocity, batch.velocity[200:401, 1]))
+
+    def test_response_spectrum(self):
+        """The batch accelerations generate all the response spectra in one call."""
+        batch = MotionHistoryBatch(time=self.t, acceleration=self.acc)
+        for method in autoRS.RS_METHODS:
+            rs, frqs = response_spectrum(batch.acceleration, batch.time, method=method)
+            self.assertEqual(rs.shape, (len(frqs), len(batch)))
+            rs0, _ = response_spectrum(self.acc[:, 0], self.t, method=method)
+            self.assertTrue(np.allclose(rs[:, 0], rs0))
+
+
 class TestMotionSpectrum(unittest.TestCase):
+    def setUp(self):
+        self.frq = np.geomspace(0.1, 100, 50)
+        self.sa = np.column_stack(
+            [1 + np.exp(-((np.log(self.frq) - np.log(f0)) ** 2)) for f0 in (2, 5, 10)]
+        )
+        self.rs_path = "test_spectra_RS.csv"
+
     def test_init(self):
-        """Table can be defined with data as a list of lists or a single list."""
-        pass
+        """Spectra can be defined with a single spectrum or with one spectrum per
+        column. Each spectrum has a damping ratio."""
+        ms = MotionSpectra(self.frq, self.sa[:, 0])
+        self.assertEqual(ms.acceleration.shape, (50, 1))
+        self.assertEqual(ms.table.index_name, "frequency")
+        self.assertTrue((ms.frequency == self.frq).all())
+        self.assertTrue((ms.zeta == [0.05]).all())
+
+        ms = MotionSpectra(
+            self.frq, self.sa, zeta=[0.02, 0.05, 0.1], column_names=["a", "b", "c"]
+        )
+        self.assertEqual(len(ms), 3)
+        self.assertEqual(ms.column_names, ("a", "b", "c"))
+        self.assertTrue((ms.table["b"] == self.sa[:, 1]).all())
+
+        with self.assertRaises(SizeMismatchError):
+            MotionSpectra(self.frq, self.sa, zeta=[0.02, 0.05])
+        with self.assertRaises(SizeMismatchError):
+            MotionSpectra(self.frq[:-1], self.sa)
+
+    def test_derived_motions(self):
+        """PSV and SD are derived from SA with the angular frequencies."""
+        ms = MotionSpectra(self.frq, self.sa)
+        w = 2 * np.pi * self.frq
+        self.assertTrue(np.allclose(ms.velocity, self.sa / w[:, None]))
+        self.assertTrue(np.allclose(ms.displacement, self.sa / w[:, None] ** 2))
+        self.assertIs(ms.velocity, ms.velocity)
+        with self.assertRaises(ValueError):
+            ms.acceleration[0, 0] = 1
+
+    def test_interpolate(self):
+        """Spectra are interpolated linearly in log-log space. Values outside the
+        frequency range are held constant."""
+        ms = MotionSpectra([1, 10], [[1, 2], [10, 20]])
+        ms_new = ms.interpolate([0.5, 1, np.sqrt(10), 10, 20])
+        expected = np.array([[1, 2], [1, 2], [10 ** 0.5, 2 * 10 ** 0.5], [10, 20]])
+        self.assertTrue(np.allclose(ms_new.acceleration[:-1], expected))
+        self.assertTrue(np.allclose(ms_new.acceleration[-1], [10, 20]))
+
+        ms = MotionSpectra(self.frq, self.sa)
+        self.assertTrue(np.allclose(ms.interpolate(self.frq).acceleration, self.sa))
+
+    def test_vectorized_operations(self):
+        """Envelopes, ratios, and scaling operate on all the spectra at once."""
+        ms = MotionSpectra(self.frq, self.sa)
+        env = ms.envelope()
+        self.assertEqual(len(env), 1)
+        self.assertTrue((env.acceleration[:, 0] == self.sa.max(axis=1)).all())
+
+        scaled = ms.scale([1, 2, 3])
+        self.assertTrue(np.allclose(scaled.acceleration, self.sa * [1, 2, 3]))
+        self.assertTrue(np.allclose(scaled.ratio(ms).acceleration, [1, 2, 3]))
+        self.assertTrue(np.allclose(ms.ratio(env).acceleration.max(axis=1), 1))
+        with self.assertRaises(SizeMismatchError):
+            ms.ratio(MotionSpectra(self.frq, self.sa[:, :2]))
+
+        combined = MotionSpectra.concatenate([ms, env.interpolate(self.frq[::2])])
+        self.assertEqual(len(combined), 4)
+        self.assertTrue((combined.frequency == self.frq).all())
+
+    def test_csv_round_trip(self):
+        """Spectra can be written to and read from the 'RS/*_RS.csv' format."""
+        ms = MotionSpectra(self.frq, self.sa, zeta=0.02, column_names=["a", "b", "c"])
+        ms.to_csv(self.rs_path)
+        ms_read = MotionSpectra.from_csv(self.rs_path)
+        self.assertEqual(ms_read.column_names, ms.column_names)
+        self.assertTrue((ms_read.zeta == 0.02).all())
+        self.assertTrue(np.allclose(ms_read.acceleration, self.sa, atol=1e-5))
+        self.assertTrue(np.allclose(ms_read.frequency, self.frq, atol=1e-5))
+
+    def tearDown(self):
+        try:
+            os.remove(self.rs_path)
+        except FileNotFoundError:
+            pass
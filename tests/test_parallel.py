@@ -0,0 +1,127 @@
+"""Unit tests for autoRS.parallel."""
+
+# Standard library imports
+import unittest
+import os
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+import autoRS.parallel
+from autoRS.parallel import SharedArrays, map_shared, parallel_response_spectrum
+from autoRS.spectrum import (
+    RS_METHODS,
+    RS_METHODS_DICT,
+    get_default_frequencies,
+    get_fft_settings,
+)
+from autoRS.rw import read_shk_ahl
+
+
+def _segment_names(arrays, task):
+    """Names of the shared memory segments attached by the worker, and whether the
+    shared array is a read-only view of shared memory."""
+    if task == "crash":
+        os._exit(1)
+    names = [segment.name for segment in autoRS.parallel._worker_segments]
+    is_view = arrays["x"].base is not None and not arrays["x"].flags.writeable
+    return names, is_view, float(arrays["x"][task].sum())
+
+
+class TestSharedMemory(unittest.TestCase):
+    def assertUnlinked(self, name):
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
+
+    def test_shared_arrays(self):
+        x = np.asfortranarray(np.arange(12.0).reshape(3, 4))
+        with SharedArrays({"x": x}) as shared:
+            name, shape, dtype, order = shared.specs["x"]
+            self.assertEqual((shape, order), ((3, 4), "F"))
+        self.assertUnlinked(name)
+
+        # Arrays allocated in shared memory are filled in place by the parent
+        with SharedArrays() as shared:
+            view = shared.empty("x", (3, 4), order="F")
+            view[...] = x
+            with self.assertRaises(ValueError):
+                shared.empty("x", (1,))
+            results = list(map_shared(_segment_names, shared, range(3), n_processes=1))
+            self.assertEqual([r[2] for r in results], list(x.sum(axis=1)))
+            name = shared.specs["x"][0]
+            del view
+        self.assertUnlinked(name)
+
+    def test_map_shared(self):
+        x = np.arange(12.0).reshape(4, 3)
+        results = list(map_shared(_segment_names, {"x": x}, range(4), n_processes=2))
+        names, is_view, _ = results[0]
+        self.assertTrue(is_view)
+        self.assertEqual([r[2] for r in results], list(x.sum(axis=1)))
+        self.assertUnlinked(names[0])
+
+    def test_worker_crash(self):
+        # The shared memory is released if a worker process dies
+        results = map_shared(
+            _segment_names, {"x": np.ones((2, 2))}, [0, "crash", 1], n_processes=1
+        )
+        names, _, _ = next(results)
+        with self.assertRaises(BrokenProcessPool):
+            list(results)
+        self.assertUnlinked(names[0])
+
+
+class TestParallelRS(unittest.TestCase):
+    def test_same_as_serial(self):
+        acc, dt = read_shk_ahl(os.path.join("test_resources", "shake_acc_eg.ahl"))
+        time = np.arange(len(acc)) * dt
+        records = np.column_stack([acc, np.roll(acc, 100), np.multiply(acc, 2)])
+        frqs = get_default_frequencies()
+        for method in RS_METHODS:
+            expected, _ = RS_METHODS_DICT[method](records, time, frqs, 0.05)
+            rs, rs_frqs = parallel_response_spectrum(
+                records, time, method=method, n_processes=2
+            )
+            np.testing.assert_array_equal(rs_frqs, frqs)
+            np.testing.assert_allclose(rs, expected, rtol=1e-12)
+
+            # A single record is split into frequency blocks
+            rs, _ = parallel_response_spectrum(
+                acc, time, method=method, n_processes=3
+            )
+            np.testing.assert_allclose(rs, expected[:, 0], rtol=1e-12)
+
+            # Records read straight into shared memory, in its first columns
+            with SharedArrays() as shared:
+                shared.empty("acc", (len(acc), 4), order="F")[:, :3] = records
+                rs, _ = parallel_response_spectrum(
+                    shared.arrays["acc"][:, :3],
+                    time,
+                    method=method,
+                    n_processes=2,
+                    shared=shared,
+                )
+            np.testing.assert_allclose(rs, expected, rtol=1e-12)
+
+    def test_fft_workers(self):
+        # The FFT threads are divided between the worker processes
+        workers = get_fft_settings()[2]
+        for n_processes in (1, 2, workers, 4 * workers):
+            kwargs = autoRS.parallel._worker_kwargs("fft", n_processes, {})
+            self.assertEqual(kwargs["fft_workers"], max(workers // n_processes, 1))
+
+        # Unless they are given, and only for the 'fft' method
+        kwargs = {"fft_workers": 3}
+        self.assertEqual(autoRS.parallel._worker_kwargs("fft", 2, kwargs), kwargs)
+        self.assertEqual(
+            autoRS.parallel._worker_kwargs("shake", 2, {"upsample": False}),
+            {"upsample": False},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
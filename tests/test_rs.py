@@ -3,6 +3,9 @@
 # Standard library imports
 import unittest
 import os
+import io
+import tracemalloc
+from contextlib import redirect_stdout
 
 # Third party imports
 import numpy as np
@@ -14,8 +17,30 @@ from autoRS.spectrum import (
     get_asme_frequencies,
     get_default_frequencies,
     response_spectrum,
+    streaming_response_spectrum,
+    rolling_response_spectrum,
+    rotd_spectrum,
+    _step_rs,
+    _fft_rs,
+    _get_step_matrix,
+    _multirate_rs,
+    _filter_peaks,
+    _multirate_samples_per_period,
+    _pow2_size,
+    _fast_size,
+    _PYFFTW_PLANS,
+    PYFFTW_PLAN_CACHE_SIZE,
+    get_fft_settings,
+    _fft_padding_classes,
+    _get_step_filter,
+    FFT_BACKENDS,
+    FFT_BACKENDS_DICT,
+    RS_METHODS_DICT,
 )
-from autoRS.rw import read_csv_multi
+from autoRS.core import FloatTable
+from autoRS.rw import read_csv_multi, read_shk_ahl
+from itertools import accumulate
+from scipy.signal import decimate, lfilter
 from utility import low_pass_filter
 
 
@@ -120,3 +145,586 @@ class TestRS(unittest.TestCase):
             [f"{x*100:.1f}%" for x in mean_diffs],
         )
         self.assertTrue(all([diff < 0.01 for diff in mean_diffs]))
+
+    def test_step_multirate_comparison(self):
+        # Same acceptance criteria as the step vs fft comparison
+        for setnum in self.setnums:
+            ratios = np.absolute(
+                self.lp_rs_dict["multirate"][setnum - 1]
+                / self.lp_rs_dict["shake"][setnum - 1]
+                - 1
+            )
+            self.assertLess(np.quantile(ratios, 0.95), 0.05)
+            self.assertLess(np.mean(ratios), 0.01)
+
+
+class TestStreamingRS(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)
+        cls.dt = dt
+        cls.time = np.arange(len(acc)) * dt
+        cls.frqs = get_default_frequencies(high_frequency=True)
+        cls.rs_step, _ = _step_rs(cls.acc, cls.time, cls.frqs, 0.05, upsample=False)
+
+    def test_chunk_sizes(self):
+        # Uneven chunks, including single samples and empty chunks
+        for chunk_size in (1000, 777, len(self.acc)):
+            chunks = (
+                self.acc[i : i + chunk_size]
+                for i in range(0, len(self.acc), chunk_size)
+            )
+            rs, frqs = streaming_response_spectrum(chunks, self.dt, self.frqs)
+            np.testing.assert_allclose(rs, self.rs_step, rtol=1e-9)
+            np.testing.assert_array_equal(frqs, self.frqs)
+
+        chunks = [self.acc[:1], [], self.acc[1:2], self.acc[2:]]
+        rs, _ = streaming_response_spectrum(chunks, self.dt, self.frqs)
+        np.testing.assert_allclose(rs, self.rs_step, rtol=1e-9)
+
+        with self.assertRaises(ValueError):
+            streaming_response_spectrum(iter([]), self.dt, self.frqs)
+
+    def test_multiple_records(self):
+        acc = np.column_stack((self.acc, -2 * self.acc))
+        chunks = (acc[i : i + 500] for i in range(0, len(acc), 500))
+        rs, _ = streaming_response_spectrum(chunks, self.dt, self.frqs)
+        self.assertEqual(rs.shape, (len(self.frqs), 2))
+        np.testing.assert_allclose(rs[:, 0], self.rs_step, rtol=1e-9)
+        np.testing.assert_allclose(rs[:, 1], 2 * self.rs_step, rtol=1e-9)
+
+    def test_file_backed(self):
+        path = os.path.join("../tests", "test_resources", "streaming_acc.aft")
+        table = FloatTable(self.acc, index=self.time, column_names=["acc"])
+        table.save(path)
+        try:
+            mapped = FloatTable.open(path)
+            chunks = (chunk["acc"] for chunk in mapped.iterchunks(1024))
+            rs, frqs = streaming_response_spectrum(chunks, self.dt)
+            del chunks, mapped
+        finally:
+            os.remove(path)
+        self.assertEqual(len(frqs), len(get_default_frequencies()))
+        np.testing.assert_allclose(rs, self.rs_step[: len(frqs)], rtol=1e-9)
+
+
+class TestRollingRS(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)
+        cls.dt = dt
+        cls.time = np.arange(len(acc)) * dt
+        cls.frqs = get_default_frequencies()
+
+    def test_windows(self):
+        rs, frqs, start = rolling_response_spectrum(
+            self.acc, self.time, window=20, step=1, frqs=self.frqs
+        )
+        n_windows = (len(self.acc) - 2000) // 100 + 1
+        self.assertEqual(rs.shape, (n_windows, len(self.frqs)))
+        np.testing.assert_allclose(start, np.arange(n_windows) * 1.0, atol=1e-9)
+
+        # The first window starts from rest
+        rs_first, _ = streaming_response_spectrum([self.acc[:2000]], self.dt, frqs)
+        np.testing.assert_allclose(rs[0], rs_first, rtol=1e-12)
+
+        # A window spanning the record is the RS of the whole record
+        rs_full, _, _ = rolling_response_spectrum(
+            self.acc, self.time, window=self.time[-1] + self.dt, step=1, frqs=frqs
+        )
+        rs_step, _ = streaming_response_spectrum([self.acc], self.dt, frqs)
+        np.testing.assert_allclose(rs_full[0], rs_step, rtol=1e-12)
+        self.assertTrue(np.all(rs <= rs_step * (1 + 1e-12)))
+
+        # Multiple records
+        acc = np.column_stack((self.acc, 0.5 * self.acc))
+        rs_2d, _, _ = rolling_response_spectrum(acc, self.time, 20, 1, frqs=frqs)
+        np.testing.assert_allclose(rs_2d[..., 0], rs, rtol=1e-12)
+        np.testing.assert_allclose(rs_2d[..., 1], 0.5 * rs, rtol=1e-12)
+
+        with self.assertRaises(ValueError):
+            rolling_response_spectrum(self.acc, self.time, window=100, step=1)
+
+    def test_work(self):
+        """Each oscillator filters the record once, whatever the window overlap, so
+        the work is that of a single RS of the record. The timing against restarting
+        the step method in every window is in `benchmarks/bench_engines.py`."""
+        filtered = []
+
+        def counted_lfilter(b, a, x, axis):
+            filtered.append(x.size)
+            return lfilter(b, a, x, axis=axis)
+
+        autoRS.spectrum.lfilter = counted_lfilter
+        try:
+            for window, step in ((20, 1), (20, 0.05), (5, 0.01)):
+                filtered.clear()
+                rolling_response_spectrum(
+                    self.acc, self.time, window, step, frqs=self.frqs
+                )
+                self.assertEqual(filtered, [len(self.acc) + 1] * len(self.frqs))
+        finally:
+            autoRS.spectrum.lfilter = lfilter
+
+
+class TestMultirateRS(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)
+        cls.time = np.arange(len(acc)) * dt
+        cls.frqs = get_default_frequencies(high_frequency=True)
+        cls.w = 2 * np.pi * cls.frqs
+
+        # Longer record (10 minutes at 200Hz) with broadband content up to 20Hz
+        rng = np.random.default_rng(0)
+        cls.long_time = np.arange(200 * 600) * 0.005
+        noise = rng.standard_normal(200 * 600)
+        cls.long_acc = np.convolve(noise, np.ones(5) / 5, "same")
+
+    def test_full_rate(self):
+        # Without decimation, the filter is the step-by-step method
+        rs_step, _ = _step_rs(self.acc, self.time, self.frqs[::10], upsample=False)
+        rs, _ = _multirate_rs(
+            self.acc, self.time, self.frqs[::10], samples_per_period=np.inf
+        )
+        np.testing.assert_allclose(rs, rs_step, rtol=1e-9)
+
+    def test_multiple_records(self):
+        acc = np.column_stack((self.acc, -3 * self.acc))
+        rs, _ = _multirate_rs(acc, self.time, self.frqs)
+        rs_1d, _ = _multirate_rs(self.acc, self.time, self.frqs)
+        np.testing.assert_allclose(rs[:, 0], rs_1d, rtol=1e-12)
+        np.testing.assert_allclose(rs[:, 1], 3 * rs_1d, rtol=1e-12)
+
+    def test_samples_per_period(self):
+        self.assertAlmostEqual(_multirate_samples_per_period(0.05), 20.0, places=1)
+        self.assertAlmostEqual(_multirate_samples_per_period(0.0), 17.68, places=2)
+        self.assertGreater(_multirate_samples_per_period(0.8), 150)
+
+    def test_accuracy_speed_tradeoff(self):
+        dt = self.long_time[1]
+        rs_full = _filter_peaks(self.long_acc, dt, self.w, 0.05)
+        mean_ratios = {}
+        for samples_per_period in (10, None, 40):
+            rs, _ = _multirate_rs(
+                self.long_acc, self.long_time, self.frqs, 0.05, samples_per_period
+            )
+            ratios = np.absolute(rs / rs_full - 1)
+            mean_ratios[samples_per_period] = np.mean(ratios)
+            if samples_per_period is None:
+                self.assertLess(np.mean(ratios), 0.01)
+                self.assertLess(np.quantile(ratios, 0.95), 0.05)
+
+        # More samples per period are more accurate
+        self.assertLessEqual(mean_ratios[40], mean_ratios[10])
+
+
+class TestStepRS(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)
+        cls.time = np.arange(len(acc)) * dt
+
+    def test_step_recurrence(self):
+        # Compare with stepping through the recurrence of Nigam & Jennings directly
+        frqs = np.array([0.1, 1.0, 10.0, 40.0])
+        rs, _ = _step_rs(self.acc, self.time, frqs, upsample=False)
+
+        dt = self.time[1]
+        act = np.column_stack((self.acc[:-1], self.acc[1:]))
+        act = np.append(np.array([[0, 0], [0, self.acc[0]]]), act, axis=0)
+        for k, wn in enumerate(2 * np.pi * frqs):
+            A, B = _get_step_matrix(wn, 0.05, dt)
+            x = np.array(list(accumulate(act, lambda x_i, a_i: A @ x_i + B @ a_i)))
+            z = x @ -np.array([wn ** 2, 2 * 0.05 * wn])
+            self.assertAlmostEqual(rs[k] / np.max(np.absolute(z)), 1, places=9)
+
+    def test_upsampling(self):
+        # 50Hz record with content up to 20Hz, with the extended frequency range
+        acc = decimate(low_pass_filter(self.acc, 20, time=self.time), 2, ftype="fir")
+        time = np.arange(len(acc)) * 0.02
+        frqs = get_default_frequencies(high_frequency=True)
+
+        rs_fft, _ = _fft_rs(acc, time, frqs)
+        rs_step, _ = _step_rs(acc, time, frqs)
+        rs_raw, _ = _step_rs(acc, time, frqs, upsample=False)
+
+        # Low frequency oscillators are not up-sampled
+        self.assertEqual(rs_step[0], rs_raw[0])
+
+        ratios = np.absolute(rs_step / rs_fft - 1)
+        raw_ratios = np.absolute(rs_raw / rs_fft - 1)
+        print(
+            f"\nMean difference with fft: {np.mean(ratios):.2%} up-sampled,",
+            f"{np.mean(raw_ratios):.2%} not up-sampled",
+        )
+        self.assertLess(np.quantile(ratios, 0.95), 0.05)
+        self.assertLess(np.mean(ratios), 0.01)
+        self.assertLess(np.mean(ratios), np.mean(raw_ratios))
+
+
+class TestFFTBackends(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)[:6000]
+        cls.time = np.arange(len(cls.acc)) * dt
+        cls.frqs = get_default_frequencies()
+
+    def test_sizes(self):
+        self.assertEqual(_pow2_size(9000), 16384)
+        self.assertEqual(_pow2_size(8192), 8192)
+        self.assertEqual(_fast_size(9000), 9000)
+        for n in (9001, 12289, 100003):
+            size = _fast_size(n)
+            self.assertGreaterEqual(size, n)
+            self.assertLess(size, _pow2_size(n))
+            for factor in (2, 3, 5):
+                while size % factor == 0:
+                    size //= factor
+            self.assertEqual(size, 1)
+
+    def test_settings(self):
+        backend, size_policy, workers, padding = get_fft_settings()
+        self.assertIn(backend, FFT_BACKENDS)
+        self.assertEqual(size_policy, "fast")
+        self.assertGreaterEqual(workers, 1)
+        self.assertEqual(padding, "damping")
+        self.assertEqual(
+            get_fft_settings("numpy", "pow2", 0, "fixed"), ("numpy", "pow2", 1, "fixed")
+        )
+        with self.assertRaises(ValueError):
+            get_fft_settings(backend="not_a_backend")
+        with self.assertRaises(ValueError):
+            get_fft_settings(size_policy="not_a_policy")
+        with self.assertRaises(ValueError):
+            get_fft_settings(padding="not_a_policy")
+
+    def test_backends(self):
+        rs_ref, _ = _fft_rs(
+            self.acc, self.time, self.frqs, fft_backend="numpy", fft_size_policy="fast"
+        )
+        for backend in FFT_BACKENDS:
+            for workers in (1, 3):
+                rs, _ = _fft_rs(
+                    self.acc,
+                    self.time,
+                    self.frqs,
+                    fft_backend=backend,
+                    fft_size_policy="fast",
+                    fft_workers=workers,
+                )
+                np.testing.assert_allclose(rs, rs_ref, rtol=1e-9)
+
+        # Batching the oscillators within a memory budget does not change the RS
+        for block_bytes in (1, 2 ** 30):
+            rs, _ = _fft_rs(
+                self.acc,
+                self.time,
+                self.frqs,
+                fft_backend="numpy",
+                fft_size_policy="fast",
+                fft_block_bytes=block_bytes,
+            )
+            np.testing.assert_allclose(rs, rs_ref, rtol=1e-9)
+
+        # A different amount of padding only changes the sinc interpolation
+        rs_pow2, _ = _fft_rs(self.acc, self.time, self.frqs, fft_size_policy="pow2")
+        np.testing.assert_allclose(rs_pow2, rs_ref, rtol=0.02)
+
+    def test_record_blocks(self):
+        records = np.column_stack([np.roll(self.acc, 500 * i) for i in range(8)])
+        rs_loop = np.column_stack(
+            [_fft_rs(record, self.time, self.frqs)[0] for record in records.T]
+        )
+
+        # Blocks of records (and oscillators) within the memory budget
+        for block_bytes in (1, 2 ** 23, 2 ** 30):
+            tracemalloc.start()
+            try:
+                rs, _ = _fft_rs(
+                    records, self.time, self.frqs, fft_block_bytes=block_bytes
+                )
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            np.testing.assert_allclose(rs, rs_loop, rtol=1e-12)
+            if block_bytes == 2 ** 23:
+                self.assertLess(peak, 1.5 * block_bytes)
+
+        # The batched records use fewer inverse transforms of the same total size
+        # than a loop over the records
+        counts = {}
+        rfft, irfft = FFT_BACKENDS_DICT["numpy"]
+
+        def counted_irfft(x, n, axis, workers):
+            counts[key] = np.add(counts.get(key, 0), (1, x[..., 0].size * n))
+            return irfft(x, n, axis=axis, workers=workers)
+
+        FFT_BACKENDS_DICT["numpy"] = (rfft, counted_irfft)
+        try:
+            key = "batched"
+            _fft_rs(records, self.time, self.frqs, fft_backend="numpy")
+            key = "loop"
+            for record in records.T:
+                _fft_rs(record, self.time, self.frqs, fft_backend="numpy")
+        finally:
+            FFT_BACKENDS_DICT["numpy"] = (rfft, irfft)
+        self.assertLess(counts["batched"][0], counts["loop"][0])
+        self.assertEqual(counts["batched"][1], counts["loop"][1])
+
+    @unittest.skipIf("pyfftw" not in FFT_BACKENDS, "pyfftw is not installed")
+    def test_pyfftw_plans(self):
+        _PYFFTW_PLANS.clear()
+        _fft_rs(self.acc, self.time, self.frqs, fft_backend="pyfftw", fft_workers=2)
+        n_plans = len(_PYFFTW_PLANS)
+        _fft_rs(self.acc, self.time, self.frqs, fft_backend="pyfftw", fft_workers=2)
+        self.assertEqual(len(_PYFFTW_PLANS), n_plans)
+        for block_bytes in 2 ** np.arange(10, 30):
+            _fft_rs(
+                self.acc,
+                self.time,
+                self.frqs,
+                fft_backend="pyfftw",
+                fft_block_bytes=block_bytes,
+            )
+        self.assertLessEqual(len(_PYFFTW_PLANS), PYFFTW_PLAN_CACHE_SIZE)
+
+    def test_instrumentation(self):
+        # The FFT settings are reported once per run (see `autoRS.print_fft_settings`),
+        # not on every call
+        for method, kwargs in (("fft", {"fft_backend": "numpy"}), ("shake", {})):
+            output = io.StringIO()
+            with redirect_stdout(output):
+                response_spectrum(self.acc, self.time, method=method, **kwargs)
+            self.assertIn("RS done. Time taken", output.getvalue())
+            self.assertNotIn("FFT backend", output.getvalue())
+
+
+class TestFFTPadding(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.acc = np.array(acc)
+        cls.dt = dt
+        cls.time = np.arange(len(cls.acc)) * dt
+        cls.frqs = get_default_frequencies()
+
+    def _reference_rs(self, zeta):
+        # Pad so that the free vibration decays to ~1e-9 before wrapping around
+        rs = []
+        for wn in 2 * np.pi * self.frqs:
+            n_fft = len(self.acc) + int(20 / (zeta * wn) / self.dt)
+            xgfft = np.fft.rfft(self.acc, n_fft)
+            wf = 2 * np.pi * np.fft.rfftfreq(n_fft, self.dt)
+            h = wn ** 2 + 2j * zeta * wn * wf
+            h /= h - wf ** 2
+            rs.append(np.max(np.absolute(np.fft.irfft(xgfft * h, 8 * n_fft))) * 8)
+        return np.array(rs)
+
+    def test_classes(self):
+        n = len(self.acc)
+        w = 2 * np.pi * self.frqs
+        fixed = _fft_padding_classes(n, self.dt, w, 0.05, "fixed")
+        self.assertEqual(len(fixed), 1)
+        self.assertEqual(fixed[0][0], int(np.ceil(1.5 * n)))
+
+        classes = _fft_padding_classes(n, self.dt, w, 0.05, "damping")
+        self.assertGreater(len(classes), 1)
+        np.testing.assert_array_equal(
+            np.sort(np.concatenate([group for _, group in classes])), np.arange(len(w))
+        )
+
+        # Padding decreases with frequency, and is enough for the free vibration
+        # to decay below the tolerance
+        sizes = np.zeros(len(w))
+        for n_pad, group in classes:
+            sizes[group] = n_pad
+        self.assertTrue(np.all(np.diff(sizes) <= 0))
+        t_pad = -np.log(1e-3) / (0.05 * w)
+        self.assertTrue(np.all((sizes - n) * self.dt >= t_pad))
+
+        # Less work than the fixed padding for 5% damping
+        self.assertLess(np.mean(sizes), 0.8 * fixed[0][0])
+        print(f"\nMean padded length: {np.mean(sizes) / n:.2f} x record length")
+
+        # Classes within the merge ratio are merged
+        n_pads = [n_pad for n_pad, _ in classes]
+        self.assertTrue(np.all(np.divide(n_pads[1:], n_pads[:-1]) > 1.1))
+
+        # Fixed padding with no damping
+        classes = _fft_padding_classes(n, self.dt, w, 0, "damping")
+        self.assertEqual(classes[0][0], fixed[0][0])
+        self.assertEqual(len(classes), 1)
+
+        # Padding limited to the fixed padding for short records (compared to the
+        # decay length), eg. with light damping. The oscillators that need less
+        # padding keep their classes
+        for n, zeta in ((1000, 0.05), (20000, 0.005)):
+            classes = _fft_padding_classes(n, 0.005, w, zeta, "damping")
+            self.assertEqual(classes[-1][0], int(np.ceil(1.5 * n)))
+            self.assertGreater(len(classes), 1)
+        classes = _fft_padding_classes(100000, 0.005, w, 0.005, "damping")
+        self.assertGreater(classes[-1][0], 1.5 * 100000)
+
+    def test_accuracy(self):
+        for zeta, max_diff in ((0.05, 5e-4), (0.005, 2e-3)):
+            rs_ref = self._reference_rs(zeta)
+            rs_fixed, _ = _fft_rs(
+                self.acc, self.time, self.frqs, zeta, fft_padding="fixed"
+            )
+            rs, _ = _fft_rs(self.acc, self.time, self.frqs, zeta)
+            diff_fixed = np.max(np.absolute(rs_fixed / rs_ref - 1))
+            if zeta < 0.05:
+                # The record is short compared to the decay length, so the padding
+                # is limited to the fixed padding, unless the work is not limited
+                self.assertFalse(np.array_equal(rs, rs_fixed))
+                self.assertLessEqual(np.max(np.absolute(rs / rs_ref - 1)), diff_fixed)
+                max_pad_work = autoRS.spectrum.FFT_MAX_PAD_WORK
+                autoRS.spectrum.FFT_MAX_PAD_WORK = np.inf
+                try:
+                    rs, _ = _fft_rs(self.acc, self.time, self.frqs, zeta)
+                finally:
+                    autoRS.spectrum.FFT_MAX_PAD_WORK = max_pad_work
+            diff = np.max(np.absolute(rs / rs_ref - 1))
+            print(
+                f"\nzeta = {zeta}: max diff {diff:.3%} with damping padding,",
+                f"{diff_fixed:.3%} with fixed padding",
+            )
+            self.assertLess(diff, max_diff)
+            self.assertLess(diff, diff_fixed)
+
+
+class TestAdaptiveRS(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.time = np.arange(len(acc)) * dt
+
+        # Floor motion: response of a lightly damped structure to the ground motion
+        b, a = _get_step_filter(2 * np.pi * 7.37, 0.02, dt)
+        cls.floor = lfilter(b, a, np.concatenate(([0], acc)))[1:]
+
+    def test_peak(self):
+        rs, frqs = response_spectrum(self.floor, self.time, zeta=0.02, adaptive=True)
+
+        # Refined grid includes the default frequencies and is within the budget
+        self.assertTrue(np.all(np.diff(frqs) > 0))
+        self.assertTrue(np.all(np.isin(get_default_frequencies(), frqs)))
+        self.assertLessEqual(len(frqs), 400)
+        np.testing.assert_allclose(rs, _fft_rs(self.floor, self.time, frqs, 0.02)[0])
+
+        # Peak found to within the tolerance, compared with a dense uniform grid
+        # around the peak
+        dense = np.geomspace(5, 10, 1000)
+        rs_dense, _ = _fft_rs(self.floor, self.time, dense, 0.02)
+        peak = dense[np.argmax(rs_dense)]
+        self.assertLess(abs(frqs[np.argmax(rs)] / peak - 1), 0.005)
+        self.assertAlmostEqual(rs.max() / rs_dense.max(), 1, places=3)
+
+        # A uniform (log) grid with the same tolerance needs ~1400 frequencies
+        n_uniform = np.log(1000) / np.log(1.005)
+        print(f"\n{len(frqs)} adaptive vs {n_uniform:.0f} uniform frequencies")
+        self.assertLess(len(frqs), n_uniform / 3)
+
+    def test_budget(self):
+        rs, frqs = response_spectrum(
+            self.floor,
+            self.time,
+            zeta=0.02,
+            adaptive=True,
+            adaptive_tolerance=0.001,
+            max_frequencies=150,
+        )
+        self.assertEqual(len(frqs), 150)
+        self.assertEqual(len(rs), 150)
+
+        # Multiple records
+        acc = np.column_stack((self.floor, 0.5 * self.floor))
+        rs, frqs = response_spectrum(acc, self.time, adaptive=True, method="shake")
+        self.assertEqual(rs.shape, (len(frqs), 2))
+        np.testing.assert_allclose(rs[:, 1], 0.5 * rs[:, 0])
+
+
+class TestRotD(unittest.TestCase):
+    th_path = os.path.join("../tests", "test_resources", "shake_acc_eg.ahl")
+
+    @classmethod
+    def setUpClass(cls):
+        acc, dt = read_shk_ahl(cls.th_path)
+        cls.h1 = np.array(acc)
+        cls.h2 = 0.7 * np.roll(cls.h1, 150)
+        cls.time = np.arange(len(acc)) * dt
+        cls.frqs = get_default_frequencies()[::10]
+
+    def test_brute_force(self):
+        # Spectra of the rotated ground motion for every angle
+        angles = np.arange(180) * np.pi / 180
+        rotated = np.column_stack(
+            [np.cos(a) * self.h1 + np.sin(a) * self.h2 for a in angles]
+        )
+        rs_all, _ = _step_rs(rotated, self.time, self.frqs)
+
+        rotd, frqs = rotd_spectrum(
+            self.h1, self.h2, self.time, frqs=self.frqs, method="shake"
+        )
+        self.assertEqual(rotd.shape, (len(self.frqs), 2))
+        np.testing.assert_allclose(rotd[:, 0], np.median(rs_all, axis=1), rtol=1e-9)
+        np.testing.assert_allclose(rotd[:, 1], np.max(rs_all, axis=1), rtol=1e-9)
+
+    def test_methods(self):
+        for method, rs_func in RS_METHODS_DICT.items():
+            rotd, _ = rotd_spectrum(
+                self.h1,
+                self.h2,
+                self.time,
+                percentiles=(0, 50, 100),
+                frqs=self.frqs,
+                method=method,
+            )
+            self.assertTrue(np.all(np.diff(rotd, axis=1) >= 0))
+
+            # 0 and 90 degrees are the two components
+            rs_h1, _ = rs_func(self.h1, self.time, self.frqs)
+            rs_h2, _ = rs_func(self.h2, self.time, self.frqs)
+            rs_max = np.maximum(rs_h1, rs_h2)
+            np.testing.assert_array_less(rs_max, rotd[:, 2] * (1 + 1e-9))
+            np.testing.assert_array_less(np.minimum(rs_h1, rs_h2), rs_max + 1e-12)
+
+        # Single percentile
+        rotd50, _ = rotd_spectrum(self.h1, self.h2, self.time, 50, frqs=self.frqs)
+        self.assertEqual(rotd50.shape, self.frqs.shape)
+
+    def test_blocking(self):
+        rotd, _ = rotd_spectrum(self.h1, self.h2, self.time, frqs=self.frqs)
+        rotd_blocked, _ = rotd_spectrum(
+            self.h1, self.h2, self.time, frqs=self.frqs, max_bytes=8000
+        )
+        np.testing.assert_allclose(rotd, rotd_blocked, rtol=1e-12)
+
+        # Peak memory is bounded by the budget, not by the number of frequencies
+        tracemalloc.start()
+        try:
+            rotd_spectrum(self.h1, self.h2, self.time, max_bytes=2 ** 25)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 1.1 * 2 ** 25)
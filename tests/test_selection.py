@@ -0,0 +1,140 @@
+"""Unit tests for autoRS.selection."""
+
+# Standard library imports
+import unittest
+import os
+import shutil
+import io
+from contextlib import redirect_stdout
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+from autoRS.selection import MOMENTS_CACHE_SIZE, SpectralIndex
+from autoRS.core import MotionSpectra
+
+
+def brute_force_query(log_sa, log_target, w, scale_range=None):
+    """Optimal ln scale factors and RMS misfits of every spectrum, one at a time."""
+    w = w / np.sum(w)
+    log_scales, errors = [], []
+    for column in log_sa.T:
+        d = log_target - column
+        c = np.dot(w, d)
+        if scale_range is not None:
+            c = np.clip(c, *np.log(scale_range))
+        log_scales.append(c)
+        errors.append(np.sqrt(np.dot(w, (d - c) ** 2)))
+    return np.array(log_scales), np.array(errors)
+
+
+class TestSpectralIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.frequency = np.logspace(-1, 2, 60)
+        shape = np.exp(-0.5 * np.log(cls.frequency / 5) ** 2)
+        noise = rng.normal(0, 0.03, (60, 500)).cumsum(axis=0)
+        cls.sa = shape[:, None] * np.exp(noise + rng.normal(0, 1, 500))
+        cls.spectra = MotionSpectra(
+            cls.frequency, cls.sa, column_names=[f"rec{i}" for i in range(500)]
+        )
+
+    def setUp(self):
+        self.index = SpectralIndex(self.frequency)
+        self.index.add(self.spectra)
+
+    def test_query(self):
+        target = self.sa[:, 42] * 2.5
+        names, scales, errors = self.index.query(target, k=5)
+        self.assertEqual(names[0], "rec42")
+        self.assertAlmostEqual(scales[0], 2.5)
+        self.assertAlmostEqual(errors[0], 0, places=6)
+        self.assertTrue(np.all(np.diff(errors) >= 0))
+
+        # Compare with a brute force search, with frequency and scale limits
+        log_sa = np.log(self.sa)
+        target = self.sa[:, :3].mean(axis=1)
+        w = np.where((self.frequency >= 1) & (self.frequency <= 10), 1.0, 0)
+        for scale_range in (None, (0.5, 2)):
+            names, scales, errors = self.index.query(
+                target, k=10, frequency_range=(1, 10), scale_range=scale_range
+            )
+            log_scales, expected = brute_force_query(
+                log_sa, np.log(target), w, scale_range
+            )
+            best = np.argsort(expected)[:10]
+            self.assertEqual(names, [f"rec{i}" for i in best])
+            np.testing.assert_allclose(scales, np.exp(log_scales[best]))
+            np.testing.assert_allclose(errors, expected[best], atol=1e-6)
+
+        # Target defined as spectra
+        target = MotionSpectra(self.frequency, self.sa[:, 7])
+        names, _, _ = self.index.query(target, k=1)
+        self.assertEqual(names, ["rec7"])
+
+        # The moments of a bounded number of query weights are cached
+        for i in range(MOMENTS_CACHE_SIZE + 4):
+            self.index.query(target, k=1, weights=np.linspace(1, 1 + i, 60))
+        self.assertEqual(len(self.index._moments), MOMENTS_CACHE_SIZE)
+
+        # An empty index
+        self.assertEqual(SpectralIndex(self.frequency).log_acceleration.shape, (60, 0))
+
+    def test_save_open(self):
+        path = "test_spectral_index.bin"
+        self.addCleanup(os.remove, path)
+        self.index.add(self.spectra, prefix="copy/")
+        self.assertEqual(len(self.index), 1000)
+        self.index.save(path)
+
+        index = SpectralIndex.open(path)
+        self.assertIsInstance(index.log_acceleration, np.memmap)
+        self.assertEqual(index.names, self.index.names)
+        self.assertEqual(index.zeta, 0.05)
+        np.testing.assert_array_equal(index.frequency, self.frequency)
+        self.assertEqual(
+            index.query(self.sa[:, 3], k=2)[0], self.index.query(self.sa[:, 3], k=2)[0]
+        )
+
+        # Spectra added to an opened index
+        index.add(MotionSpectra(self.frequency, self.sa[:, 0] * 9, column_names=["x"]))
+        self.assertEqual(index.query(self.sa[:, 0] * 9, k=1)[0], ["x"])
+
+        with self.assertRaises(ValueError):
+            SpectralIndex.open(os.path.join("test_resources", "multi_col.csv"))
+
+    def test_add_folder(self):
+        folder = os.path.join("test_resources", "RS_index")
+        os.makedirs(folder, exist_ok=True)
+        self.addCleanup(shutil.rmtree, folder)
+        self.spectra.to_csv(os.path.join(folder, "a_RS.csv"))
+        MotionSpectra(self.frequency, self.sa[:, :2], zeta=0.02).to_csv(
+            os.path.join(folder, "b_RS.csv")
+        )
+
+        index = SpectralIndex(self.frequency)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            index.add_folder(folder)
+        self.assertIn("b_RS.csv skipped", output.getvalue())
+        self.assertEqual(len(index), 500)
+        self.assertEqual(index.names[0], "a/rec0")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.index.add(MotionSpectra(self.frequency, self.sa, zeta=0.02))
+        with self.assertRaises(ValueError):
+            self.index.add(MotionSpectra(self.frequency, self.sa * 0))
+        with self.assertRaises(ValueError):
+            self.index.query(self.sa[:-1, 0])
+        with self.assertRaises(ValueError):
+            self.index.query(self.sa[:, 0], frequency_range=(200, 300))
+        with self.assertRaises(ValueError):
+            self.index.query(self.spectra)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Unit tests for autoRS.spill."""
+
+# Standard library imports
+import unittest
+import os
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+from autoRS.spill import (
+    ColumnStore,
+    block_size,
+    processing_bytes,
+    spill_csv,
+    CSV_DELETECHARS,
+)
+
+
+class TestColumnStore(unittest.TestCase):
+    def test_read_columns(self):
+        rng = np.random.default_rng(0)
+        data = rng.standard_normal((103, 7))
+        with ColumnStore([f"c{i}" for i in range(7)]) as store:
+            for start in range(0, 103, 20):
+                store.append(data[start : start + 20])
+            store.append(np.zeros((0, 7)))
+            self.assertEqual(store.shape, (103, 7))
+            np.testing.assert_array_equal(store.read_columns(2, 5), data[:, 2:5])
+            np.testing.assert_array_equal(store.read_columns(5, 10), data[:, 5:])
+            columns = list(store.iter_columns(1, block_size=3))
+        self.assertEqual([name for name, _ in columns], [f"c{i}" for i in range(1, 7)])
+        values = np.column_stack([values for _, values in columns])
+        np.testing.assert_array_equal(values, data[:, 1:])
+
+    def test_block_size(self):
+        self.assertEqual(block_size(2 ** 16, memory_budget=8), 8)
+        self.assertEqual(block_size(2 ** 30, memory_budget=8), 1)
+
+    def test_processing_bytes(self):
+        # The half of the budget not used by the blocks of columns
+        self.assertEqual(processing_bytes(8), 4 * 2 ** 20)
+        self.assertEqual(processing_bytes(8, n_processes=4), 2 ** 20)
+        self.assertEqual(processing_bytes(1e-9), 1)
+
+
+class TestSpillCSV(unittest.TestCase):
+    def test_same_as_genfromtxt(self):
+        for fname in ("multi_col.csv", "nan_eg.csv", "single_col_wo_comma.csv"):
+            path = os.path.join("test_resources", fname)
+            expected = np.genfromtxt(
+                path,
+                delimiter=",",
+                skip_header=1,
+                names=True,
+                deletechars=CSV_DELETECHARS,
+            )
+            # A small budget parses the file in many blocks of rows
+            with spill_csv(path, memory_budget=0.05) as store:
+                self.assertGreater(len(store._chunks), 10)
+                self.assertEqual(store.column_names, expected.dtype.names)
+                for i, name in enumerate(store.column_names):
+                    np.testing.assert_array_equal(
+                        store.read_columns(i, i + 1)[:, 0], expected[name]
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
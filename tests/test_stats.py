@@ -0,0 +1,68 @@
+"""Unit tests for autoRS.stats."""
+
+# Standard library imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local Application Imports
+from context import autoRS
+from autoRS.stats import SpectraStatistics, LOG_BIN_WIDTH
+
+
+class TestSpectraStatistics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(1)
+        cls.frequency = np.logspace(-1, 2, 50)
+        cls.spectra = np.exp(rng.normal(-1, 0.6, (50, 1001)))
+
+    def test_statistics(self):
+        stats = SpectraStatistics(self.frequency)
+        stats.update(self.spectra[:, 0])
+        stats.update(self.spectra[:, 1:])
+        log_sa = np.log(self.spectra)
+
+        self.assertEqual(stats.count, self.spectra.shape[1])
+        np.testing.assert_allclose(stats.mean, np.exp(log_sa.mean(axis=1)))
+        np.testing.assert_allclose(stats.log_std, log_sa.std(axis=1, ddof=1))
+        np.testing.assert_array_equal(stats.minimum, self.spectra.min(axis=1))
+        np.testing.assert_array_equal(stats.maximum, self.spectra.max(axis=1))
+
+        # Quantiles are accurate to within the histogram bin width
+        for q in (0, 0.16, 0.5, 0.84, 1):
+            np.testing.assert_allclose(
+                stats.quantile(q),
+                np.quantile(self.spectra, q, axis=1),
+                rtol=LOG_BIN_WIDTH,
+            )
+
+    def test_invalid(self):
+        stats = SpectraStatistics(self.frequency)
+        with self.assertRaises(ValueError):
+            stats.quantile(0.5)
+        with self.assertRaises(ValueError):
+            stats.update(np.zeros(50))
+        with self.assertRaises(ValueError):
+            stats.update(np.ones(49))
+        stats.update(np.ones(50))
+        with self.assertRaises(ValueError):
+            stats.quantile(1.5)
+        np.testing.assert_array_equal(stats.log_std, 0)
+
+    def test_to_spectra(self):
+        stats = SpectraStatistics(self.frequency)
+        stats.update(self.spectra)
+        spectra = stats.to_spectra(quantiles=(0.5, 0.84), zeta=0.02)
+        self.assertEqual(
+            spectra.column_names,
+            ("S_a_mean", "ln_std", "S_a_p50", "S_a_p84", "S_a_min", "S_a_max"),
+        )
+        np.testing.assert_array_equal(spectra.frequency, self.frequency)
+        np.testing.assert_array_equal(spectra.table["S_a_max"], stats.maximum)
+        self.assertEqual(spectra.zeta[0], 0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
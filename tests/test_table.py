@@ -2,6 +2,8 @@
 
 # Standard library imports
 import unittest
+import os
+import tracemalloc
 
 # Third party imports
 import numpy as np
@@ -169,8 +171,17 @@ class TestTable(unittest.TestCase):
         t = FloatTable()
         t.data = [[1, 2, 3], [3, 4, 5]]
         t.column_names = ["a", "b", "c"]
+        view = t.iloc[:]
         t["c"] = [5, 5]
         self.assertTrue(all(t["c"] == np.array([5, 5])))
+        self.assertTrue(all(view["c"] == np.array([3, 5])))
+
+        # Without live views, columns are replaced in place
+        del view
+        data = t.data
+        t["b"] = [7, 7]
+        self.assertIs(t.data, data)
+        self.assertTrue(all(data[:, 1] == np.array([7, 7])))
 
         with self.assertRaises(SizeMismatchError):
             t["c"] = [5, 5, 5]
@@ -195,6 +206,114 @@ class TestTable(unittest.TestCase):
         for k, v in t.items():
             self.assertTrue(all(np.array(raw_data[k]) == v))
 
+    def test_append_rows(self):
+        """Blocks of rows can be appended to the end of the table. The table keeps
+        spare capacity that grows geometrically, so most appends do not reallocate
+        the data."""
+        t = FloatTable(column_names=["a", "b"], index_name="time")
+        t.append_rows([[1, 2], [3, 4]], index=[0.0, 0.1])
+        self.assertEqual(t.shape, (2, 2))
+        self.assertTrue(all(t["b"] == [2, 4]))
+
+        buffers = set()
+        for i in range(1, 200):
+            t.append_rows(np.ones((3, 2)) * i, index=0.1 + 0.3 * i + np.array([0.1, 0.2, 0.3]))
+            buffers.add(id(t._data_buffer))
+        self.assertEqual(t.shape, (599, 2))
+        self.assertLess(len(buffers), 10)
+        self.assertTrue(all(t["a"][-3:] == 199))
+        self.assertAlmostEqual(t.index[-1], 0.1 + 0.3 * 199 + 0.3)
+
+        t = FloatTable(raw_data={"a": [1, 2]})
+        view = t.iloc[:]
+        t.add_row([3])
+        t.append_rows([4, 5])
+        self.assertTrue(all(t["a"] == [1, 2, 3, 4, 5]))
+        self.assertTrue(all(t.index == [0, 1, 2, 3, 4]))
+        self.assertTrue(all(view["a"] == [1, 2]))
+
+        with self.assertRaises(SizeMismatchError):
+            t.append_rows([[1, 2]])
+        with self.assertRaises(SizeMismatchError):
+            t.append_rows([1, 2], index=[5])
+        with self.assertRaises(EmptyInputError):
+            t.append_rows([])
+
+    def test_iterrows(self):
+        """Rows can be iterated over as (index, row) pairs of read-only views, or in
+        chunks of views."""
+        t = FloatTable(raw_data=np.arange(12).reshape(4, 3), index=[0, 2, 4, 6])
+        rows = list(t.iterrows())
+        self.assertEqual([index for index, _ in rows], [0, 2, 4, 6])
+        self.assertTrue(all(rows[1][1] == [3, 4, 5]))
+        self.assertTrue(np.shares_memory(rows[1][1], t.data))
+        with self.assertRaises(ValueError):
+            rows[1][1][0] = 10
+
+        chunks = list(t.iterchunks(3))
+        self.assertEqual([chunk.shape for chunk in chunks], [(3, 3), (1, 3)])
+        self.assertTrue(all(chunks[1].index == [6]))
+        self.assertEqual(list(FloatTable().iterrows()), [])
+
+    def test_save_open(self):
+        """Tables can be saved to a columnar binary file and re-opened as
+        memory-mapped tables."""
+        path = "test_table.bin"
+        self.addCleanup(os.remove, path)
+        t = FloatTable(
+            raw_data=np.random.default_rng(0).normal(size=(1000, 3)),
+            index=np.arange(1000) * 0.005,
+            column_names=["a", "b", "c"],
+            index_name="time",
+        )
+        t.save(path, metadata={"zeta": 0.05})
+        self.assertEqual(FloatTable.read_metadata(path), {"zeta": 0.05})
+        t2 = FloatTable.open(path)
+        self.assertIsInstance(t2.data, np.memmap)
+        self.assertEqual(t2.column_names, ("a", "b", "c"))
+        self.assertEqual(t2.index_name, "time")
+        self.assertTrue((t2.data == t.data).all())
+        self.assertTrue((t2.index == t.index).all())
+        self.assertTrue(t2["b"].flags.c_contiguous)
+        self.assertTrue((t2.iloc[10:20, 1:].data == t.data[10:20, 1:]).all())
+        with self.assertRaises(ValueError):
+            t2.data[0, 0] = 1
+
+        t3 = FloatTable.open(path, mode="r+")
+        t3["a"] = np.zeros(1000)
+        del t3
+        self.assertTrue((FloatTable.open(path)["a"] == 0).all())
+
+        t = FloatTable(index=[0, 10], column_names=["a", "b"])
+        t.save(path)
+        self.assertEqual(FloatTable.read_metadata(path), {})
+        t2 = FloatTable.open(path)
+        self.assertEqual(t2.shape, (2, 2))
+        self.assertTrue(np.isnan(t2.data).all())
+
+        with open(path, "w") as file:
+            file.write("not a table")
+        with self.assertRaises(ValueError):
+            FloatTable.open(path)
+
+    def test_open_large(self):
+        """Opening a large saved table only reads the header: the data is
+        memory-mapped, and reading a column does not load the rest of the table.
+        The open time is measured in `benchmarks/bench_table.py`."""
+        path = "test_large_table.bin"
+        self.addCleanup(os.remove, path)
+        FloatTable(raw_data=np.ones((200_000, 50))).save(path)
+        tracemalloc.start()
+        try:
+            table = FloatTable.open(path)
+            self.assertEqual(table["Col49"][-1], 1)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertIsInstance(table.data, np.memmap)
+        self.assertLess(peak, table.data.nbytes / 20)
+        del table
+
     def test_pop(self):
         """Since Table is a MutableMapping it can also pop."""
         t = FloatTable(raw_data={"a": [1, 3], "b": [2, 4], "c": [3, 5]})
@@ -208,8 +327,60 @@ class TestTable(unittest.TestCase):
         form with indexes and column names showing."""
         pass
 
+    def test_TableIloc(self):
+        """Rows and columns of the Table can be selected by position. This is similar
+        to Pandas DataFrame.iloc[...]. The selections are read-only views of the table
+        data."""
+        t = FloatTable(
+            raw_data=np.arange(40).reshape(10, 4),
+            index=np.linspace(0, 0.9, 10),
+            column_names=["a", "b", "c", "d"],
+            index_name="time",
+        )
+        view = t.iloc[2:5]
+        self.assertEqual(view.shape, (3, 4))
+        self.assertEqual(view.index_name, "time")
+        self.assertTrue(np.shares_memory(view.data, t.data))
+        self.assertTrue(all(view["b"] == [9, 13, 17]))
+        self.assertTrue(np.allclose(view.index, [0.2, 0.3, 0.4]))
+
+        view = t.iloc[::3, 1:3]
+        self.assertEqual(view.column_names, ("b", "c"))
+        self.assertTrue(all(view["c"] == [2, 14, 26, 38]))
+
+        view = t.iloc[-1, [0, 2]]
+        self.assertEqual(view.shape, (1, 2))
+        self.assertEqual(view.column_names, ("a", "c"))
+        self.assertTrue(np.shares_memory(view.data, t.data))
+
+        with self.assertRaises(ValueError):
+            view.data[0, 0] = 100
+        with self.assertRaises(IndexError):
+            t.iloc[10]
+        with self.assertRaises(IndexError):
+            t.iloc[:, [0, 1, 3]]
+
     def test_TableLoc(self):
         """The Table values can be accessed by indexing using the
         index and column values. This is similar to Pandas
         DataFrame.loc[...]"""
-        pass
+        t = FloatTable(
+            raw_data=np.arange(40).reshape(10, 4),
+            index=np.linspace(0, 0.9, 10),
+            column_names=["a", "b", "c", "d"],
+        )
+        view = t.loc[0.25:0.5]
+        self.assertTrue(np.allclose(view.index, [0.3, 0.4, 0.5]))
+        self.assertTrue(np.shares_memory(view.data, t.data))
+
+        view = t.loc[:0.1, "b":"c"]
+        self.assertEqual(view.column_names, ("b", "c"))
+        self.assertTrue((view.data == [[1, 2], [5, 6]]).all())
+
+        view = t.loc[t.index[3], ["b", "d"]]
+        self.assertTrue((view.data == [[13, 15]]).all())
+
+        with self.assertRaises(KeyError):
+            t.loc[0.35]
+        with self.assertRaises(KeyError):
+            t.loc[:, "e"]
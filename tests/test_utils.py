@@ -2,6 +2,8 @@
 
 # Standard library imports
 import unittest
+import os
+import tracemalloc
 
 # Third party imports
 import numpy as np
@@ -11,6 +13,9 @@ from context import autoRS
 from autoRS.core.utils import (
     cumulative_integral,
     integration_methods,
+    integration_spacing,
+    sliding_maximum,
+    range_maximum,
 )
 
 # %% Tests
@@ -149,3 +154,201 @@ class TestCumulativeIntegration(unittest.TestCase):
         res_simps8 = cumulative_integral([1, 2, 3], [1, 5, 6], method="simpson 3/8")
         self.assertTrue(all(res_trapz == res_simps3))
         self.assertTrue(all(res_trapz == res_simps8))
+
+
+class TestCumulativeIntegrationArrays(unittest.TestCase):
+    """Integration of 2D inputs, output arrays, and precomputed spacing."""
+
+    def setUp(self) -> None:
+        self.dt = 0.005
+        self.t = np.arange(0, 8000) * self.dt
+        self.y = np.random.default_rng(0).normal(size=(8000, 50))
+
+    def test_axis(self):
+        """2D inputs are integrated along `axis` and match the 1D results."""
+        for method in integration_methods.keys():
+            res = cumulative_integral(self.y, self.t, method=method, axis=0)
+            res_t = cumulative_integral(self.y.T, self.t, method=method, axis=1)
+            res_1d = cumulative_integral(self.y[:, 3], self.t, method=method)
+            self.assertTrue(np.allclose(res[:, 3], res_1d))
+            self.assertTrue(np.allclose(res_t, res.T))
+
+    def test_out(self):
+        """The results can be written into an existing array."""
+        out = np.empty(self.y.shape)
+        for method in integration_methods.keys():
+            res = cumulative_integral(self.y, self.t, method=method, out=out)
+            self.assertIs(res, out)
+            expected = cumulative_integral(self.y, self.t, method=method)
+            self.assertTrue(np.allclose(out, expected))
+        with self.assertRaises(ValueError):
+            cumulative_integral(self.y, self.t, out=np.empty(3))
+
+    def test_spacing(self):
+        """Precomputed spacing gives the same results as the x values. Unequal
+        spacing is returned as an array of steps and integrated with the trapezoidal
+        method."""
+        spacing = integration_spacing(self.t)
+        self.assertAlmostEqual(spacing, self.dt)
+        res = cumulative_integral(self.y, spacing=spacing)
+        self.assertTrue(np.allclose(res, cumulative_integral(self.y, self.t)))
+
+        x = [1, 5, 6]
+        steps = integration_spacing(x)
+        self.assertTrue(all(steps == [4, 1]))
+        res_trapz = cumulative_integral([1, 2, 3], x, method="trapezoidal")
+        res_simps = cumulative_integral([1, 2, 3], spacing=steps)
+        self.assertTrue(all(res_trapz == res_simps))
+        with self.assertRaises(ValueError):
+            cumulative_integral([1, 2, 3, 4], spacing=steps)
+
+    def test_short_simpson_cubic(self):
+        """The 3/8 rule needs 5 points. Shorter inputs use the 1/3 rule."""
+        res_simps3 = cumulative_integral([1, 2, 3, 5], method="simpson 1/3")
+        res_simps8 = cumulative_integral([1, 2, 3, 5], method="simpson 3/8")
+        self.assertTrue(all(res_simps3 == res_simps8))
+
+
+class TestIntegrationBenchmarks(unittest.TestCase):
+    """Regression tests based on the 'Benchmark Integration Functions' notebook."""
+
+    alpha = 2 * np.pi
+    t_max = 10
+    th_path = os.path.join("../tests", "test_resources", "multi_col.csv")
+
+    def mean_error_pct(self, method, sample_rate, func, int_func):
+        int_t = np.arange(0, self.t_max, 1 / sample_rate)
+        theory_res = int_func(int_t)
+        res = cumulative_integral(func(int_t), int_t, initial=0, method=method)
+        return np.mean(np.abs(theory_res - res)) / np.ptp(theory_res) * 100
+
+    def errors(self, sample_rates, func, int_func):
+        return {
+            method: np.array(
+                [self.mean_error_pct(method, sr, func, int_func) for sr in sample_rates]
+            )
+            for method in integration_methods.keys()
+        }
+
+    def test_error_vs_sample_rate(self):
+        """With at least 4 points per cycle, both simpson's rules are more accurate
+        than the trapezoidal rule at every sample rate."""
+        errors = self.errors(
+            np.linspace(4, 10, num=200),
+            lambda x: np.sin(self.alpha * x),
+            lambda x: (-np.cos(self.alpha * x) + 1) / self.alpha,
+        )
+        self.assertTrue((errors["simpson 1/3"] < errors["trapezoidal"]).all())
+        self.assertTrue((errors["simpson 3/8"] < errors["trapezoidal"]).all())
+
+    def test_error_vs_sample_rate_multiple_frequencies(self):
+        """For a signal with multiple frequencies, the simpson's rules are more
+        accurate than the trapezoidal rule at all sample rates, and typically by over
+        an order of magnitude."""
+        a = self.alpha
+        errors = self.errors(
+            np.linspace(2, 35, num=200),
+            lambda x: np.sin(a * x) + 5 * np.sin(a / 5 * x),
+            lambda x: (-np.cos(a * x) + 1) / a + 5 * (-np.cos(a / 5 * x) + 1) / (a / 5),
+        )
+        for method in ("simpson 1/3", "simpson 3/8"):
+            self.assertTrue((errors[method] < errors["trapezoidal"]).all())
+            self.assertGreater(np.median(errors["trapezoidal"] / errors[method]), 10)
+
+    def test_gradient_round_trip(self):
+        """Integrating a recorded acceleration twice and differentiating the result
+        twice with `np.gradient` recovers the acceleration within 2% of its range."""
+        th_raw = np.genfromtxt(self.th_path, delimiter=",", skip_header=2)
+        time, acc = th_raw[:, 0], th_raw[:, 1]
+        disp = cumulative_integral(cumulative_integral(acc, time), time)
+        acc_round_trip = np.gradient(np.gradient(disp, time), time)
+        self.assertLess(np.max(np.abs(acc_round_trip - acc)) / np.ptp(acc) * 100, 2)
+
+    def test_batched_work(self):
+        """Integrating many records in one 2D call into an existing array runs the
+        integration kernel once for all the records, without allocating temporary
+        arrays the size of the records, and matches integrating each record
+        separately. The timing is compared in `benchmarks/bench_integration.py`."""
+        t = np.arange(0, 8000) * 0.005
+        y = np.random.default_rng(0).normal(size=(len(t), 200))
+        out = np.empty(y.shape)
+        spacing = integration_spacing(t)
+        kernels = dict(integration_methods)
+        calls = []
+
+        def counted(kernel):
+            def wrapper(*args, **kwargs):
+                calls.append(kernel)
+                return kernel(*args, **kwargs)
+
+            return wrapper
+
+        try:
+            for method, kernel in kernels.items():
+                integration_methods[method] = counted(kernel)
+            for method, kernel in kernels.items():
+                calls.clear()
+                tracemalloc.start()
+                try:
+                    result = cumulative_integral(
+                        y, spacing=spacing, out=out, method=method
+                    )
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+                self.assertIs(result, out)
+                self.assertEqual(calls, [kernel])
+                self.assertLess(peak, y[:, 0].nbytes)
+
+                for i in range(y.shape[1]):
+                    np.testing.assert_allclose(
+                        out[:, i], cumulative_integral(y[:, i], t, method=method)
+                    )
+        finally:
+            integration_methods.update(kernels)
+
+
+class TestSlidingMaximum(unittest.TestCase):
+    def test_brute_force(self):
+        rng = np.random.default_rng(0)
+        x = rng.standard_normal((101, 3))
+        for window, step in [(1, 1), (7, 1), (10, 3), (25, 10), (101, 1), (50, 60)]:
+            expected = np.array(
+                [
+                    x[i : i + window].max(axis=0)
+                    for i in range(0, len(x) - window + 1, step)
+                ]
+            )
+            np.testing.assert_array_equal(sliding_maximum(x, window, step), expected)
+            np.testing.assert_array_equal(
+                sliding_maximum(x.T, window, step, axis=1), expected.T
+            )
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            sliding_maximum(np.arange(5), 6)
+        with self.assertRaises(ValueError):
+            sliding_maximum(np.arange(5), 2, step=0)
+
+
+class TestRangeMaximum(unittest.TestCase):
+    def test_brute_force(self):
+        rng = np.random.default_rng(0)
+        x = rng.standard_normal((37, 4))
+        start = rng.integers(0, 38, 200)
+        stop = rng.integers(0, 38, 200)
+        expected = np.array(
+            [
+                x[i:j].max(axis=0) if j > i else np.full(4, -np.inf)
+                for i, j in zip(start, stop)
+            ]
+        )
+        np.testing.assert_array_equal(range_maximum(x, start, stop), expected)
+        np.testing.assert_array_equal(
+            range_maximum(x.T, start, stop, axis=1), expected.T
+        )
+        np.testing.assert_array_equal(range_maximum(x[:1], [0], [1]), x[:1])
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            range_maximum(np.arange(5), [0], [6])